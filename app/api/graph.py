@@ -1,20 +1,64 @@
 from __future__ import annotations
 
-from typing import Annotated, Optional
+import json
+from typing import Annotated, Any, Callable, Dict, List, Optional
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
 
 from app.models.topology import (
+    AggregatedGraphResponse,
+    GraphChangesResponse,
+    GraphPageResponse,
     GraphResponse,
     GraphStatsResponse,
     ImpactRequest,
+    NodeSearchResponse,
     PathRequest,
     SubgraphRequest,
 )
-from app.services import graph_service
+from app.repositories.graph_replica import graph_replica
+from app.repositories.graph_version_repo import graph_version_repo
+from app.services import graph_aggregation, graph_service
+from app.services.graph_cache import graph_cache
+from app.services.graph_stream import graph_broadcaster
 
 router = APIRouter()
 
+
+def _json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
+def _serialize(result: Any) -> bytes:
+    if isinstance(result, bytes):
+        return result
+    if isinstance(result, BaseModel):
+        return result.model_dump_json().encode()
+    return json.dumps(jsonable_encoder(result)).encode()
+
+
+def _cached_response(
+    request: Request,
+    endpoint: str,
+    params: Dict[str, Any],
+    compute: Callable[[], Any],
+) -> Response:
+    """Serve a read from the per-graph-version cache, honouring ``If-None-Match``."""
+    version = graph_version_repo.current()
+    etag = graph_cache.etag(endpoint, params, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in if_none_match or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    body = graph_cache.get_or_compute(endpoint, params, version, lambda: _serialize(compute()))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get(
     "/full",
     response_model=GraphResponse,
@@ -22,25 +66,71 @@ router = APIRouter()
     description="Returns all nodes and edges (with a default limit of 500 to protect the browser).",
 )
 async def full_graph(
+    request: Request,
     limit: Annotated[int, Query(ge=1, le=5000)] = 500,
     app_id: Optional[str] = Query(None, description="Filter by application ID"),
 ):
-    return graph_service.get_full_graph(limit, app_id=app_id)
+    return _cached_response(
+        request, "full", {"limit": limit, "app_id": app_id},
+        lambda: graph_service.get_full_graph_json(limit, app_id=app_id),
+    )
+
+
+@router.get(
+    "/full/page",
+    response_model=GraphPageResponse,
+    summary="Get the topology graph page by page",
+    description=(
+        "Keyset pagination ordered by node id with no overall size cap. "
+        "Each page carries the outgoing edges of its nodes; pass `next_cursor` "
+        "back as `cursor` until it is null."
+    ),
+)
+async def full_graph_page(
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    limit: Annotated[int, Query(ge=1, le=5000)] = 1000,
+    app_id: Optional[str] = Query(None, description="Filter by application ID"),
+):
+    try:
+        return graph_service.get_graph_page(cursor, limit, app_id=app_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get(
+    "/full/ndjson",
+    summary="Stream the whole topology graph as NDJSON",
+    description=(
+        'One JSON object per line: `{"kind": "node", "data": ...}` for every node, '
+        'then `{"kind": "edge", "data": ...}` for every edge.'
+    ),
+)
+def full_graph_ndjson(
+    app_id: Optional[str] = Query(None, description="Filter by application ID"),
+):
+    return StreamingResponse(
+        graph_service.iter_graph_ndjson(app_id),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.post(
     "/subgraph",
     response_model=GraphResponse,
     summary="Get a subgraph around a specific node",
-    description="BFS from center_node_id up to *depth* hops. Optionally filter by node/edge types.",
+    description=(
+        "Level-by-level BFS from center_node_id up to *depth* hops. Node/edge type "
+        "filters restrict the expansion; max_nodes caps the result size."
+    ),
 )
 async def subgraph(body: SubgraphRequest):
-    return graph_service.get_subgraph(
+    return _json_response(graph_service.get_subgraph_json(
         center_id=body.center_node_id,
         depth=body.depth,
         node_types=body.node_types,
         edge_types=body.edge_types,
-    )
+        max_nodes=body.max_nodes,
+    ))
 
 @router.post(
     "/path",
@@ -48,11 +138,11 @@ async def subgraph(body: SubgraphRequest):
     summary="Find the shortest path between two nodes",
 )
 async def shortest_path(body: PathRequest):
-    return graph_service.find_path(
+    return _json_response(graph_service.find_path_json(
         source_id=body.source_id,
         target_id=body.target_id,
         max_depth=body.max_depth,
-    )
+    ))
 
 
 @router.post(
@@ -61,15 +151,35 @@ async def shortest_path(body: PathRequest):
     summary="Impact / blast-radius analysis",
     description=(
         "Starting from a node, traverse downstream (or upstream / both) "
-        "to find all affected resources."
+        "hop by hop to find all affected resources. Each node carries "
+        "properties.hop_distance; max_nodes stops the expansion early."
     ),
 )
 async def impact_analysis(body: ImpactRequest):
-    return graph_service.get_impact(
+    return _json_response(graph_service.get_impact_json(
         node_id=body.node_id,
         depth=body.depth,
         direction=body.direction,
-    )
+        max_nodes=body.max_nodes,
+    ))
+
+
+@router.get(
+    "/search",
+    response_model=NodeSearchResponse,
+    summary="Search nodes by name, id and selected properties",
+    description=(
+        "Full-text search with prefix and (optionally) fuzzy matching of every term. "
+        "Exact matches come first, then prefix matches, then by node degree."
+    ),
+)
+async def search_nodes(
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    node_types: Annotated[Optional[List[str]], Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    fuzzy: bool = True,
+):
+    return graph_service.search_nodes(q, node_types, limit, fuzzy)
 
 
 @router.get(
@@ -77,16 +187,99 @@ async def impact_analysis(body: ImpactRequest):
     response_model=GraphStatsResponse,
     summary="Aggregated graph statistics",
 )
-async def graph_stats():
-    return graph_service.get_stats()
+async def graph_stats(request: Request):
+    return _cached_response(request, "stats", {}, graph_service.get_stats)
+
+
+@router.get(
+    "/changes",
+    response_model=GraphChangesResponse,
+    summary="Node and edge changes since a sequence number",
+    description=(
+        "Net created, updated and deleted elements after `since`, read from the "
+        "bounded change log. Start with since=0 (or `latest` after a full load) "
+        "and pass `next_since` on the next poll. When the cursor has fallen out "
+        "of the retained log, `resync_required` is set: reload /full and continue "
+        "from `latest`."
+    ),
+)
+async def graph_changes(
+    since: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=10000)] = 1000,
+):
+    return graph_service.get_changes(since, limit)
+
+
+@router.get(
+    "/stream",
+    summary="Server-sent events with live node and edge changes",
+    description=(
+        "Pushes `changes` events shaped like /changes (event id = sequence number) "
+        "for writes coalesced over a short window, plus `resync` when the client "
+        "must reload /full. Optional filters: app_id (writer of the element), "
+        "node_types (nodes only) and root_id/depth (elements inside that subgraph)."
+    ),
+)
+async def graph_stream(
+    request: Request,
+    app_id: Optional[str] = None,
+    node_types: Annotated[Optional[List[str]], Query()] = None,
+    root_id: Optional[str] = None,
+    depth: Annotated[int, Query(ge=1, le=5)] = 2,
+):
+    subscriber = await graph_broadcaster.subscribe(app_id, node_types, root_id, depth)
+    return StreamingResponse(
+        graph_broadcaster.events(subscriber, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/replica",
+    summary="In-process graph replica status",
+    description=(
+        "Load state, size and approximate memory of the replica that serves "
+        "subgraph, path, impact and traversal reads when graph_backend=replica."
+    ),
+)
+async def replica_status():
+    return graph_replica.status()
+
+
+@router.get(
+    "/aggregate",
+    response_model=AggregatedGraphResponse,
+    summary="Level-of-detail graph with nodes collapsed into groups",
+    description=(
+        "`deployment`, `service` and `cluster` fold pods, deployments and services into "
+        "their container along `deployedon` edges; `environment`, `type` and `community` "
+        "group every node. Computed server-side and cached per graph version."
+    ),
+)
+async def aggregated_graph(
+    request: Request,
+    group_by: Annotated[str, Query(pattern="^(deployment|service|cluster|environment|type|community)$")] = "service",
+    app_id: Optional[str] = Query(None, description="Filter by application ID"),
+):
+    return _cached_response(
+        request, "aggregate", {"group_by": group_by, "app_id": app_id},
+        lambda: graph_aggregation.aggregate_graph_json(group_by, app_id=app_id),
+    )
 
 
 @router.get(
     "/analytics",
     summary="NetworkX analytics (PageRank, betweenness, communities)",
 )
-async def analytics(limit: Annotated[int, Query(ge=1, le=10000)] = 1000):
-    return graph_service.compute_analytics(limit)
+async def analytics(
+    request: Request,
+    limit: Annotated[int, Query(ge=1, le=10000)] = 1000,
+):
+    return _cached_response(
+        request, "analytics", {"limit": limit},
+        lambda: graph_service.compute_analytics(limit),
+    )
 
 
 @router.get(
@@ -95,7 +288,11 @@ async def analytics(limit: Annotated[int, Query(ge=1, le=10000)] = 1000):
     description="Useful for rendering the graph immediately on the frontend.",
 )
 async def graph_layout(
+    request: Request,
     limit: Annotated[int, Query(ge=1, le=5000)] = 500,
     layout: Annotated[str, Query(pattern="^(spring|kamada_kawai|circular|shell)$")] = "spring",
 ):
-    return graph_service.get_graph_with_layout(limit, layout)
+    return _cached_response(
+        request, "layout", {"limit": limit, "layout": layout},
+        lambda: graph_service.get_graph_with_layout(limit, layout),
+    )
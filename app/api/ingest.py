@@ -37,7 +37,7 @@ async def ingest_topology(
     # Override source with the registered agent name for trustworthy attribution
     payload.source = agent["name"]
 
-    result = ingest_service.process_topology_update(payload)
+    result = await ingest_service.process_topology_update(payload)
 
     if not result.to_dict()["success"]:
         raise HTTPException(
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, status
@@ -14,12 +14,15 @@ from app.models.mapper.mapping import (
     MappingConfig,
     MappingListResponse,
 )
-from app.models.mapper.raw_data import RawDataSource
+from app.models.mapper.replay import ReplayJobListResponse, ReplayJobProgress, ReplayJobStatus, ReplayMode
 from app.repositories import agent_repo
+from app.repositories.edge_preset_repo import edge_preset_repo
 from app.repositories.mapping_repo import mapping_repo
 from app.repositories.raw_data_repo import raw_data_repo
-from app.repositories.neo4j_repo import upsert_nodes, upsert_edges, delete_graph_by_sources
+from app.repositories.replay_job_repo import replay_job_repo
+from app.repositories.neo4j_repo import delete_graph_by_sources
 from app.services.mapper_service import mapper_service
+from app.services.replay_service import replay_service
 
 router = APIRouter()
 log = logging.getLogger(__name__)
@@ -30,6 +33,7 @@ class MappingUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     sample_chunk_id: Optional[str] = None
+    iterate_path: Optional[str] = None
     field_mappings: Optional[List[FieldMapping]] = None
     conditional_rules: Optional[List[ConditionalRule]] = None
     auto_edge_rules: Optional[List[AutoEdgeRule]] = None
@@ -43,6 +47,7 @@ class MappingUpdate(BaseModel):
 
 class ReplayRequest(BaseModel):
     """Request for replaying mapping on historical data."""
+    mode: ReplayMode = ReplayMode.FULL
     agent_id: Optional[str] = None
     from_timestamp: Optional[datetime] = None
     to_timestamp: Optional[datetime] = None
@@ -50,7 +55,10 @@ class ReplayRequest(BaseModel):
 
 class ReplayResponse(BaseModel):
     """Response for replay operation."""
+    job_id: Optional[str] = None
     chunks_processed: int
+    chunks_skipped: int = 0
+    chunks_failed: int = 0
     nodes_created: int
     edges_created: int
     errors: List[str] = []
@@ -60,13 +68,33 @@ class RecreateEdgesRequest(BaseModel):
     """Request for recreating edges for all nodes."""
     source_types: Optional[List[str]] = None  # Filter by source types
     edge_preset_id: Optional[str] = "default"
+    since: Optional[datetime] = None  # Only nodes updated after this; defaults to the preset's last run
+    full: bool = False  # Ignore the watermark and join every node
+
+
+class RuleRecreateStats(BaseModel):
+    """Outcome of one auto-edge rule during edge recreation."""
+    rule_id: str
+    source_type: str
+    target_type: str
+    edge_type: str
+    sources: int  # source nodes with a value in source_field
+    matched: int  # edges that exist after the run
+    created: int  # edges that did not exist before
+    resourced: int = 0  # existing edges moved over from another source
+    unresolved: int  # values with no target node
+    duration_ms: float
 
 
 class RecreateEdgesResponse(BaseModel):
     """Response for edge recreation."""
     nodes_processed: int
     edges_created: int
-    unresolved_count: int\
+    edges_matched: int = 0
+    edges_resourced: int = 0
+    unresolved_count: int
+    since: Optional[str] = None  # Watermark the run was limited to, None for a full run
+    rules: List[RuleRecreateStats] = []
 
 class DeactivateAndClearResponse(BaseModel):
     """Response for deactivate+clear operation."""
@@ -78,83 +106,6 @@ class DeactivateAndClearResponse(BaseModel):
     deleted_edges: int = 0
 
 
-async def replay_mapping_background(mapping_id: str, source_type: str) -> None:
-    """Background task to replay mapping on all historical data."""
-    from app.repositories.neo4j_repo import get_nodes_by_types, get_all_node_types
-
-    log.info(f"Starting background replay for mapping {mapping_id} (source_type={source_type})")
-
-    mapping = mapping_repo.get(mapping_id)
-    if not mapping:
-        log.error(f"Mapping {mapping_id} not found for replay")
-        return
-
-    # Convert source_type string to RawDataSource enum if valid
-    source_type_enum = None
-    try:
-        source_type_enum = RawDataSource(source_type)
-    except ValueError:
-        pass  # Unknown source type, will list all
-
-    try:
-        chunks_response = await raw_data_repo.list_chunks(
-            source_type=source_type_enum,
-            limit=10000,  # Process up to 10k chunks
-        )
-
-        chunks = chunks_response.chunks
-        total_processed = 0
-        total_nodes = 0
-        total_edges = 0
-
-        # Collect all created nodes for edge recreation
-        all_created_nodes: List[Dict[str, Any]] = []
-
-        for chunk in chunks:
-            try:
-                nodes, edges, unresolved = mapper_service.map_chunk(chunk, mapping)
-
-                # Get agent name from metadata
-                agent_name = chunk.metadata.get("agent_name", "replay") if chunk.metadata else "replay"
-
-                if nodes:
-                    upsert_nodes(nodes, source=agent_name)
-                    total_nodes += len(nodes)
-                    all_created_nodes.extend(nodes)
-
-                if edges:
-                    upsert_edges(edges, source=agent_name)
-                    total_edges += len(edges)
-
-                total_processed += 1
-
-            except Exception as e:
-                log.error(f"Error processing chunk {chunk.id}: {e}")
-
-        # Recreate edges for all created nodes now that all targets exist
-        if all_created_nodes:
-            log.info(f"Recreating edges for {len(all_created_nodes)} created nodes...")
-            new_edges, new_unresolved = mapper_service.recreate_edges_for_nodes(
-                all_created_nodes, mapping
-            )
-            if new_edges:
-                # Get agent name from first chunk or default
-                agent_name = chunks[0].metadata.get("agent_name", "replay") if chunks and chunks[0].metadata else "replay"
-                upsert_edges(new_edges, source=agent_name)
-                total_edges += len(new_edges)
-                log.info(f"Created {len(new_edges)} additional edges after all nodes were inserted")
-            if new_unresolved:
-                log.info(f"Still unresolved: {len(new_unresolved)} references")
-
-        log.info(
-            f"Background replay complete for {mapping_id}: "
-            f"{total_processed} chunks, {total_nodes} nodes, {total_edges} edges"
-        )
-
-    except Exception as e:
-        log.error(f"Background replay failed for {mapping_id}: {e}")
-
-
 # ============================================================================
 # Routes WITHOUT path parameters (must come BEFORE /{mapping_id} routes)
 # ============================================================================
@@ -212,25 +163,14 @@ async def recreate_all_edges(request: RecreateEdgesRequest = None):
     This is useful after bulk data insertion when edges may have been
     missed due to nodes being created in wrong order.
 
-    Applies auto-edge rules from the default preset.
+    By default only nodes updated since the preset's last successful run
+    are joined; pass ``since`` to override or ``full`` to rejoin everything.
+    Applies auto-edge rules from the selected preset. Each rule runs as one
+    set-based Cypher join inside Neo4j in batched transactions; no nodes
+    are loaded into the API process.
     """
-    from app.repositories.neo4j_repo import get_all_node_types, get_nodes_by_types
-
     request = request or RecreateEdgesRequest()
 
-    # Get all node types in the graph
-    if request.source_types:
-        node_types = request.source_types
-    else:
-        node_types = get_all_node_types()
-
-    if not node_types:
-        return RecreateEdgesResponse(nodes_processed=0, edges_created=0, unresolved_count=0)
-
-    # Get all nodes
-    all_nodes = get_nodes_by_types(node_types)
-    log.info(f"Recreating edges for {len(all_nodes)} nodes of types: {node_types}")
-
     # Create a dummy mapping with just the edge preset
     import uuid
     dummy_mapping = MappingConfig(
@@ -241,17 +181,39 @@ async def recreate_all_edges(request: RecreateEdgesRequest = None):
         edge_preset_id=request.edge_preset_id or "default",
     )
 
-    # Recreate edges
-    new_edges, unresolved = mapper_service.recreate_edges_for_nodes(all_nodes, dummy_mapping)
+    # Incremental by default: only nodes touched since the preset's last
+    # full-coverage run, unless its rules changed in between
+    preset_id = dummy_mapping.edge_preset_id
+    rules_hash = mapper_service.edge_rules_hash(dummy_mapping)
+    since: Optional[str] = None
+    if request.since is not None:
+        since_dt = request.since if request.since.tzinfo else request.since.replace(tzinfo=timezone.utc)
+        since = since_dt.astimezone(timezone.utc).isoformat()
+    elif not request.full:
+        watermark = edge_preset_repo.get_recreate_watermark(preset_id)
+        if watermark and watermark["rules_hash"] == rules_hash:
+            since = watermark["since"]
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    rules = [
+        RuleRecreateStats(**stats)
+        for stats in mapper_service.recreate_edges_in_graph(
+            dummy_mapping, request.source_types, since=since,
+        )
+    ]
+    log.info(f"Recreated edges for {len(rules)} rules" + (f" since {since}" if since else ""))
 
-    if new_edges:
-        upsert_edges(new_edges, source="edge-recreation")
-        log.info(f"Created {len(new_edges)} edges from recreation")
+    if not request.source_types:
+        edge_preset_repo.set_recreate_watermark(preset_id, started_at, rules_hash)
 
     return RecreateEdgesResponse(
-        nodes_processed=len(all_nodes),
-        edges_created=len(new_edges),
-        unresolved_count=len(unresolved),
+        nodes_processed=sum(r.sources for r in rules),
+        edges_created=sum(r.created for r in rules),
+        edges_matched=sum(r.matched for r in rules),
+        edges_resourced=sum(r.resourced for r in rules),
+        unresolved_count=sum(r.unresolved for r in rules),
+        since=since,
+        rules=rules,
     )
 
 
@@ -268,6 +230,59 @@ async def get_active_mapping(source_type: str):
     return mapping_repo.get_active_for_source(source_type)
 
 
+@router.get(
+    "/jobs",
+    response_model=ReplayJobListResponse,
+    summary="List replay jobs",
+)
+async def list_replay_jobs(
+    job_status: Optional[ReplayJobStatus] = Query(None, alias="status", description="Filter by job status"),
+):
+    """List replay jobs (newest first) with progress, throughput and ETA."""
+    jobs = await replay_job_repo.list_jobs(status=job_status)
+    return ReplayJobListResponse(
+        jobs=[ReplayJobProgress.from_job(job) for job in jobs],
+        total=len(jobs),
+    )
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=ReplayJobProgress,
+    summary="Get replay job status",
+)
+async def get_replay_job(job_id: str):
+    job = await replay_job_repo.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Replay job not found",
+        )
+    return ReplayJobProgress.from_job(job)
+
+
+@router.delete(
+    "/jobs/{job_id}",
+    response_model=ReplayJobProgress,
+    summary="Cancel a replay job",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def cancel_replay_job(job_id: str):
+    """Request cancellation; the job stops after its current page."""
+    job = await replay_service.cancel(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Replay job not found",
+        )
+    if job.status not in (ReplayJobStatus.QUEUED, ReplayJobStatus.RUNNING):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Replay job already {job.status.value}",
+        )
+    return ReplayJobProgress.from_job(job)
+
+
 # ============================================================================
 # Routes WITH /{mapping_id} path parameter (must come AFTER fixed paths)
 # ============================================================================
@@ -348,12 +363,11 @@ async def activate_mapping(mapping_id: str, background_tasks: BackgroundTasks):
     log.info(f"Activated mapping {mapping_id} for source_type={updated.source_type}")
 
     # Trigger background replay on historical data
-    background_tasks.add_task(
-        replay_mapping_background,
-        mapping_id,
-        updated.source_type,
-    )
-    log.info(f"Scheduled background replay for mapping {mapping_id}")
+    # Only chunks not yet mapped by this exact mapping content are replayed,
+    # so re-activating an unchanged mapping reads almost nothing
+    job = await replay_service.create_job(updated, mode=ReplayMode.UNPROCESSED)
+    background_tasks.add_task(replay_service.run, job)
+    log.info(f"Scheduled background replay job {job.id} for mapping {mapping_id}")
 
     return updated
 
@@ -405,6 +419,10 @@ async def deactivate_and_clear_mapping(mapping_id: str):
         deleted_nodes = deleted.get("deleted_nodes", 0)
         deleted_edges = deleted.get("deleted_edges", 0)
 
+    # The graph no longer reflects earlier replays of this source type
+    await raw_data_repo.clear_processed(mapping.source_type)
+    await replay_job_repo.clear_watermark(mapping.source_type)
+
     return DeactivateAndClearResponse(
         mapping_id=mapping_id,
         source_type=mapping.source_type,
@@ -437,10 +455,10 @@ async def replay_mapping(mapping_id: str, request: ReplayRequest = None):
     """Re-apply mapping to historical raw data.
 
     Useful when mapping is changed and user wants to update the graph
-    with historical data. Processes all chunks for the mapping's source_type.
+    with historical data. Processes the chunks of the mapping's source_type
+    selected by ``mode``: all of them, only those not yet mapped by this
+    mapping version, or those after ``from_timestamp`` / the last replay.
     """
-    from app.repositories.neo4j_repo import get_nodes_by_types
-
     request = request or ReplayRequest()
 
     mapping = mapping_repo.get(mapping_id)
@@ -450,63 +468,21 @@ async def replay_mapping(mapping_id: str, request: ReplayRequest = None):
             detail="Mapping not found",
         )
 
-    # Get chunks from Redis
-    # Note: from_timestamp/to_timestamp filtering not yet supported in raw_data_repo
-    # Convert source_type string to RawDataSource enum if valid
-    source_type_enum = None
-    try:
-        source_type_enum = RawDataSource(mapping.source_type)
-    except ValueError:
-        pass  # Unknown source type, will list all
-
-    chunks_response = await raw_data_repo.list_chunks(
-        source_type=source_type_enum,
+    job = await replay_service.create_job(
+        mapping,
+        mode=request.mode,
         agent_id=request.agent_id,
-        limit=10000,  # Process up to 10k chunks
+        from_timestamp=request.from_timestamp,
+        to_timestamp=request.to_timestamp,
     )
-
-    chunks = chunks_response.chunks
-    results = ReplayResponse(chunks_processed=0, nodes_created=0, edges_created=0)
-
-    # Collect all created nodes for edge recreation
-    all_created_nodes: List[Dict[str, Any]] = []
-
-    for chunk in chunks:
-        try:
-            nodes, edges, unresolved = mapper_service.map_chunk(chunk, mapping)
-
-            # Get agent name from metadata
-            agent_name = chunk.metadata.get("agent_name", "replay") if chunk.metadata else "replay"
-
-            if nodes:
-                upsert_nodes(nodes, source=agent_name)
-                results.nodes_created += len(nodes)
-                all_created_nodes.extend(nodes)
-
-            if edges:
-                upsert_edges(edges, source=agent_name)
-                results.edges_created += len(edges)
-
-            results.chunks_processed += 1
-
-        except Exception as e:
-            log.error(f"Error processing chunk {chunk.id}: {e}")
-            results.errors.append(f"Chunk {chunk.id[:8]}: {str(e)}")
-
-    # Recreate edges for all created nodes now that all targets exist
-    if all_created_nodes:
-        log.info(f"Recreating edges for {len(all_created_nodes)} created nodes...")
-        new_edges, new_unresolved = mapper_service.recreate_edges_for_nodes(
-            all_created_nodes, mapping
-        )
-        if new_edges:
-            agent_name = chunks[0].metadata.get("agent_name", "replay") if chunks and chunks[0].metadata else "replay"
-            upsert_edges(new_edges, source=agent_name)
-            results.edges_created += len(new_edges)
-            log.info(f"Created {len(new_edges)} additional edges after all nodes were inserted")
-
-    log.info(
-        f"Replay complete: {results.chunks_processed} chunks, "
-        f"{results.nodes_created} nodes, {results.edges_created} edges"
+    job = await replay_service.run(job)
+
+    return ReplayResponse(
+        job_id=job.id,
+        chunks_processed=job.chunks_processed,
+        chunks_skipped=job.chunks_skipped,
+        chunks_failed=job.chunks_failed,
+        nodes_created=job.nodes_created,
+        edges_created=job.edges_created,
+        errors=job.errors,
     )
-    return results
\ No newline at end of file
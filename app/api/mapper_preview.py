@@ -184,9 +184,14 @@ async def apply_mapping(request: PreviewRequest):
             edges=edge_models,
         )
 
-        result = process_topology_update(update)
+        result = await process_topology_update(update, unresolved)
 
-        await raw_data_repo.mark_processed(request.chunk_id, request.mapping_id)
+        await raw_data_repo.mark_processed_many(
+            mapping.source_type,
+            [chunk],
+            mapping.id,
+            mapper_service.compile_mapping(mapping).fingerprint,
+        )
 
         return ApplyResponse(
             chunk_id=request.chunk_id,
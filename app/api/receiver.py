@@ -9,7 +9,7 @@ from app.core.auth import require_agent
 from app.models.mapper.raw_data import RawDataSource, RawDataListResponse
 from app.repositories.raw_data_repo import raw_data_repo
 from app.repositories.mapping_repo import mapping_repo
-from app.repositories.neo4j_repo import upsert_nodes, upsert_edges
+from app.services.ingest_service import write_graph
 from app.services.mapper_service import mapper_service
 
 router = APIRouter()
@@ -61,20 +61,16 @@ async def receive_raw_data(
             )
 
             nodes, edges, unresolved = mapper_service.map_chunk(temp_chunk, active_mapping)
+            nodes_created, edges_created = await write_graph(
+                nodes, edges, agent_name, unresolved,
+            )
 
-            if nodes:
-                upsert_nodes(nodes, source=agent_name)
-                nodes_created = len(nodes)
-
-            if nodes:
-                new_edges, new_unresolved = mapper_service.recreate_edges_for_nodes(nodes, active_mapping)
-                edges.extend(new_edges)
-                unresolved.extend(new_unresolved)
-
-            if edges:
-                upsert_edges(edges, source=agent_name)
-                edges_created = len(edges)
-
+            await raw_data_repo.mark_processed_many(
+                source_type.value,
+                [temp_chunk],
+                active_mapping.id,
+                mapper_service.compile_mapping(active_mapping).fingerprint,
+            )
             mapping_applied = True
 
             log.info(
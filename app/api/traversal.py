@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
 from app.models.topology import GraphResponse
 from app.models.traversal import TraversalRule
@@ -33,5 +33,8 @@ async def list_presets() -> list[dict]:
         "the starting set for step N+1."
     ),
 )
-async def execute_traversal(body: TraversalRule) -> GraphResponse:
-    return traversal_service.execute_traversal(body)
+async def execute_traversal(body: TraversalRule):
+    return Response(
+        content=traversal_service.execute_traversal_json(body),
+        media_type="application/json",
+    )
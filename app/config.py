@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic_settings import BaseSettings
 
 
@@ -16,6 +18,36 @@ class Settings(BaseSettings):
     redis_port: int = 6379
     redis_password: str = ""
     raw_data_ttl_hours: int = 24
+    pending_edge_ttl_hours: int = 24
+
+    mapper_workers: int = 0
+    mapper_pool_min_chunks: int = 200
+    mapper_pool_batch_size: int = 50
+    node_lookup_index_max_entries: int = 500_000
+
+    edge_recreate_batch_size: int = 1000
+    edge_preset_cache_ttl_seconds: float = 30.0
+
+    replay_page_size: int = 500
+    replay_max_concurrent_per_source: int = 1
+    replay_slot_timeout_seconds: int = 300
+    replay_job_ttl_hours: int = 168
+
+    graph_cache_max_entries: int = 256
+    graph_cache_max_bytes: int = 64 * 1024 * 1024
+    graph_stats_reconcile_interval_seconds: int = 900
+    graph_changes_max_len: int = 100_000
+    graph_stream_window_ms: int = 250
+    graph_stream_max_batch: int = 5000
+    graph_stream_queue_size: int = 100
+    graph_stream_keepalive_seconds: float = 15.0
+
+    graph_backend: str = "neo4j"  # "neo4j" or "replica"
+    graph_replica_max_lag_seconds: float = 5.0
+
+    # Indexed for /graph/search next to name and external_id
+    graph_search_properties: List[str] = ["namespace", "service_name", "deployment_name", "cluster_id"]
+    graph_search_candidates: int = 500
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -18,6 +19,11 @@ from app.api.mocker import router as mocker_router
 from app.repositories.neo4j_connection import neo4j_driver
 from app.repositories import agent_repo, application_repo
 from app.repositories.mapping_repo import mapping_repo
+from app.repositories.raw_data_repo import raw_data_repo
+from app.services import graph_service
+from app.services.graph_stream import graph_broadcaster
+from app.services.mapper_service import mapper_service
+from app.services.replay_service import replay_service
 
 
 @asynccontextmanager
@@ -27,7 +33,20 @@ async def lifespan(application: FastAPI):
     agent_repo.ensure_agent_indexes()
     application_repo.ensure_application_indexes()
     mapping_repo.ensure_indexes()
+    await raw_data_repo.ensure_timeline()
+    await replay_service.resume_incomplete()
+    replay_task = asyncio.create_task(
+        replay_service.resume_incomplete_periodically(settings.replay_slot_timeout_seconds)
+    )
+    graph_service.warm_replica()
+    stats_task = asyncio.create_task(
+        graph_service.reconcile_stats_periodically(settings.graph_stats_reconcile_interval_seconds)
+    )
     yield
+    stats_task.cancel()
+    replay_task.cancel()
+    await graph_broadcaster.stop()
+    mapper_service.shutdown_pool()
     neo4j_driver.close()
 
 
@@ -91,6 +91,8 @@ class UnresolvedReference(BaseModel):
     source_field: str = Field(..., description="Field containing the reference")
     expected_target_type: str = Field(..., description="Expected target node type")
     expected_target_value: str = Field(..., description="Value that was not found")
+    target_field: str = Field(default="name", description="Target node field the value is matched against")
+    edge_type: str = Field(default="", description="Edge type to create once the target exists")
     rule_id: str = Field(..., description="ID of the AutoEdgeRule that created this reference")
 
 
@@ -112,6 +114,14 @@ class MappingConfig(BaseModel):
         description="ID of the raw data chunk used as sample for this mapping",
     )
 
+    iterate_path: Optional[str] = Field(
+        default=None,
+        description=(
+            "Fan-out path such as 'items[]' or 'resourceSpans[].scopeSpans[].spans[]'. "
+            "Each element is mapped as a copy of the document narrowed to that element, "
+            "so '[0]' field paths address the element and its parents"
+        ),
+    )
     field_mappings: List[FieldMapping] = Field(
         default_factory=list,
         description="Field mapping rules",
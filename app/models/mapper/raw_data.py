@@ -36,6 +36,10 @@ class RawDataChunk(BaseModel):
     is_processed: bool = Field(default=False, description="Whether this chunk has been mapped")
     processed_at: Optional[datetime] = Field(default=None, description="When this chunk was processed")
     mapping_id: Optional[str] = Field(default=None, description="ID of the mapping used to process")
+    mapping_version: Optional[str] = Field(
+        default=None,
+        description="Content fingerprint of the mapping used to process",
+    )
 
 
 class RawDataListResponse(BaseModel):
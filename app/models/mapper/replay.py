@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ReplayJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class ReplayMode(str, Enum):
+    FULL = "full"                  # every chunk in range
+    UNPROCESSED = "unprocessed"    # skip chunks already mapped by this mapping version
+    SINCE = "since"                # chunks after from_timestamp, or after the last replay watermark
+
+
+class ReplayJob(BaseModel):
+    id: str = Field(..., description="Unique job identifier (UUID)")
+    mapping_id: str = Field(..., description="Mapping being replayed")
+    mapping_version: str = Field(default="", description="Fingerprint of the mapping content being replayed")
+    mode: ReplayMode = Field(default=ReplayMode.FULL)
+    source_type: str = Field(..., description="Source type whose raw timeline is replayed")
+    agent_id: Optional[str] = Field(default=None, description="Only replay chunks from this agent")
+    from_timestamp: Optional[datetime] = Field(default=None, description="Lower bound of chunk timestamps")
+    to_timestamp: Optional[datetime] = Field(default=None, description="Upper bound of chunk timestamps")
+    status: ReplayJobStatus = Field(default=ReplayJobStatus.QUEUED)
+    owner: Optional[str] = Field(default=None, description="Worker holding the job's lease")
+    checkpoint_score: Optional[float] = Field(
+        default=None,
+        description="Timeline score of the last processed chunk",
+    )
+    checkpoint_member: Optional[str] = Field(
+        default=None,
+        description="Timeline member of the last processed chunk",
+    )
+    total_chunks: Optional[int] = Field(
+        default=None,
+        description="Timeline entries in range when the job started (all agents)",
+    )
+    chunks_scanned: int = Field(default=0, description="Timeline entries read so far")
+    chunks_processed: int = 0
+    chunks_skipped: int = Field(default=0, description="Chunks already mapped by this mapping version")
+    chunks_failed: int = Field(default=0, description="Chunks the mapping failed on")
+    nodes_created: int = 0
+    edges_created: int = 0
+    errors: List[str] = Field(default_factory=list)
+    elapsed_seconds: float = Field(default=0.0, description="Time spent processing pages")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class ReplayJobProgress(ReplayJob):
+    progress: Optional[float] = Field(default=None, description="Fraction of the timeline scanned (0..1)")
+    chunks_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+
+    @classmethod
+    def from_job(cls, job: ReplayJob) -> "ReplayJobProgress":
+        view = cls(**job.model_dump())
+        if job.total_chunks:
+            view.progress = min(1.0, job.chunks_scanned / job.total_chunks)
+        if job.elapsed_seconds > 0:
+            view.chunks_per_second = round(job.chunks_processed / job.elapsed_seconds, 2)
+            scan_rate = job.chunks_scanned / job.elapsed_seconds
+            if job.status == ReplayJobStatus.RUNNING and job.total_chunks and scan_rate > 0:
+                remaining = max(0, job.total_chunks - job.chunks_scanned)
+                view.eta_seconds = round(remaining / scan_rate, 1)
+        return view
+
+
+class ReplayJobListResponse(BaseModel):
+    jobs: List[ReplayJobProgress]
+    total: int
@@ -39,18 +39,91 @@ class GraphResponse(BaseModel):
     edge_count: int
 
 
+class GraphPageResponse(GraphResponse):
+    next_cursor: Optional[str] = Field(
+        None, description="Opaque cursor for the next page; null on the last page",
+    )
+
+
+class GraphElements(BaseModel):
+    nodes: List[GraphNode] = Field(default_factory=list)
+    edges: List[GraphEdge] = Field(default_factory=list)
+
+
+class DeletedElements(BaseModel):
+    node_ids: List[str] = Field(
+        default_factory=list, description="Deleted nodes; their edges are deleted with them",
+    )
+    edges: List[GraphEdge] = Field(
+        default_factory=list, description="Edges deleted while both endpoints remain",
+    )
+
+
+class AggregatedGraphResponse(GraphResponse):
+    """Super-nodes carry ``member_count`` and ``member_types`` in their
+    properties, super-edges ``edge_count`` and summed ``weight``."""
+
+    group_by: str
+    source_node_count: int
+    source_edge_count: int
+
+
+class GraphChangesResponse(BaseModel):
+    since: int
+    next_since: int = Field(..., description="Sequence number to pass as `since` on the next poll")
+    latest: int = Field(..., description="Newest sequence number in the change log")
+    has_more: bool = False
+    resync_required: bool = Field(
+        False,
+        description=(
+            "The cursor is outside the retained change log or the log holds a reset; "
+            "reload the full graph and continue polling from `latest`"
+        ),
+    )
+    created: GraphElements = Field(default_factory=GraphElements)
+    updated: GraphElements = Field(default_factory=GraphElements)
+    deleted: DeletedElements = Field(default_factory=DeletedElements)
+
+
 class GraphStatsResponse(BaseModel):
     total_nodes: int
     total_edges: int
     nodes_by_type: Dict[str, int]
     edges_by_type: Dict[str, int]
+    nodes_by_source: Dict[str, int] = Field(default_factory=dict)
+    edges_by_source: Dict[str, int] = Field(default_factory=dict)
+    nodes_by_application: Dict[str, int] = Field(default_factory=dict)
+    edges_by_application: Dict[str, int] = Field(default_factory=dict)
+
+
+class NodeSearchHit(BaseModel):
+    id: str
+    type: str
+    name: Optional[str] = None
+    status: Optional[str] = None
+    environment: Optional[str] = None
+    degree: int
+    score: float
+
+
+class NodeSearchResponse(BaseModel):
+    query: str
+    hits: List[NodeSearchHit]
+    count: int
 
 
 class SubgraphRequest(BaseModel):
     center_node_id: str
     depth: int = Field(2, ge=1, le=5)
-    node_types: Optional[List[str]] = None
-    edge_types: Optional[List[str]] = None
+    node_types: Optional[List[str]] = Field(
+        None, description="Only expand through nodes of these types",
+    )
+    edge_types: Optional[List[str]] = Field(
+        None, description="Only expand along edges of these types",
+    )
+    max_nodes: Optional[int] = Field(
+        None, ge=1, le=100000, description="Stop expanding once this many nodes are collected",
+    )
 
 
 class PathRequest(BaseModel):
@@ -63,3 +136,6 @@ class ImpactRequest(BaseModel):
     node_id: str
     depth: int = Field(3, ge=1, le=6)
     direction: str = Field("downstream", pattern="^(upstream|downstream|both)$")
+    max_nodes: Optional[int] = Field(
+        None, ge=1, le=100000, description="Stop expanding once this many nodes are affected",
+    )
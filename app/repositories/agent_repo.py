@@ -3,10 +3,12 @@ from __future__ import annotations
 import uuid
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from neo4j import ManagedTransaction
 
+from app.repositories.graph_replica import graph_replica
+from app.repositories.graph_version_repo import graph_version_repo
 from app.repositories.neo4j_connection import neo4j_driver
 
 log = logging.getLogger(__name__)
@@ -27,9 +29,12 @@ def register_agent(
     now = _now_iso()
 
     with neo4j_driver.session() as session:
-        result = session.execute_write(
+        result, bound = session.execute_write(
             _register_tx, agent_id, token, name, source_type, description, now, app_id
         )
+    if bound:
+        # Application-scoped graph reads depend on the binding
+        graph_replica.record_version(graph_version_repo.bump())
     return result
 
 
@@ -42,7 +47,8 @@ def _register_tx(
     description: Optional[str],
     now: str,
     app_id: Optional[str] = None,
-) -> Dict[str, Any]:
+) -> Tuple[Dict[str, Any], bool]:
+    """Returns the agent and whether a new application binding was created."""
     # MERGE by name so re-registration returns the existing agent + token
     if app_id:
         # Register with application binding
@@ -58,8 +64,10 @@ def _register_tx(
             "SET a.last_seen_at = $now "
             "WITH a "
             "MATCH (app:Application {app_id: $app_id}) "
+            "OPTIONAL MATCH (app)-[existing:HAS_AGENT]->(a) "
+            "WITH a, app, count(existing) = 0 AS bound "
             "MERGE (app)-[:HAS_AGENT]->(a) "
-            "RETURN a",
+            "RETURN a, bound",
             name=name,
             agent_id=agent_id,
             token=token,
@@ -79,7 +87,7 @@ def _register_tx(
             "    a.description = $description, "
             "    a.registered_at = $now "
             "SET a.last_seen_at = $now "
-            "RETURN a",
+            "RETURN a, false AS bound",
             name=name,
             agent_id=agent_id,
             token=token,
@@ -88,7 +96,7 @@ def _register_tx(
             now=now,
         )
     record = result.single()
-    return dict(record["a"])
+    return dict(record["a"]), record["bound"]
 
 
 def update_last_seen(token: str) -> None:
@@ -7,6 +7,8 @@ from typing import Any, Dict, List, Optional
 
 from neo4j import ManagedTransaction
 
+from app.repositories.graph_replica import graph_replica
+from app.repositories.graph_version_repo import graph_version_repo
 from app.repositories.neo4j_connection import neo4j_driver
 
 log = logging.getLogger(__name__)
@@ -132,7 +134,11 @@ def _get_detail_tx(tx: ManagedTransaction, app_id: str) -> Optional[Dict[str, An
 
 def bind_agent_to_application(app_id: str, agent_id: str) -> bool:
     with neo4j_driver.session() as session:
-        return session.execute_write(_bind_agent_tx, app_id, agent_id)
+        bound = session.execute_write(_bind_agent_tx, app_id, agent_id)
+    if bound:
+        # Application-scoped graph reads depend on the binding
+        graph_replica.record_version(graph_version_repo.bump())
+    return bound
 
 
 def _bind_agent_tx(tx: ManagedTransaction, app_id: str, agent_id: str) -> bool:
@@ -175,6 +181,19 @@ def _get_agent_names_tx(tx: ManagedTransaction, app_id: str) -> List[str]:
     return [r["name"] for r in result]
 
 
+def get_agent_names_by_application() -> Dict[str, List[str]]:
+    with neo4j_driver.session() as session:
+        return session.execute_read(_get_agent_names_by_app_tx)
+
+
+def _get_agent_names_by_app_tx(tx: ManagedTransaction) -> Dict[str, List[str]]:
+    result = tx.run(
+        "MATCH (app:Application)-[:HAS_AGENT]->(a:Agent) "
+        "RETURN app.app_id AS app_id, collect(a.name) AS names"
+    )
+    return {r["app_id"]: r["names"] for r in result}
+
+
 def ensure_application_indexes() -> None:
     with neo4j_driver.session() as session:
         session.run(
@@ -2,9 +2,12 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from app.config import settings
 from app.models.mapper.edge_preset import EdgePreset, EdgePresetCreate, EdgePresetUpdate
 from app.models.mapper.mapping import AutoEdgeRule
 from app.repositories.neo4j_connection import neo4j_driver
@@ -15,9 +18,20 @@ PRESETS_DIR = Path(__file__).parent.parent.parent / "edge_presets"
 
 
 class EdgePresetRepository:
+    """Built-in presets from ``edge_presets/`` plus custom ones in Neo4j.
+
+    Custom presets are cached per id. After ``edge_preset_cache_ttl_seconds``
+    an entry is revalidated by comparing ``updated_at`` only, so rules are
+    re-parsed just when the preset actually changed. ``revision`` is bumped
+    whenever a preset's cached content is replaced.
+    """
+
     def __init__(self):
         self._builtin_loaded = False
         self._builtin_presets: List[EdgePreset] = []
+        self._cache_lock = threading.Lock()
+        self._cache: Dict[str, Tuple[float, Any, Optional[EdgePreset]]] = {}
+        self._revisions: Dict[str, int] = {}
 
     def _load_builtin_presets(self) -> None:
         if self._builtin_loaded:
@@ -88,6 +102,48 @@ class EdgePresetRepository:
             if preset.id == preset_id:
                 return preset
 
+        with self._cache_lock:
+            entry = self._cache.get(preset_id)
+        now = time.monotonic()
+        if entry and now - entry[0] < settings.edge_preset_cache_ttl_seconds:
+            return entry[2]
+
+        if entry and entry[2] is not None:
+            updated_at = self._get_custom_updated_at(preset_id)
+            if updated_at is not None and updated_at == entry[1]:
+                with self._cache_lock:
+                    self._cache[preset_id] = (now, entry[1], entry[2])
+                return entry[2]
+
+        updated_at, preset = self._get_custom(preset_id)
+        # A missing preset or one without ``updated_at`` is reloaded every
+        # TTL; only a real change moves the revision and drops compiled plans
+        changed = entry is None or (updated_at, preset) != (entry[1], entry[2])
+        if not changed:
+            preset = entry[2]
+        with self._cache_lock:
+            self._cache[preset_id] = (now, updated_at, preset)
+            if changed:
+                self._revisions[preset_id] = self._revisions.get(preset_id, 0) + 1
+        return preset
+
+    def revision(self, preset_id: str) -> int:
+        """Counter bumped whenever the cached content of ``preset_id`` is replaced."""
+        return self._revisions.get(preset_id, 0)
+
+    def _invalidate(self, preset_id: str) -> None:
+        with self._cache_lock:
+            self._cache.pop(preset_id, None)
+
+    def _get_custom_updated_at(self, preset_id: str) -> Any:
+        with neo4j_driver.session() as session:
+            record = session.run(
+                "MATCH (p:EdgePreset {id: $id}) RETURN p.updated_at AS updated_at",
+                id=preset_id,
+            ).single()
+            return record["updated_at"] if record else None
+
+    def _get_custom(self, preset_id: str) -> Tuple[Any, Optional[EdgePreset]]:
         with neo4j_driver.session() as session:
             result = session.run(
                 "MATCH (p:EdgePreset {id: $id}) "
@@ -98,10 +154,10 @@ class EdgePresetRepository:
             )
             record = result.single()
             if not record:
-                return None
+                return None, None
 
             rules = self._parse_rules(record.get("rules"))
-            return EdgePreset(
+            return record.get("updated_at"), EdgePreset(
                 id=record["id"],
                 name=record["name"],
                 description=record.get("description"),
@@ -135,6 +191,7 @@ class EdgePresetRepository:
                 created_by=created_by,
             )
 
+        self._invalidate(preset_id)
         return self.get(preset_id)
 
     def update(self, preset_id: str, data: EdgePresetUpdate) -> Optional[EdgePreset]:
@@ -170,6 +227,7 @@ class EdgePresetRepository:
                 **params,
             )
 
+        self._invalidate(preset_id)
         return self.get(preset_id)
 
     def delete(self, preset_id: str) -> bool:
@@ -186,11 +244,39 @@ class EdgePresetRepository:
                 id=preset_id,
             )
             record = result.single()
+            session.run(
+                "MATCH (w:EdgeRecreateWatermark {preset_id: $id}) DELETE w",
+                id=preset_id,
+            )
+            self._invalidate(preset_id)
             return record["deleted"] > 0 if record else False
 
     def get_rules(self, preset_id: str) -> List[AutoEdgeRule]:
         preset = self.get(preset_id)
         return preset.rules if preset else []
 
+    def get_recreate_watermark(self, preset_id: str) -> Optional[Dict[str, str]]:
+        """Start time and rules hash of the last full-coverage edge recreation."""
+        with neo4j_driver.session() as session:
+            record = session.run(
+                "MATCH (w:EdgeRecreateWatermark {preset_id: $id}) "
+                "RETURN w.since AS since, w.rules_hash AS rules_hash",
+                id=preset_id,
+            ).single()
+            return dict(record) if record else None
+
+    def set_recreate_watermark(self, preset_id: str, since: str, rules_hash: str) -> None:
+        from datetime import datetime
+
+        with neo4j_driver.session() as session:
+            session.run(
+                "MERGE (w:EdgeRecreateWatermark {preset_id: $id}) "
+                "SET w.since = $since, w.rules_hash = $rules_hash, w.updated_at = $now",
+                id=preset_id,
+                since=since,
+                rules_hash=rules_hash,
+                now=datetime.utcnow().isoformat(),
+            )
+
 
 edge_preset_repo = EdgePresetRepository()
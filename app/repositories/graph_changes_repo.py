@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.repositories.redis_connection import redis_client
+
+log = logging.getLogger(__name__)
+
+Change = Dict[str, Any]
+
+# Assigns consecutive sequence numbers to a batch and appends it in one step,
+# so entries land in the stream in sequence order even with concurrent writers.
+_APPEND_SCRIPT = """
+local count = #ARGV - 1
+local seq = redis.call('INCRBY', KEYS[2], count) - count
+for i = 2, #ARGV do
+    seq = seq + 1
+    redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], seq .. '-0', 'c', ARGV[i])
+end
+return seq
+"""
+
+_APPEND_BATCH = 1000
+
+
+def node_upserted(data: Dict[str, Any], created: bool) -> Change:
+    return {"op": "created" if created else "updated", "kind": "node", "id": data["id"], "data": data}
+
+
+def edge_upserted(data: Dict[str, Any], created: bool) -> Change:
+    return {
+        "op": "created" if created else "updated",
+        "kind": "edge",
+        "id": edge_key(data["source_id"], data["type"], data["target_id"]),
+        "data": data,
+    }
+
+
+def node_deleted(node_id: str, node_type: Optional[str] = None, source: Optional[str] = None) -> Change:
+    return {
+        "op": "deleted",
+        "kind": "node",
+        "id": node_id,
+        "data": {"id": node_id, "type": node_type, "source": source},
+    }
+
+
+def edge_deleted(source_id: str, edge_type: str, target_id: str, source: Optional[str] = None) -> Change:
+    return {
+        "op": "deleted",
+        "kind": "edge",
+        "id": edge_key(source_id, edge_type, target_id),
+        "data": {"source_id": source_id, "target_id": target_id, "type": edge_type, "source": source},
+    }
+
+
+def edge_key(source_id: str, edge_type: str, target_id: str) -> str:
+    return f"{source_id}|{edge_type.lower()}|{target_id}"
+
+
+class GraphChangesRepository:
+    """Bounded change log of node and edge writes in a Redis Stream.
+
+    Every change gets the next value of ``graph:changes:seq`` as its
+    sequence number (stream id ``<seq>-0``). The stream is trimmed to about
+    ``graph_changes_max_len`` entries, so readers whose cursor falls behind
+    the oldest entry have to resync. Writes whose individual changes are not
+    known (bulk edge recreation) append a ``reset`` entry instead.
+    """
+
+    STREAM_KEY = "graph:changes"
+    SEQ_KEY = "graph:changes:seq"
+
+    def __init__(self) -> None:
+        self._script = None
+
+    def _append_script(self):
+        if self._script is None:
+            self._script = redis_client.sync_client.register_script(_APPEND_SCRIPT)
+        return self._script
+
+    def append(self, changes: List[Change]) -> Optional[int]:
+        """Record ``changes``; returns the last sequence number assigned."""
+        last = None
+        for start in range(0, len(changes), _APPEND_BATCH):
+            batch = changes[start:start + _APPEND_BATCH]
+            last = int(self._append_script()(
+                keys=[self.STREAM_KEY, self.SEQ_KEY],
+                args=[settings.graph_changes_max_len]
+                + [json.dumps(change, default=str) for change in batch],
+            ))
+        return last
+
+    def append_reset(self, reason: str) -> Optional[int]:
+        return self.append([{"op": "reset", "kind": "graph", "id": reason}])
+
+    def latest(self) -> int:
+        return int(redis_client.sync_client.get(self.SEQ_KEY) or 0)
+
+    def read(self, since: int, limit: int) -> Tuple[List[Tuple[int, Change]], Optional[int], int]:
+        """Up to ``limit`` changes after ``since``.
+
+        Returns ``(entries, oldest_seq, latest_seq)``; ``oldest_seq`` is
+        ``None`` when the stream is empty.
+        """
+        client = redis_client.sync_client
+        pipe = client.pipeline(transaction=True)
+        pipe.get(self.SEQ_KEY)
+        pipe.xrange(self.STREAM_KEY, "-", "+", count=1)
+        pipe.xrange(self.STREAM_KEY, f"{since + 1}-0", "+", count=limit)
+        latest, oldest, rows = pipe.execute()
+
+        oldest_seq = _seq(oldest[0][0]) if oldest else None
+        entries = [(_seq(entry_id), json.loads(fields["c"])) for entry_id, fields in rows]
+        return entries, oldest_seq, int(latest or 0)
+
+
+def _seq(entry_id: str) -> int:
+    return int(entry_id.split("-", 1)[0])
+
+
+graph_changes_repo = GraphChangesRepository()
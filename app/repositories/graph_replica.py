@@ -0,0 +1,737 @@
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.models.traversal import TraversalRule, TraversalStep
+from app.repositories.graph_version_repo import graph_version_repo
+
+log = logging.getLogger(__name__)
+
+# Node fields kept in dedicated columns or not served by graph reads
+_NODE_FIXED = frozenset({
+    "id", "type", "name", "status", "environment",
+    "source", "created_at", "updated_at", "last_seen_at",
+})
+# Node fields the upsert query sets explicitly instead of merging
+_NODE_UPSERT_FIXED = frozenset({
+    "id", "type", "name", "description", "tags",
+    "environment", "status", "created_at", "updated_at",
+})
+_EDGE_FIXED = frozenset({
+    "source_id", "target_id", "type", "status",
+    "source", "first_seen", "last_seen", "weight",
+})
+_IMPACT_DIRECTIONS = {"downstream": "out", "upstream": "in", "both": "both"}
+_STEP_DIRECTIONS = {"outgoing": "out", "incoming": "in", "any": "both"}
+
+# Pending (unsorted) edges are folded into the CSR arrays past this size
+_COMPACT_MIN_PENDING = 50_000
+_COMPACT_PENDING_RATIO = 0.1
+
+_EMPTY_IDS = np.zeros(0, dtype=np.int32)
+_EMPTY_PTR = np.zeros(1, dtype=np.int64)
+
+ReplicaRows = Iterable[Tuple[str, Dict[str, Any]]]
+
+
+class _StringTable:
+    """Interns low-cardinality strings (types, statuses) to int codes; 0 is ``None``."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self) -> None:
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[Optional[str], int] = {None: 0}
+
+    def code(self, value: Any) -> int:
+        if value is not None and not isinstance(value, str):
+            value = str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def find(self, values: Iterable[str]) -> np.ndarray:
+        return np.array([self.codes[v] for v in values if v in self.codes], dtype=np.int32)
+
+
+class _IntColumn:
+    """Growable int32 NumPy column."""
+
+    __slots__ = ("data", "size")
+
+    def __init__(self) -> None:
+        self.data = np.zeros(1024, dtype=np.int32)
+        self.size = 0
+
+    def append(self, value: int) -> int:
+        if self.size == len(self.data):
+            grown = np.zeros(len(self.data) * 2, dtype=np.int32)
+            grown[:self.size] = self.data
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+        return self.size - 1
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+
+class _Adjacency:
+    """CSR adjacency of one edge type in one direction.
+
+    Only nodes with edges get a row (``row_nodes`` is sorted), so memory is
+    proportional to edges, not nodes x edge types. Rows are sorted by
+    neighbor for lookups. Edges added after the last build sit in
+    ``pending`` until the next compaction.
+    """
+
+    __slots__ = ("row_nodes", "indptr", "neighbors", "edges", "pending")
+
+    def __init__(
+        self,
+        row_nodes: np.ndarray = _EMPTY_IDS,
+        indptr: np.ndarray = _EMPTY_PTR,
+        neighbors: np.ndarray = _EMPTY_IDS,
+        edges: np.ndarray = _EMPTY_IDS,
+    ) -> None:
+        self.row_nodes = row_nodes
+        self.indptr = indptr
+        self.neighbors = neighbors
+        self.edges = edges
+        self.pending: Dict[int, List[Tuple[int, int]]] = {}
+
+    @classmethod
+    def build(cls, keys: np.ndarray, neighbors: np.ndarray, edges: np.ndarray) -> "_Adjacency":
+        order = np.lexsort((neighbors, keys))
+        sorted_keys = keys[order]
+        row_nodes, starts = np.unique(sorted_keys, return_index=True)
+        indptr = np.append(starts, len(sorted_keys)).astype(np.int64)
+        return cls(
+            row_nodes.astype(np.int32),
+            indptr,
+            neighbors[order].astype(np.int32),
+            edges[order].astype(np.int32),
+        )
+
+    def _row(self, node: int) -> Tuple[int, int]:
+        i = int(np.searchsorted(self.row_nodes, node))
+        if i < len(self.row_nodes) and self.row_nodes[i] == node:
+            return int(self.indptr[i]), int(self.indptr[i + 1])
+        return 0, 0
+
+    def find(self, node: int, neighbor: int) -> Optional[int]:
+        start, end = self._row(node)
+        if end > start:
+            i = start + int(np.searchsorted(self.neighbors[start:end], neighbor))
+            if i < end and self.neighbors[i] == neighbor:
+                return int(self.edges[i])
+        for pending_neighbor, edge in self.pending.get(node, ()):
+            if pending_neighbor == neighbor:
+                return edge
+        return None
+
+    def add(self, node: int, neighbor: int, edge: int) -> None:
+        self.pending.setdefault(node, []).append((neighbor, edge))
+
+    def expand(self, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(origin, neighbor, edge)`` arrays for every edge leaving ``frontier``."""
+        origins: List[np.ndarray] = []
+        neighbors: List[np.ndarray] = []
+        edges: List[np.ndarray] = []
+
+        if len(self.row_nodes) and len(frontier):
+            idx = np.minimum(np.searchsorted(self.row_nodes, frontier), len(self.row_nodes) - 1)
+            hit = self.row_nodes[idx] == frontier
+            rows = idx[hit]
+            starts = self.indptr[rows]
+            counts = self.indptr[rows + 1] - starts
+            total = int(counts.sum())
+            if total:
+                positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+                origins.append(np.repeat(frontier[hit], counts))
+                neighbors.append(self.neighbors[positions])
+                edges.append(self.edges[positions])
+
+        if self.pending:
+            extra = [
+                (node, neighbor, edge)
+                for node in set(frontier.tolist()).intersection(self.pending)
+                for neighbor, edge in self.pending[node]
+            ]
+            if extra:
+                columns = np.array(extra, dtype=np.int32).T
+                origins.append(columns[0])
+                neighbors.append(columns[1])
+                edges.append(columns[2])
+
+        if not origins:
+            return _EMPTY_IDS, _EMPTY_IDS, _EMPTY_IDS
+        return np.concatenate(origins), np.concatenate(neighbors), np.concatenate(edges)
+
+    def nbytes(self) -> int:
+        pending = sum(sys.getsizeof(v) + 64 * len(v) for v in self.pending.values())
+        return (
+            self.row_nodes.nbytes + self.indptr.nbytes + self.neighbors.nbytes
+            + self.edges.nbytes + sys.getsizeof(self.pending) + pending
+        )
+
+
+def _expand_all(adjacencies: List[_Adjacency], frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    parts = [adjacency.expand(frontier) for adjacency in adjacencies]
+    parts = [part for part in parts if len(part[0])]
+    if not parts:
+        return _EMPTY_IDS, _EMPTY_IDS, _EMPTY_IDS
+    if len(parts) == 1:
+        return parts[0]
+    return tuple(np.concatenate(column) for column in zip(*parts))  # type: ignore[return-value]
+
+
+class _ReplicaState:
+    """One loaded copy of the graph.
+
+    Node ids are interned to dense ints. Type, status and environment are
+    int-coded columns; other properties are sparse per-property columns.
+    Edges are parallel int columns (source, target, type, status) indexed
+    by ordinal, with CSR adjacency per edge type and direction on top.
+    """
+
+    def __init__(self) -> None:
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.strings = _StringTable()
+        self.node_type = _IntColumn()
+        self.node_status = _IntColumn()
+        self.node_env = _IntColumn()
+        self.names: List[Optional[str]] = []
+        self.columns: Dict[str, Dict[int, Any]] = {}
+
+        self.edge_types = _StringTable()
+        self.src = _IntColumn()
+        self.dst = _IntColumn()
+        self.etype = _IntColumn()
+        self.estatus = _IntColumn()
+        self.edge_props: Dict[int, Dict[str, Any]] = {}
+        self.out: Dict[int, _Adjacency] = {}
+        self.inc: Dict[int, _Adjacency] = {}
+        self.pending = 0
+
+    # -- writes ---------------------------------------------------------
+
+    def _intern(self, node_id: str) -> int:
+        i = self.index.get(node_id)
+        if i is None:
+            i = len(self.ids)
+            self.ids.append(node_id)
+            self.index[node_id] = i
+            self.names.append(None)
+            self.node_type.append(0)
+            self.node_status.append(0)
+            self.node_env.append(0)
+        return i
+
+    def _set_column(self, key: str, i: int, value: Any) -> None:
+        if value is None:
+            column = self.columns.get(key)
+            if column is not None:
+                column.pop(i, None)
+        else:
+            self.columns.setdefault(key, {})[i] = value
+
+    def _set_node(self, row: Dict[str, Any], name: Any, status: Any, skip: frozenset) -> int:
+        node_id = row["id"]
+        i = self._intern(node_id)
+        self.node_type.data[i] = self.strings.code(row.get("type"))
+        self.node_status.data[i] = self.strings.code(status)
+        self.node_env.data[i] = self.strings.code(row.get("environment"))
+        self.names[i] = None if name is None or name == node_id else name
+        for key, value in row.items():
+            if key not in skip:
+                self._set_column(key, i, value)
+        return i
+
+    def load_node(self, row: Dict[str, Any]) -> None:
+        self._set_node(row, row.get("name"), row.get("status"), _NODE_FIXED)
+
+    def upsert_node(self, raw: Dict[str, Any]) -> None:
+        """Apply one node the way ``neo4j_repo.upsert_nodes`` stores it."""
+        data = {k: v for k, v in raw.items() if v is not None}
+        i = self._set_node(data, data.get("name"), data.get("status", "active"), _NODE_UPSERT_FIXED)
+        tags = data.get("tags")
+        self._set_column("description", i, data.get("description"))
+        self._set_column("tags", i, str(tags) if tags else None)
+
+    def _append_edge(self, source: int, target: int, edge_type: int) -> int:
+        self.src.append(source)
+        self.dst.append(target)
+        self.etype.append(edge_type)
+        return self.estatus.append(0)
+
+    def _set_edge_props(self, edge: int, status: Any, props: Dict[str, Any]) -> None:
+        self.estatus.data[edge] = self.strings.code(status)
+        if props:
+            self.edge_props.setdefault(edge, {}).update(props)
+
+    def load_edge(self, row: Dict[str, Any]) -> None:
+        source = self.index.get(row["source_id"])
+        target = self.index.get(row["target_id"])
+        if source is None or target is None:
+            return
+        edge = self._append_edge(source, target, self.edge_types.code(row["type"]))
+        props = {k: v for k, v in row.items() if k not in _EDGE_FIXED and v is not None}
+        self._set_edge_props(edge, row.get("status"), props)
+
+    def upsert_edge(self, raw: Dict[str, Any]) -> None:
+        """Apply one edge the way ``neo4j_repo.upsert_edges`` merges it."""
+        data = {k: v for k, v in raw.items() if v is not None}
+        source = self.index.get(data["source_id"])
+        target = self.index.get(data["target_id"])
+        if source is None or target is None:
+            return
+
+        edge_type = self.edge_types.code(data["type"].upper())
+        out = self.out.setdefault(edge_type, _Adjacency())
+        edge = out.find(source, target)
+        if edge is None:
+            edge = self._append_edge(source, target, edge_type)
+            out.add(source, target, edge)
+            self.inc.setdefault(edge_type, _Adjacency()).add(target, source, edge)
+            self.pending += 1
+
+        props = {k: v for k, v in data.items() if k not in _EDGE_FIXED}
+        self._set_edge_props(edge, data.get("status", "active"), props)
+
+        if self.pending > max(_COMPACT_MIN_PENDING, _COMPACT_PENDING_RATIO * self.src.size):
+            self.compact()
+
+    def compact(self) -> None:
+        """Rebuild every CSR adjacency from the edge columns."""
+        src, dst, etype = self.src.view(), self.dst.view(), self.etype.view()
+        ordinals = np.arange(len(src), dtype=np.int32)
+        self.out, self.inc = {}, {}
+        for edge_type in np.unique(etype).tolist():
+            mask = etype == edge_type
+            sources, targets, edges = src[mask], dst[mask], ordinals[mask]
+            self.out[edge_type] = _Adjacency.build(sources, targets, edges)
+            self.inc[edge_type] = _Adjacency.build(targets, sources, edges)
+        self.pending = 0
+
+    # -- reads ----------------------------------------------------------
+
+    def node_row(self, i: int) -> Dict[str, Any]:
+        node_id = self.ids[i]
+        values = self.strings.values
+        row: Dict[str, Any] = {
+            "id": node_id,
+            "type": values[self.node_type.data[i]],
+            "name": self.names[i] or node_id,
+            "status": values[self.node_status.data[i]],
+            "environment": values[self.node_env.data[i]],
+        }
+        for key, column in self.columns.items():
+            if i in column:
+                row[key] = column[i]
+        return row
+
+    def edge_row(self, edge: int) -> Dict[str, Any]:
+        row: Dict[str, Any] = {
+            "source_id": self.ids[self.src.data[edge]],
+            "target_id": self.ids[self.dst.data[edge]],
+            "type": self.edge_types.values[self.etype.data[edge]],
+            "status": self.strings.values[self.estatus.data[edge]],
+        }
+        row.update(self.edge_props.get(edge, ()))
+        return row
+
+    def adjacencies(self, direction: str, edge_types: Optional[List[str]]) -> List[_Adjacency]:
+        if edge_types:
+            codes = self.edge_types.find(t.upper() for t in edge_types).tolist()
+        else:
+            codes = list(self.out)
+        result: List[_Adjacency] = []
+        if direction in ("out", "both"):
+            result.extend(self.out[c] for c in codes if c in self.out)
+        if direction in ("in", "both"):
+            result.extend(self.inc[c] for c in codes if c in self.inc)
+        return result
+
+    def _sorted_by_id(self, nodes: np.ndarray) -> List[int]:
+        return sorted(nodes.tolist(), key=self.ids.__getitem__)
+
+    def expand(
+        self,
+        start_id: str,
+        depth: int,
+        direction: str = "both",
+        edge_types: Optional[List[str]] = None,
+        node_types: Optional[List[str]] = None,
+        max_nodes: Optional[int] = None,
+    ) -> Tuple[Dict[int, int], List[int]]:
+        """Same BFS as ``neo4j_repo._expand_frontier_tx``, one vectorized pass per hop.
+
+        Returns ``{node: hop}`` in discovery order and edge ordinals.
+        """
+        start = self.index.get(start_id)
+        if start is None:
+            return {}, []
+
+        adjacencies = self.adjacencies(direction, edge_types)
+        allowed = self.strings.find(node_types) if node_types else None
+        visited = np.zeros(len(self.ids), dtype=bool)
+        visited[start] = True
+        hops: Dict[int, int] = {start: 0}
+        edges: Dict[int, None] = {}
+        frontier = np.array([start], dtype=np.int32)
+
+        for hop in range(1, depth + 1):
+            if not len(frontier) or (max_nodes is not None and len(hops) >= max_nodes):
+                break
+
+            _, neighbors, ordinals = _expand_all(adjacencies, frontier)
+            if allowed is not None:
+                keep = np.isin(self.node_type.data[neighbors], allowed)
+                neighbors, ordinals = neighbors[keep], ordinals[keep]
+
+            discovered = self._sorted_by_id(np.unique(neighbors[~visited[neighbors]]))
+            if max_nodes is not None:
+                discovered = discovered[:max(0, max_nodes - len(hops))]
+            for node in discovered:
+                hops[node] = hop
+            visited[discovered] = True
+
+            edges.update(dict.fromkeys(ordinals[visited[neighbors]].tolist()))
+            frontier = np.array(discovered, dtype=np.int32)
+
+        return hops, list(edges)
+
+    def shortest_path(self, source_id: str, target_id: str, max_depth: int) -> Tuple[List[int], List[int]]:
+        """Undirected BFS over every edge type, like Cypher ``shortestPath``."""
+        source = self.index.get(source_id)
+        target = self.index.get(target_id)
+        if source is None or target is None:
+            return [], []
+        if source == target:
+            return [source], []
+
+        adjacencies = self.adjacencies("both", None)
+        visited = np.zeros(len(self.ids), dtype=bool)
+        visited[source] = True
+        parent_node = np.zeros(len(self.ids), dtype=np.int32)
+        parent_edge = np.zeros(len(self.ids), dtype=np.int32)
+        frontier = np.array([source], dtype=np.int32)
+
+        for _ in range(max_depth):
+            if not len(frontier) or visited[target]:
+                break
+            origins, neighbors, ordinals = _expand_all(adjacencies, frontier)
+            fresh = ~visited[neighbors]
+            frontier, first = np.unique(neighbors[fresh], return_index=True)
+            parent_node[frontier] = origins[fresh][first]
+            parent_edge[frontier] = ordinals[fresh][first]
+            visited[frontier] = True
+
+        if not visited[target]:
+            return [], []
+
+        nodes, edges = [target], []
+        while nodes[-1] != source:
+            edges.append(int(parent_edge[nodes[-1]]))
+            nodes.append(int(parent_node[nodes[-1]]))
+        return nodes[::-1], edges[::-1]
+
+    def _step(self, current: np.ndarray, step: TraversalStep) -> np.ndarray:
+        """Nodes whose BFS level from ``current`` is within the step's depth range.
+
+        Levels are shortest hop distances rather than Cypher's enumeration of
+        every relationship-unique path, which is what makes this cheap.
+        """
+        adjacencies = self.adjacencies(_STEP_DIRECTIONS[step.direction], step.edge_types)
+        allowed = self.strings.find(step.target_node_types) if step.target_node_types else None
+        visited = np.zeros(len(self.ids), dtype=bool)
+        found: List[np.ndarray] = []
+        frontier = current
+
+        for level in range(1, step.max_depth + 1):
+            if not len(frontier):
+                break
+            _, neighbors, _ = _expand_all(adjacencies, frontier)
+            frontier = np.unique(neighbors[~visited[neighbors]])
+            visited[frontier] = True
+            if level >= step.min_depth:
+                found.append(frontier)
+
+        if not found:
+            return _EMPTY_IDS
+        result = np.concatenate(found)
+        if allowed is not None:
+            result = result[np.isin(self.node_type.data[result], allowed)]
+        return result
+
+    def traverse(self, rule: TraversalRule) -> Tuple[List[int], List[int]]:
+        if rule.start_node_id:
+            start = self.index.get(rule.start_node_id)
+            current = np.array([] if start is None else [start], dtype=np.int32)
+        elif rule.start_node_types:
+            codes = self.strings.find(rule.start_node_types)
+            current = np.nonzero(np.isin(self.node_type.view(), codes))[0].astype(np.int32)
+        else:
+            return [], []
+
+        selected: Dict[int, None] = dict.fromkeys(current.tolist())
+        for step in rule.steps:
+            if not len(current):
+                break
+            current = self._step(current, step)
+            selected.update(dict.fromkeys(current.tolist()))
+
+        nodes = list(selected)[:rule.limit]
+        if not nodes:
+            return [], []
+
+        members = np.zeros(len(self.ids), dtype=bool)
+        members[nodes] = True
+        _, neighbors, ordinals = _expand_all(
+            self.adjacencies("out", None), np.array(nodes, dtype=np.int32),
+        )
+        return nodes, np.unique(ordinals[members[neighbors]]).tolist()
+
+    def memory_bytes(self) -> int:
+        """Approximate footprint: NumPy buffers plus the Python containers."""
+        columns = (self.node_type, self.node_status, self.node_env,
+                   self.src, self.dst, self.etype, self.estatus)
+        total = sum(column.data.nbytes for column in columns)
+        total += sum(a.nbytes() for a in (*self.out.values(), *self.inc.values()))
+        total += sys.getsizeof(self.ids) + sys.getsizeof(self.index) + sys.getsizeof(self.names)
+        total += sum(sys.getsizeof(node_id) for node_id in self.ids)
+        total += sum(sys.getsizeof(name) for name in self.names if name is not None)
+        for column in self.columns.values():
+            total += sys.getsizeof(column) + sum(sys.getsizeof(v) for v in column.values())
+        total += sys.getsizeof(self.edge_props)
+        total += sum(sys.getsizeof(props) for props in self.edge_props.values())
+        return total
+
+
+class GraphReplica:
+    """Optional in-process copy of the resource graph for traversal reads.
+
+    Loaded from a Neo4j scan in a background thread and kept current by the
+    upsert path. Writes that cannot be replayed cheaply (deletes, bulk edge
+    recreation) drop the copy; the next read falls back to Neo4j and starts
+    a reload. Each local write records the ``graph:version`` it produced,
+    so writes made by other processes show up as a version gap: once that
+    gap persists past ``graph_replica_max_lag_seconds`` the copy is reloaded.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._state: Optional[_ReplicaState] = None
+        self._version = 0
+        self._ahead: Set[int] = set()
+        self._behind_since: Optional[float] = None
+        self._loading = False
+        self._stale_load = False
+        self._backlog: List[Tuple[str, List[Dict[str, Any]], int]] = []
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.graph_backend == "replica"
+
+    @property
+    def ready(self) -> bool:
+        return self._state is not None
+
+    # -- loading --------------------------------------------------------
+
+    def load(self, rows: ReplicaRows, version: int = 0) -> None:
+        """Build a fresh copy from ``("node"|"edge", row)`` pairs and swap it in."""
+        with self._lock:
+            self._loading = True
+            self._stale_load = False
+            self._backlog = []
+
+        try:
+            state = _ReplicaState()
+            for kind, row in rows:
+                if kind == "node":
+                    state.load_node(row)
+                else:
+                    state.load_edge(row)
+            state.compact()
+        except Exception:
+            with self._lock:
+                self._loading = False
+                self._backlog = []
+            raise
+
+        with self._lock:
+            self._version = version
+            self._ahead = set()
+            self._behind_since = None
+            for kind, items, item_version in self._backlog:
+                self._apply(state, kind, items)
+                self._advance(item_version)
+            self._backlog = []
+            self._loading = False
+            self._state = None if self._stale_load else state
+            self.loaded_at = time.time()
+        log.info(
+            f"Graph replica loaded: {len(state.ids)} nodes, {state.src.size} edges, "
+            f"~{state.memory_bytes() / 2**20:.1f} MiB"
+        )
+
+    def _load_from(self, loader: Callable[[], ReplicaRows]) -> None:
+        try:
+            self.load(loader(), graph_version_repo.current())
+        except Exception as e:
+            log.error(f"Graph replica load failed: {e}")
+
+    def reload_in_background(self, loader: Callable[[], ReplicaRows]) -> None:
+        """Start ``load(loader())`` in a thread unless a copy is loaded or loading."""
+        with self._lock:
+            if self._loading or self._state is not None:
+                return
+            self._loading = True
+        threading.Thread(
+            target=self._load_from, args=(loader,), name="graph-replica-load", daemon=True,
+        ).start()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._state = None
+            if self._loading:
+                self._stale_load = True
+        log.debug("Graph replica invalidated")
+
+    # -- write path -----------------------------------------------------
+
+    @staticmethod
+    def _apply(state: _ReplicaState, kind: str, items: List[Dict[str, Any]]) -> None:
+        if kind == "nodes":
+            for raw in items:
+                state.upsert_node(raw)
+        elif kind == "edges":
+            for raw in items:
+                state.upsert_edge(raw)
+
+    def _advance(self, version: int) -> None:
+        if version > self._version:
+            self._ahead.add(version)
+        while self._version + 1 in self._ahead:
+            self._version += 1
+            self._ahead.discard(self._version)
+
+    def _record(self, kind: str, items: List[Dict[str, Any]], version: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._loading:
+                self._backlog.append((kind, items, version))
+            if self._state is not None:
+                self._apply(self._state, kind, items)
+                self._advance(version)
+
+    def record_nodes(self, nodes: List[Dict[str, Any]], version: int) -> None:
+        self._record("nodes", nodes, version)
+
+    def record_edges(self, edges: List[Dict[str, Any]], version: int) -> None:
+        self._record("edges", edges, version)
+
+    def record_version(self, version: int) -> None:
+        """Note a local write that does not change nodes or edges."""
+        self._record("version", [], version)
+
+    def is_current(self, version: int) -> bool:
+        """Whether the copy reflects ``version``; drops it once it lags for too long."""
+        with self._lock:
+            if self._state is None:
+                return False
+            if version == self._version:
+                self._behind_since = None
+                return True
+
+            now = time.monotonic()
+            if self._behind_since is None:
+                self._behind_since = now
+            elif now - self._behind_since > settings.graph_replica_max_lag_seconds:
+                log.info(f"Graph replica at version {self._version} lags {version}, reloading")
+                self._state = None
+            return False
+
+    # -- reads (same signatures as neo4j_repo) --------------------------
+
+    def _snapshot(self) -> _ReplicaState:
+        state = self._state
+        if state is None:
+            raise RuntimeError("Graph replica is not loaded")
+        return state
+
+    def get_subgraph(self, center_id: str, depth: int = 2,
+                     node_types: Optional[List[str]] = None,
+                     edge_types: Optional[List[str]] = None,
+                     max_nodes: Optional[int] = None) -> Tuple[List[Dict], List[Dict]]:
+        with self._lock:
+            state = self._snapshot()
+            hops, edges = state.expand(center_id, depth, "both", edge_types, node_types, max_nodes)
+            return [state.node_row(i) for i in hops], [state.edge_row(e) for e in edges]
+
+    def find_shortest_path(self, source_id: str, target_id: str,
+                           max_depth: int = 5) -> Tuple[List[Dict], List[Dict]]:
+        with self._lock:
+            state = self._snapshot()
+            nodes, edges = state.shortest_path(source_id, target_id, max_depth)
+            return [state.node_row(i) for i in nodes], [state.edge_row(e) for e in edges]
+
+    def get_impact(self, node_id: str, depth: int = 3,
+                   direction: str = "downstream",
+                   max_nodes: Optional[int] = None) -> Tuple[List[Dict], List[Dict]]:
+        with self._lock:
+            state = self._snapshot()
+            hops, edges = state.expand(
+                node_id, depth, _IMPACT_DIRECTIONS.get(direction, "both"), max_nodes=max_nodes,
+            )
+            nodes = []
+            for i, hop in hops.items():
+                node = state.node_row(i)
+                node["hop_distance"] = hop
+                nodes.append(node)
+            return nodes, [state.edge_row(e) for e in edges]
+
+    def execute_traversal(self, rule: TraversalRule) -> Tuple[List[Dict], List[Dict]]:
+        with self._lock:
+            state = self._snapshot()
+            nodes, edges = state.traverse(rule)
+            return [state.node_row(i) for i in nodes], [state.edge_row(e) for e in edges]
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._state
+            info: Dict[str, Any] = {
+                "enabled": self.enabled,
+                "ready": state is not None,
+                "loading": self._loading,
+                "version": self._version,
+                "loaded_at": self.loaded_at,
+            }
+            if state is not None:
+                memory = state.memory_bytes()
+                info.update(
+                    nodes=len(state.ids),
+                    edges=state.src.size,
+                    pending_edges=state.pending,
+                    memory_bytes=memory,
+                    bytes_per_edge=round(memory / state.src.size, 1) if state.src.size else None,
+                )
+            return info
+
+
+graph_replica = GraphReplica()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from typing import Dict, Optional
+
+from app.repositories.redis_connection import redis_client
+
+log = logging.getLogger(__name__)
+
+COUNTERS = ("nodes_by_type", "nodes_by_source", "edges_by_type", "edges_by_source")
+
+StatsDelta = Dict[str, Counter]
+
+
+def empty_delta() -> StatsDelta:
+    return {name: Counter() for name in COUNTERS}
+
+
+class GraphStatsRepository:
+    """Node and edge counts by type and by source, kept in Redis hashes.
+
+    Write paths apply deltas once their Neo4j transaction has committed;
+    ``replace`` installs a full recount. Until the first recount the
+    counters are not trusted and ``read`` returns ``None``.
+    """
+
+    PREFIX = "graph:stats:"
+    READY_KEY = "graph:stats:ready"
+
+    def _key(self, name: str) -> str:
+        return f"{self.PREFIX}{name}"
+
+    def apply(self, delta: StatsDelta) -> None:
+        pipe = redis_client.sync_client.pipeline(transaction=True)
+        queued = False
+        for name, counter in delta.items():
+            for field, change in counter.items():
+                if change:
+                    pipe.hincrby(self._key(name), field, change)
+                    queued = True
+        if queued:
+            pipe.execute()
+
+    def read(self) -> Optional[Dict[str, Dict[str, int]]]:
+        client = redis_client.sync_client
+        pipe = client.pipeline(transaction=True)
+        pipe.exists(self.READY_KEY)
+        for name in COUNTERS:
+            pipe.hgetall(self._key(name))
+        ready, *hashes = pipe.execute()
+        if not ready:
+            return None
+
+        return {
+            name: {field: int(value) for field, value in values.items() if int(value) > 0}
+            for name, values in zip(COUNTERS, hashes)
+        }
+
+    def replace(self, counts: Dict[str, Dict[str, int]]) -> None:
+        pipe = redis_client.sync_client.pipeline(transaction=True)
+        for name in COUNTERS:
+            pipe.delete(self._key(name))
+            if counts.get(name):
+                pipe.hset(self._key(name), mapping=counts[name])
+        pipe.set(self.READY_KEY, 1)
+        pipe.execute()
+
+    def invalidate(self) -> None:
+        """Force the next read to recount, for writes that cannot compute a delta."""
+        redis_client.sync_client.delete(self.READY_KEY)
+
+
+graph_stats_repo = GraphStatsRepository()
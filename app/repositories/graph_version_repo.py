@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List
+
+from app.repositories.redis_connection import redis_client
+
+
+class GraphVersionRepository:
+    """Monotonic counter bumped by every write to the resource graph.
+
+    Read caches key on it, so a bump invalidates every cached response
+    across all API processes at once. A second counter moves only when
+    nodes are deleted and one per node type only when an existing node of
+    that type changes an indexed value, for in-process caches that survive
+    other writes.
+    """
+
+    KEY = "graph:version"
+    DELETIONS_KEY = "graph:deletions"
+    NODE_CHANGES_PREFIX = "graph:node_changes:"
+
+    def current(self) -> int:
+        return int(redis_client.sync_client.get(self.KEY) or 0)
+
+    def bump(self) -> int:
+        return redis_client.sync_client.incr(self.KEY)
+
+    def deletions(self) -> int:
+        return int(redis_client.sync_client.get(self.DELETIONS_KEY) or 0)
+
+    def bump_deletions(self) -> int:
+        return redis_client.sync_client.incr(self.DELETIONS_KEY)
+
+    def node_changes(self, node_types: List[str]) -> List[int]:
+        if not node_types:
+            return []
+        keys = [f"{self.NODE_CHANGES_PREFIX}{node_type}" for node_type in node_types]
+        return [int(value or 0) for value in redis_client.sync_client.mget(keys)]
+
+    def bump_node_changes(self, node_types: Iterable[str]) -> Dict[str, int]:
+        node_types = sorted(set(node_types))
+        pipe = redis_client.sync_client.pipeline(transaction=False)
+        for node_type in node_types:
+            pipe.incr(f"{self.NODE_CHANGES_PREFIX}{node_type}")
+        return dict(zip(node_types, pipe.execute()))
+
+
+graph_version_repo = GraphVersionRepository()
@@ -32,6 +32,7 @@ class MappingRepository:
             "created_by": mapping.created_by,
             "description": mapping.description,
             "sample_chunk_id": mapping.sample_chunk_id,
+            "iterate_path": mapping.iterate_path,
             "field_mappings": json.dumps([
                 self._dump_model_or_dict(fm) for fm in mapping.field_mappings
             ]),
@@ -70,6 +71,7 @@ class MappingRepository:
             created_by=data.get("created_by", "system"),
             description=data.get("description"),
             sample_chunk_id=data.get("sample_chunk_id"),
+            iterate_path=data.get("iterate_path"),
             field_mappings=field_mappings,
             conditional_rules=conditional_rules,
             auto_edge_rules=auto_edge_rules,
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
 import logging
+from typing import List
+
 from neo4j import GraphDatabase, Driver
 
 from app.config import settings
 
 log = logging.getLogger(__name__)
 
+SEARCH_INDEX = "resource_search_idx"
+
+
+def search_index_properties() -> List[str]:
+    extra = [p for p in settings.graph_search_properties if p not in ("name", "external_id", "type")]
+    return ["name", "external_id", "type", *dict.fromkeys(extra)]
+
 
 class Neo4jConnection:
     def __init__(self) -> None:
@@ -47,8 +56,36 @@ class Neo4jConnection:
                 "CREATE INDEX resource_status_idx IF NOT EXISTS "
                 "FOR (r:Resource) ON (r.status)"
             )
+            session.run(
+                "CREATE INDEX resource_type_updated_idx IF NOT EXISTS "
+                "FOR (r:Resource) ON (r.type, r.updated_at)"
+            )
+            session.run(
+                "CREATE INDEX resource_name_idx IF NOT EXISTS "
+                "FOR (r:Resource) ON (r.name)"
+            )
+            self._ensure_search_index(session)
             log.info("Neo4j indexes / constraints ensured")
 
+    def _ensure_search_index(self, session) -> None:
+        """Full-text index behind ``/graph/search``; recreated when
+        ``graph_search_properties`` changes."""
+        properties = search_index_properties()
+        record = session.run(
+            "SHOW FULLTEXT INDEXES YIELD name, properties "
+            "WHERE name = $name RETURN properties",
+            name=SEARCH_INDEX,
+        ).single()
+        if record is not None and sorted(record["properties"]) != sorted(properties):
+            session.run(f"DROP INDEX {SEARCH_INDEX} IF EXISTS")
+            log.info("Search index properties changed, rebuilding %s", SEARCH_INDEX)
+
+        fields = ", ".join(f"r.`{p}`" for p in properties)
+        session.run(
+            f"CREATE FULLTEXT INDEX {SEARCH_INDEX} IF NOT EXISTS "
+            f"FOR (r:Resource) ON EACH [{fields}] "
+            "OPTIONS {indexConfig: {`fulltext.analyzer`: 'standard-no-stop-words'}}"
+        )
 
     def session(self, **kwargs):
         """Shortcut to open a session with the current driver."""
@@ -1,12 +1,26 @@
 from __future__ import annotations
 
 import logging
+import re
+from collections import Counter
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 from neo4j import ManagedTransaction
 
-from app.repositories.neo4j_connection import neo4j_driver
+from app.repositories.graph_changes_repo import (
+    Change,
+    edge_deleted,
+    edge_upserted,
+    graph_changes_repo,
+    node_deleted,
+    node_upserted,
+)
+from app.repositories.graph_replica import graph_replica
+from app.repositories.graph_stats_repo import StatsDelta, empty_delta, graph_stats_repo
+from app.repositories.graph_version_repo import graph_version_repo
+from app.repositories.neo4j_connection import SEARCH_INDEX, neo4j_driver, search_index_properties
+from app.repositories.node_lookup_index import node_lookup_index
 
 log = logging.getLogger(__name__)
 
@@ -24,23 +38,70 @@ def _strip_none(d: Dict[str, Any]) -> Dict[str, Any]:
     return {k: v for k, v in d.items() if v is not None}
 
 
+def _stats_key(value: Any) -> str:
+    return str(value or "unknown")
+
+
 def upsert_nodes(nodes: List[Dict[str, Any]], source: str) -> int:
     now = _now_iso()
     with neo4j_driver.session() as session:
-        count = session.execute_write(_upsert_nodes_tx, nodes, source, now)
+        count, delta, node_changes, changed_types = session.execute_write(
+            _upsert_nodes_tx, nodes, source, now,
+        )
+    if changed_types:
+        node_lookup_index.advance(graph_version_repo.bump_node_changes(changed_types))
+    node_lookup_index.record_nodes(nodes)
+    if count:
+        graph_stats_repo.apply(delta)
+        graph_changes_repo.append(node_changes)
+        graph_replica.record_nodes(nodes, graph_version_repo.bump())
     return count
 
 
-def _upsert_nodes_tx(tx: ManagedTransaction, nodes: List[Dict], source: str, now: str) -> int:
+def _count_node_upsert(delta: StatsDelta, record: Any, node_type: str, source: str) -> None:
+    if record is None:
+        return
+    if record["created"]:
+        delta["nodes_by_type"][_stats_key(node_type)] += 1
+        delta["nodes_by_source"][_stats_key(source)] += 1
+        return
+    if record["old_type"] != node_type:
+        delta["nodes_by_type"][_stats_key(record["old_type"])] -= 1
+        delta["nodes_by_type"][_stats_key(node_type)] += 1
+    if record["old_source"] != source:
+        delta["nodes_by_source"][_stats_key(record["old_source"])] -= 1
+        delta["nodes_by_source"][_stats_key(source)] += 1
+
+
+def _indexed_values(data: Dict[str, Any], name: str, props: Dict[str, Any]) -> Dict[str, Any]:
+    """Written fields a node lookup index may hold: the string properties
+    and the fixed fields (``None`` too, as writing it clears the field)."""
+    values = {k: v for k, v in props.items() if isinstance(v, str)}
+    values.update(name=name, description=data.get("description"), environment=data.get("environment"))
+    return values
+
+
+def _upsert_nodes_tx(
+    tx: ManagedTransaction, nodes: List[Dict], source: str, now: str,
+) -> Tuple[int, StatsDelta, List[Change], Set[str]]:
+    """Also returns the types whose existing nodes changed an indexed value
+    (or their type), for ``graph_version_repo.bump_node_changes``."""
     count = 0
+    delta = empty_delta()
+    node_changes: List[Change] = []
+    changed_types: Set[str] = set()
     for raw in nodes:
         data = _strip_none(raw)
         external_id = data["id"]
         node_type = data["type"]
         name = data.get("name", external_id)
         props = {k: v for k, v in data.items() if k not in _NODE_META_KEYS}
+        indexed = _indexed_values(data, name, props)
 
         query = (
+            "OPTIONAL MATCH (old:Resource {external_id: $external_id}) "
+            "WITH old.type AS old_type, old.source AS old_source, old IS NULL AS created, "
+            "     [key IN $indexed_keys | old[key]] AS old_values "
             "MERGE (r:Resource {external_id: $external_id}) "
             "ON CREATE SET r.created_at = $now "
             "SET r.type = $type, "
@@ -53,8 +114,9 @@ def _upsert_nodes_tx(tx: ManagedTransaction, nodes: List[Dict], source: str, now
             "    r.last_seen_at = $now, "
             "    r.source = $source, "
             "    r += $props "
-            "WITH r CALL apoc.create.addLabels(r, [$type]) YIELD node "
-            "RETURN node"
+            "WITH r, created, old_type, old_source, old_values "
+            "CALL apoc.create.addLabels(r, [$type]) YIELD node "
+            "RETURN created, old_type, old_source, old_values"
         )
 
         params = {
@@ -68,13 +130,17 @@ def _upsert_nodes_tx(tx: ManagedTransaction, nodes: List[Dict], source: str, now
             "source": source,
             "now": now,
             "props": props,
+            "indexed_keys": list(indexed),
         }
 
         try:
-            tx.run(query, **params)
+            record = tx.run(query, **params).single()
             count += 1
         except Exception:
             fallback = (
+                "OPTIONAL MATCH (old:Resource {external_id: $external_id}) "
+                "WITH old.type AS old_type, old.source AS old_source, old IS NULL AS created, "
+                "     [key IN $indexed_keys | old[key]] AS old_values "
                 "MERGE (r:Resource {external_id: $external_id}) "
                 "ON CREATE SET r.created_at = $now "
                 "SET r.type = $type, "
@@ -87,22 +153,50 @@ def _upsert_nodes_tx(tx: ManagedTransaction, nodes: List[Dict], source: str, now
                 "    r.last_seen_at = $now, "
                 "    r.source = $source, "
                 "    r += $props "
-                "RETURN r"
+                "RETURN created, old_type, old_source, old_values"
             )
-            tx.run(fallback, **params)
+            record = tx.run(fallback, **params).single()
             count += 1
-    return count
+        _count_node_upsert(delta, record, node_type, source)
+        if record is not None and not record["created"]:
+            if record["old_type"] != node_type:
+                changed_types.update({record["old_type"], node_type} - {None})
+            elif record["old_values"] != list(indexed.values()):
+                changed_types.add(node_type)
+        node_changes.append(node_upserted(
+            {**data, "name": name, "status": params["status"], "tags": params["tags"], "source": source},
+            bool(record and record["created"]),
+        ))
+    return count, delta, node_changes, changed_types
 
 
 def upsert_edges(edges: List[Dict[str, Any]], source: str) -> int:
+    return _write_edges(edges, source)[0]
+
+
+def upsert_edges_written(edges: List[Dict[str, Any]], source: str) -> Set[str]:
+    """Upsert ``edges``; returns the ``edge_key`` of each one whose endpoints
+    both exist, i.e. that was actually written."""
+    return {change["id"] for change in _write_edges(edges, source)[1]}
+
+
+def _write_edges(edges: List[Dict[str, Any]], source: str) -> Tuple[int, List[Change]]:
     now = _now_iso()
     with neo4j_driver.session() as session:
-        count = session.execute_write(_upsert_edges_tx, edges, source, now)
-    return count
+        count, delta, edge_changes = session.execute_write(_upsert_edges_tx, edges, source, now)
+    if count:
+        graph_stats_repo.apply(delta)
+        graph_changes_repo.append(edge_changes)
+        graph_replica.record_edges(edges, graph_version_repo.bump())
+    return count, edge_changes
 
 
-def _upsert_edges_tx(tx: ManagedTransaction, edges: List[Dict], source: str, now: str) -> int:
+def _upsert_edges_tx(
+    tx: ManagedTransaction, edges: List[Dict], source: str, now: str,
+) -> Tuple[int, StatsDelta, List[Change]]:
     count = 0
+    delta = empty_delta()
+    edge_changes: List[Change] = []
     for raw in edges:
         data = _strip_none(raw)
         source_id = data["source_id"]
@@ -114,6 +208,8 @@ def _upsert_edges_tx(tx: ManagedTransaction, edges: List[Dict], source: str, now
         query = (
             "MATCH (a:Resource {external_id: $source_id}) "
             "MATCH (b:Resource {external_id: $target_id}) "
+            f"OPTIONAL MATCH (a)-[existing:{edge_type}]->(b) "
+            "WITH a, b, count(existing) = 0 AS created, head(collect(existing.source)) AS old_source "
             f"MERGE (a)-[rel:{edge_type}]->(b) "
             "ON CREATE SET rel.first_seen = $now "
             "SET rel.last_seen = $now, "
@@ -121,7 +217,7 @@ def _upsert_edges_tx(tx: ManagedTransaction, edges: List[Dict], source: str, now
             "    rel.weight = $weight, "
             "    rel.source = $source, "
             "    rel += $props "
-            "RETURN rel"
+            "RETURN created, old_source"
         )
 
         params = {
@@ -134,9 +230,107 @@ def _upsert_edges_tx(tx: ManagedTransaction, edges: List[Dict], source: str, now
             "props": props,
         }
 
-        tx.run(query, **params)
+        record = tx.run(query, **params).single()
         count += 1
-    return count
+        if record is None:
+            continue
+        if record["created"]:
+            delta["edges_by_type"][edge_type] += 1
+            delta["edges_by_source"][_stats_key(source)] += 1
+        elif record["old_source"] != source:
+            delta["edges_by_source"][_stats_key(record["old_source"])] -= 1
+            delta["edges_by_source"][_stats_key(source)] += 1
+        edge_changes.append(edge_upserted(
+            {**data, "type": edge_type, "status": params["status"], "source": source}, record["created"],
+        ))
+    return count, delta, edge_changes
+
+
+def recreate_edges_for_rule(
+    source_type: str,
+    source_field: str,
+    target_type: str,
+    target_field: str,
+    edge_type: str,
+    source: str,
+    batch_size: int = 1000,
+    sources_since: Optional[str] = None,
+    targets_since: Optional[str] = None,
+) -> Dict[str, int]:
+    """Create one auto-edge rule's edges with a single set-based join.
+
+    Targets are loaded once into a ``value -> node`` map, then source nodes
+    are streamed through it in ``CALL {} IN TRANSACTIONS`` batches. List
+    valued source fields fan out to one edge per element. ``*_since``
+    restrict either side to nodes updated after that ISO timestamp. Existing
+    edges of another source are moved to ``source`` and counted as
+    ``resourced``; only new or re-sourced edges invalidate the graph. Needs
+    an auto-commit transaction, so it runs through ``session.run``.
+    """
+    target_filter = " AND t.updated_at > $targets_since" if targets_since else ""
+    source_filter = " AND s.updated_at > $sources_since" if sources_since else ""
+
+    query = (
+        "MATCH (t:Resource {type: $target_type}) "
+        f"WHERE t.`{target_field}` IS NOT NULL{target_filter} "
+        f"WITH apoc.map.fromPairs(collect([toString(t.`{target_field}`), t])) AS targets "
+        "WHERE size(keys(targets)) > 0 OR $targets_since IS NULL "
+        "MATCH (s:Resource {type: $source_type}) "
+        f"WHERE s.`{source_field}` IS NOT NULL{source_filter} "
+        "CALL { "
+        "  WITH s, targets "
+        f"  UNWIND apoc.convert.toList(s.`{source_field}`) AS raw "
+        "  WITH s, targets, toString(raw) AS value "
+        "  WHERE value <> '' "
+        "  WITH s, targets[value] AS t "
+        "  WITH s, collect(DISTINCT t) AS found, count(*) - count(t) AS unresolved "
+        "  CALL { "
+        "    WITH s, found "
+        "    UNWIND found AS t "
+        f"    OPTIONAL MATCH (s)-[existing:`{edge_type}`]->(t) "
+        "    WITH s, t, count(existing) = 0 AS is_new "
+        f"    MERGE (s)-[rel:`{edge_type}`]->(t) "
+        "    ON CREATE SET rel.first_seen = $now, rel.source = $source "
+        "    WITH rel, is_new, NOT is_new AND coalesce(rel.source, '') <> $source AS resourced "
+        "    SET rel.last_seen = $now, "
+        "        rel.status = 'active', "
+        "        rel.weight = 1.0 "
+        "    FOREACH (_ IN CASE WHEN resourced THEN [1] ELSE [] END | SET rel.source = $source) "
+        "    RETURN count(rel) AS matched, "
+        "           sum(CASE WHEN is_new THEN 1 ELSE 0 END) AS created, "
+        "           sum(CASE WHEN resourced THEN 1 ELSE 0 END) AS resourced "
+        "  } "
+        "  RETURN matched, created, resourced, unresolved "
+        "} IN TRANSACTIONS OF $batch_size ROWS "
+        "RETURN count(s) AS sources, "
+        "       coalesce(sum(matched), 0) AS matched, "
+        "       coalesce(sum(created), 0) AS created, "
+        "       coalesce(sum(resourced), 0) AS resourced, "
+        "       coalesce(sum(unresolved), 0) AS unresolved"
+    )
+
+    with neo4j_driver.session() as session:
+        record = session.run(
+            query,
+            source_type=source_type,
+            target_type=target_type,
+            source=source,
+            now=_now_iso(),
+            batch_size=batch_size,
+            sources_since=sources_since,
+            targets_since=targets_since,
+        ).single()
+
+    keys = ("sources", "matched", "created", "resourced", "unresolved")
+    if record is None:
+        return dict.fromkeys(keys, 0)
+    if record["created"] or record["resourced"]:
+        # New or re-sourced edges are not tracked one by one; recount and resync
+        graph_stats_repo.invalidate()
+        graph_replica.invalidate()
+        graph_changes_repo.append_reset("edges recreated")
+        graph_version_repo.bump()
+    return {key: record[key] for key in keys}
 
 
 def get_full_graph(limit: int = 500) -> Tuple[List[Dict], List[Dict]]:
@@ -228,58 +422,192 @@ def _read_edges_for_nodes(tx: ManagedTransaction, node_ids: List[str]) -> List[D
     return rows
 
 
+def get_nodes_page(
+    after: str = "",
+    limit: int = 500,
+    sources: Optional[List[str]] = None,
+) -> Tuple[List[Dict], List[Dict]]:
+    """Nodes ordered by ``external_id`` after ``after``, plus their outgoing edges.
+
+    Keyset pagination over the ``external_id`` constraint index; each edge
+    is returned exactly once, on the page of its source node.
+    """
+    with neo4j_driver.session() as session:
+        nodes = session.execute_read(_read_nodes_page_tx, after, limit, sources)
+        if not nodes:
+            return [], []
+        node_ids = [n["id"] for n in nodes]
+        edges = session.execute_read(_read_outgoing_edges_tx, node_ids, sources)
+    return nodes, edges
+
+
+def _read_nodes_page_tx(
+    tx: ManagedTransaction,
+    after: str,
+    limit: int,
+    sources: Optional[List[str]],
+) -> List[Dict]:
+    source_filter = "AND r.source IN $sources " if sources is not None else ""
+    result = tx.run(
+        "MATCH (r:Resource) "
+        f"WHERE r.external_id > $after {source_filter}"
+        "RETURN r ORDER BY r.external_id LIMIT $limit",
+        after=after,
+        limit=limit,
+        sources=sources,
+    )
+    return [_node_record_to_dict(record["r"]) for record in result]
+
+
+def _read_outgoing_edges_tx(
+    tx: ManagedTransaction,
+    node_ids: List[str],
+    sources: Optional[List[str]],
+) -> List[Dict]:
+    target_filter = "WHERE b.source IN $sources " if sources is not None else ""
+    result = tx.run(
+        "UNWIND $ids AS id "
+        "MATCH (a:Resource {external_id: id})-[rel]->(b:Resource) "
+        f"{target_filter}"
+        "RETURN a.external_id AS source_id, "
+        "       b.external_id AS target_id, "
+        "       type(rel) AS type, "
+        "       properties(rel) AS props",
+        ids=node_ids,
+        sources=sources,
+    )
+    return [_edge_record_to_dict(record) for record in result]
+
+
+def iter_graph(sources: Optional[List[str]] = None) -> Iterator[Tuple[str, Dict]]:
+    """Yield ``("node", dict)`` then ``("edge", dict)`` straight off the Neo4j cursor."""
+    node_filter = "WHERE r.source IN $sources " if sources is not None else ""
+    edge_filter = "WHERE a.source IN $sources AND b.source IN $sources " if sources is not None else ""
+
+    with neo4j_driver.session() as session:
+        result = session.run(f"MATCH (r:Resource) {node_filter}RETURN r", sources=sources)
+        for record in result:
+            yield "node", _node_record_to_dict(record["r"])
+
+        result = session.run(
+            "MATCH (a:Resource)-[rel]->(b:Resource) "
+            f"{edge_filter}"
+            "RETURN a.external_id AS source_id, "
+            "       b.external_id AS target_id, "
+            "       type(rel) AS type, "
+            "       properties(rel) AS props",
+            sources=sources,
+        )
+        for record in result:
+            yield "edge", _edge_record_to_dict(record)
+
+
 def get_subgraph(center_id: str, depth: int = 2,
                  node_types: Optional[List[str]] = None,
-                 edge_types: Optional[List[str]] = None) -> Tuple[List[Dict], List[Dict]]:
+                 edge_types: Optional[List[str]] = None,
+                 max_nodes: Optional[int] = None) -> Tuple[List[Dict], List[Dict]]:
     with neo4j_driver.session() as session:
         return session.execute_read(
-            _read_subgraph, center_id, depth, node_types, edge_types
+            _read_subgraph, center_id, depth, node_types, edge_types, max_nodes
         )
 
 
 def _read_subgraph(tx: ManagedTransaction, center_id: str, depth: int,
                    node_types: Optional[List[str]],
-                   edge_types: Optional[List[str]]) -> Tuple[List[Dict], List[Dict]]:
+                   edge_types: Optional[List[str]],
+                   max_nodes: Optional[int]) -> Tuple[List[Dict], List[Dict]]:
+    hops, edges = _expand_frontier_tx(
+        tx, center_id, depth, "both", edge_types, node_types, max_nodes,
+    )
+    return _read_nodes_by_ids(tx, list(hops)), edges
+
+
+def _expand_frontier_tx(
+    tx: ManagedTransaction,
+    start_id: str,
+    depth: int,
+    direction: str = "both",
+    edge_types: Optional[List[str]] = None,
+    node_types: Optional[List[str]] = None,
+    max_nodes: Optional[int] = None,
+) -> Tuple[Dict[str, int], List[Dict]]:
+    """Level-by-level BFS from ``start_id`` with a visited set.
+
+    One query per hop expands the whole frontier, so cost grows with the
+    edges touched instead of the number of paths. Edge and node type
+    filters prune the expansion itself. Once ``max_nodes`` nodes are
+    visited, expansion stops. Returns ``{external_id: hop}`` in discovery
+    order and the deduplicated edges between visited nodes.
+    """
     rel_filter = ""
     if edge_types:
-        types_str = "|".join(t.upper() for t in edge_types)
-        rel_filter = f":{types_str}"
+        rel_filter = ":" + "|".join(f"`{t.upper()}`" for t in edge_types)
 
+    if direction == "out":
+        pattern = f"-[rel{rel_filter}]->"
+    elif direction == "in":
+        pattern = f"<-[rel{rel_filter}]-"
+    else:
+        pattern = f"-[rel{rel_filter}]-"
+
+    node_filter = "WHERE b.type IN $node_types " if node_types else ""
     query = (
-        f"MATCH path = (center:Resource {{external_id: $center_id}})"
-        f"-[*1..{depth}{rel_filter}]-(neighbor:Resource) "
-        "UNWIND nodes(path) AS n "
-        "WITH collect(DISTINCT n) AS allNodes, collect(DISTINCT path) AS paths "
-        "UNWIND allNodes AS nd "
-        "WITH nd, paths "
+        "UNWIND $frontier AS id "
+        f"MATCH (a:Resource {{external_id: id}}){pattern}(b:Resource) "
+        f"{node_filter}"
+        "RETURN elementId(rel) AS rel_id, "
+        "       b.external_id AS neighbor, "
+        "       startNode(rel).external_id AS source_id, "
+        "       endNode(rel).external_id AS target_id, "
+        "       type(rel) AS type, "
+        "       properties(rel) AS props"
     )
 
-    if node_types:
-        query += "WHERE nd.type IN $node_types "
-
-    query += (
-        "WITH collect(DISTINCT nd) AS filteredNodes, paths "
-        "UNWIND paths AS p "
-        "UNWIND relationships(p) AS rel "
-        "WITH filteredNodes, rel, startNode(rel) AS sn, endNode(rel) AS en "
-        "WHERE sn IN filteredNodes AND en IN filteredNodes "
-        "RETURN filteredNodes, collect(DISTINCT {source_id: sn.external_id, "
-        "       target_id: en.external_id, type: type(rel), "
-        "       props: properties(rel)}) AS rels"
-    )
+    start = tx.run(
+        "MATCH (r:Resource {external_id: $id}) RETURN r.external_id AS id",
+        id=start_id,
+    ).single()
+    if start is None:
+        return {}, []
 
-    result = tx.run(query, center_id=center_id, node_types=node_types or [])
-    record = result.single()
-    if record is None:
-        return [], []
+    hops: Dict[str, int] = {start_id: 0}
+    edges: Dict[str, Dict] = {}
+    frontier = [start_id]
 
-    nodes = [_node_record_to_dict(n) for n in record["filteredNodes"]]
-    edges = []
-    for r in record["rels"]:
-        edge = {"source_id": r["source_id"], "target_id": r["target_id"], "type": r["type"]}
-        edge.update(r.get("props") or {})
-        edges.append(edge)
-    return nodes, edges
+    for hop in range(1, depth + 1):
+        if not frontier or (max_nodes is not None and len(hops) >= max_nodes):
+            break
+
+        rows = list(tx.run(query, frontier=frontier, node_types=node_types))
+        discovered = sorted({row["neighbor"] for row in rows if row["neighbor"] not in hops})
+        if max_nodes is not None:
+            discovered = discovered[:max(0, max_nodes - len(hops))]
+        for node_id in discovered:
+            hops[node_id] = hop
+
+        for row in rows:
+            if row["neighbor"] in hops and row["rel_id"] not in edges:
+                edges[row["rel_id"]] = _edge_record_to_dict(row)
+        frontier = discovered
+
+    return hops, list(edges.values())
+
+
+def _read_nodes_by_ids(tx: ManagedTransaction, node_ids: List[str]) -> List[Dict]:
+    """Nodes for ``node_ids`` in the given order."""
+    if not node_ids:
+        return []
+    result = tx.run(
+        "UNWIND $ids AS id "
+        "MATCH (r:Resource {external_id: id}) "
+        "RETURN r",
+        ids=node_ids,
+    )
+    by_id = {}
+    for record in result:
+        node = _node_record_to_dict(record["r"])
+        by_id[node["id"]] = node
+    return [by_id[node_id] for node_id in node_ids if node_id in by_id]
 
 
 def find_shortest_path(source_id: str, target_id: str,
@@ -318,124 +646,163 @@ def _find_path_tx(tx: ManagedTransaction, source_id: str,
     return nodes, edges
 
 
+_IMPACT_DIRECTIONS = {"downstream": "out", "upstream": "in", "both": "both"}
+
+
 def get_impact(node_id: str, depth: int = 3,
-               direction: str = "downstream") -> Tuple[List[Dict], List[Dict]]:
+               direction: str = "downstream",
+               max_nodes: Optional[int] = None) -> Tuple[List[Dict], List[Dict]]:
 
     with neo4j_driver.session() as session:
-        return session.execute_read(_impact_tx, node_id, depth, direction)
+        return session.execute_read(_impact_tx, node_id, depth, direction, max_nodes)
 
 
 def _impact_tx(tx: ManagedTransaction, node_id: str,
-               depth: int, direction: str) -> Tuple[List[Dict], List[Dict]]:
-    if direction == "downstream":
-        arrow = f"-[*1..{depth}]->"
-    elif direction == "upstream":
-        arrow = f"<-[*1..{depth}]-"
-    else:
-        arrow = f"-[*1..{depth}]-"
-
-    query = (
-        f"MATCH path = (center:Resource {{external_id: $node_id}}){arrow}(n:Resource) "
-        "UNWIND nodes(path) AS nd "
-        "UNWIND relationships(path) AS rel "
-        "WITH collect(DISTINCT nd) AS ns, "
-        "     collect(DISTINCT {source_id: startNode(rel).external_id, "
-        "             target_id: endNode(rel).external_id, type: type(rel), "
-        "             props: properties(rel)}) AS rs "
-        "RETURN ns, rs"
+               depth: int, direction: str,
+               max_nodes: Optional[int]) -> Tuple[List[Dict], List[Dict]]:
+    hops, edges = _expand_frontier_tx(
+        tx, node_id, depth, _IMPACT_DIRECTIONS.get(direction, "both"), max_nodes=max_nodes,
     )
-
-    result = tx.run(query, node_id=node_id)
-    record = result.single()
-    if record is None:
-        return [], []
-
-    nodes = [_node_record_to_dict(n) for n in record["ns"]]
-    edges = []
-    for r in record["rs"]:
-        edge = {"source_id": r["source_id"], "target_id": r["target_id"], "type": r["type"]}
-        edge.update(r.get("props") or {})
-        edges.append(edge)
+    nodes = _read_nodes_by_ids(tx, list(hops))
+    for node in nodes:
+        node["hop_distance"] = hops[node["id"]]
     return nodes, edges
 
 
-def get_graph_stats() -> Dict[str, Any]:
-    with neo4j_driver.session() as session:
-        return session.execute_read(_stats_tx)
-
-
 def delete_graph_by_sources(sources: List[str]) -> Dict[str, int]:
     if not sources:
         return {"deleted_nodes": 0, "deleted_edges": 0}
 
     with neo4j_driver.session() as session:
-        return session.execute_write(_delete_graph_by_sources_tx, sources)
-
+        deleted, delta, removed = session.execute_write(_delete_graph_by_sources_tx, sources)
+    graph_version_repo.bump_deletions()
+    node_lookup_index.clear()
+    graph_replica.invalidate()
+    graph_stats_repo.apply(delta)
+    graph_changes_repo.append(removed)
+    graph_version_repo.bump()
+    return deleted
+
+
+def _delete_graph_by_sources_tx(
+    tx: ManagedTransaction, sources: List[str],
+) -> Tuple[Dict[str, int], StatsDelta, List[Change]]:
+    """Delete everything written by ``sources``.
+
+    The change log gets the deleted nodes plus the deleted edges whose
+    endpoints both survive; edges of a deleted node are implied.
+    """
+    delta = _removal_delta(
+        tx,
+        "MATCH (n:Resource) WHERE n.source IN $sources",
+        "MATCH (a:Resource)-[rel]->(b:Resource) "
+        "WHERE rel.source IN $sources OR a.source IN $sources OR b.source IN $sources",
+        sources=sources,
+    )
 
-def _delete_graph_by_sources_tx(tx: ManagedTransaction, sources: List[str]) -> Dict[str, int]:
     edge_count_record = tx.run(
         "MATCH ()-[rel]->() WHERE rel.source IN $sources RETURN count(rel) AS count",
         sources=sources,
     ).single()
     deleted_edges = int(edge_count_record["count"]) if edge_count_record else 0
+    removed = [
+        edge_deleted(record["source_id"], record["type"], record["target_id"], record["source"])
+        for record in tx.run(
+            "MATCH (a:Resource)-[rel]->(b:Resource) "
+            "WHERE rel.source IN $sources "
+            "  AND NOT coalesce(a.source IN $sources, false) "
+            "  AND NOT coalesce(b.source IN $sources, false) "
+            "RETURN a.external_id AS source_id, type(rel) AS type, "
+            "       b.external_id AS target_id, rel.source AS source",
+            sources=sources,
+        )
+    ]
 
     tx.run(
         "MATCH ()-[rel]->() WHERE rel.source IN $sources DELETE rel",
         sources=sources,
     )
 
-    node_count_record = tx.run(
-        "MATCH (n:Resource) WHERE n.source IN $sources RETURN count(n) AS count",
+    deleted_node_rows = list(tx.run(
+        "MATCH (n:Resource) WHERE n.source IN $sources "
+        "RETURN n.external_id AS id, n.type AS type, n.source AS source",
         sources=sources,
-    ).single()
-    deleted_nodes = int(node_count_record["count"]) if node_count_record else 0
+    ))
+    deleted_nodes = len(deleted_node_rows)
+    removed.extend(node_deleted(row["id"], row["type"], row["source"]) for row in deleted_node_rows)
 
     tx.run(
         "MATCH (n:Resource) WHERE n.source IN $sources DETACH DELETE n",
         sources=sources,
     )
 
-    return {"deleted_nodes": deleted_nodes, "deleted_edges": deleted_edges}
+    return {"deleted_nodes": deleted_nodes, "deleted_edges": deleted_edges}, delta, removed
 
 
-def _stats_tx(tx: ManagedTransaction) -> Dict[str, Any]:
-    node_res = tx.run(
-        "MATCH (r:Resource) RETURN r.type AS type, count(*) AS cnt"
-    )
-    nodes_by_type = {
-        str(rec["type"] or "unknown"): rec["cnt"] for rec in node_res
-    }
+def _grouped_counts(tx: ManagedTransaction, node_match: str, edge_match: str, **params: Any) -> StatsDelta:
+    """Counts of the matched nodes ``n`` and edges ``rel`` by type and by source."""
+    counts = empty_delta()
+    for record in tx.run(
+        f"{node_match} RETURN n.type AS type, n.source AS source, count(*) AS count", **params,
+    ):
+        counts["nodes_by_type"][_stats_key(record["type"])] += record["count"]
+        counts["nodes_by_source"][_stats_key(record["source"])] += record["count"]
+    for record in tx.run(
+        f"{edge_match} RETURN type(rel) AS type, rel.source AS source, count(DISTINCT rel) AS count", **params,
+    ):
+        counts["edges_by_type"][_stats_key(record["type"])] += record["count"]
+        counts["edges_by_source"][_stats_key(record["source"])] += record["count"]
+    return counts
 
-    edge_res = tx.run(
-        "MATCH (:Resource)-[rel]->(:Resource) RETURN type(rel) AS type, count(*) AS cnt"
-    )
-    edges_by_type = {
-        str(rec["type"] or "unknown"): rec["cnt"] for rec in edge_res
-    }
 
-    return {
-        "total_nodes": sum(nodes_by_type.values()),
-        "total_edges": sum(edges_by_type.values()),
-        "nodes_by_type": nodes_by_type,
-        "edges_by_type": edges_by_type,
-    }
+def _removal_delta(tx: ManagedTransaction, node_match: str, edge_match: str, **params: Any) -> StatsDelta:
+    counts = _grouped_counts(tx, node_match, edge_match, **params)
+    return {name: Counter({key: -value for key, value in counter.items()}) for name, counter in counts.items()}
 
 
-def delete_stale(hours: int) -> int:
+def count_graph() -> Dict[str, Dict[str, int]]:
+    """Full recount of node and edge counters by type and by source."""
     with neo4j_driver.session() as session:
-        return session.execute_write(_delete_stale_tx, hours)
+        return session.execute_read(_count_graph_tx)
+
 
+def _count_graph_tx(tx: ManagedTransaction) -> Dict[str, Dict[str, int]]:
+    counts = _grouped_counts(tx, "MATCH (n:Resource)", "MATCH (:Resource)-[rel]->(:Resource)")
+    return {name: dict(counter) for name, counter in counts.items()}
 
-def _delete_stale_tx(tx: ManagedTransaction, hours: int) -> int:
+
+def delete_stale(hours: int) -> int:
+    with neo4j_driver.session() as session:
+        deleted, delta = session.execute_write(_delete_stale_tx, hours)
+    if deleted:
+        graph_version_repo.bump_deletions()
+        node_lookup_index.clear()
+        graph_replica.invalidate()
+        graph_stats_repo.apply(delta)
+        graph_changes_repo.append([node_deleted(n["id"], n["type"], n["source"]) for n in deleted])
+        graph_version_repo.bump()
+    return len(deleted)
+
+
+def _delete_stale_tx(tx: ManagedTransaction, hours: int) -> Tuple[List[Dict[str, Any]], StatsDelta]:
+    cutoff = "datetime() - duration({hours: $hours})"
+    delta = _removal_delta(
+        tx,
+        f"MATCH (n:Resource) WHERE n.last_seen_at < {cutoff}",
+        "MATCH (a:Resource)-[rel]->(b:Resource) "
+        f"WHERE a.last_seen_at < {cutoff} OR b.last_seen_at < {cutoff}",
+        hours=hours,
+    )
     result = tx.run(
         "MATCH (r:Resource) "
-        "WHERE r.last_seen_at < datetime() - duration({hours: $hours}) "
+        f"WHERE r.last_seen_at < {cutoff} "
+        "WITH r, {id: r.external_id, type: r.type, source: r.source} AS node "
         "DETACH DELETE r "
-        "RETURN count(*) AS deleted",
+        "RETURN collect(node) AS deleted",
         hours=hours,
     )
     record = result.single()
-    return record["deleted"] if record else 0
+    return (record["deleted"] if record else []), delta
 
 
 def _node_record_to_dict(node) -> Dict[str, Any]:
@@ -444,6 +811,16 @@ def _node_record_to_dict(node) -> Dict[str, Any]:
     return d
 
 
+def _edge_record_to_dict(record) -> Dict[str, Any]:
+    row: Dict[str, Any] = {
+        "source_id": record["source_id"],
+        "target_id": record["target_id"],
+        "type": record["type"],
+    }
+    row.update(record["props"] or {})
+    return row
+
+
 def find_node_by_field(
     node_type: str,
     field_name: str,
@@ -482,6 +859,39 @@ def _find_node_by_field_tx(
     return _node_record_to_dict(record["r"])
 
 
+def find_nodes_by_field_values(
+    node_type: Optional[str],
+    field_name: str,
+    values: List[str],
+) -> Dict[str, str]:
+    if not values:
+        return {}
+    with neo4j_driver.session() as session:
+        return session.execute_read(
+            _find_nodes_by_field_values_tx, node_type, field_name, list(set(values))
+        )
+
+
+def _find_nodes_by_field_values_tx(
+    tx: ManagedTransaction,
+    node_type: Optional[str],
+    field_name: str,
+    values: List[str],
+) -> Dict[str, str]:
+    type_filter = "r.type = $node_type AND " if node_type is not None else ""
+
+    query = (
+        "UNWIND $values AS value "
+        "MATCH (r:Resource) "
+        f"WHERE {type_filter}r.`{field_name}` = value "
+        "WITH value, head(collect(r.external_id)) AS external_id "
+        "RETURN value, external_id"
+    )
+
+    result = tx.run(query, node_type=node_type, values=values)
+    return {record["value"]: record["external_id"] for record in result}
+
+
 def find_node_by_name(name: str) -> Optional[Dict[str, Any]]:
     with neo4j_driver.session() as session:
         return session.execute_read(_find_node_by_name_tx, name)
@@ -508,6 +918,85 @@ def _find_node_by_name_tx(
     }
 
 
+_SEARCH_TERM_SPLIT = re.compile(r"[^\w:.]+")
+_LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+
+def _lucene_query(text: str, node_types: Optional[List[str]], fuzzy: bool) -> Optional[str]:
+    """Every term must match one text field exactly, as a prefix or (with
+    ``fuzzy``, for terms of 3+ characters) within one edit."""
+    fields = [f for f in search_index_properties() if f != "type"]
+    clauses = []
+    for term in _SEARCH_TERM_SPLIT.split(text.lower()):
+        term = term.strip(":.")
+        if not term:
+            continue
+        escaped = _LUCENE_SPECIAL.sub(r"\\\1", term)
+        options = [f"{f}:{escaped}^4 OR {f}:{escaped}*^2" for f in fields]
+        if fuzzy and len(term) >= 3:
+            options += [f"{f}:{escaped}~1" for f in fields]
+        clauses.append("(" + " OR ".join(options) + ")")
+    if not clauses:
+        return None
+    if node_types:
+        types = " OR ".join(_LUCENE_SPECIAL.sub(r"\\\1", t.lower()) for t in node_types)
+        clauses.append(f"type:({types})")
+    return " AND ".join(clauses)
+
+
+def search_nodes(
+    text: str,
+    node_types: Optional[List[str]] = None,
+    limit: int = 20,
+    fuzzy: bool = True,
+    candidates: int = 500,
+) -> List[Dict[str, Any]]:
+    """Full-text search over name, external_id and ``graph_search_properties``.
+
+    The best ``candidates`` index hits are ranked exact match first, then
+    prefix match, then by degree and index score.
+    """
+    query = _lucene_query(text, node_types, fuzzy)
+    if query is None:
+        return []
+    with neo4j_driver.session() as session:
+        return session.execute_read(
+            _search_nodes_tx, query, text.strip().lower(), node_types, limit, max(candidates, limit),
+        )
+
+
+def _search_nodes_tx(
+    tx: ManagedTransaction,
+    query: str,
+    text: str,
+    node_types: Optional[List[str]],
+    limit: int,
+    candidates: int,
+) -> List[Dict[str, Any]]:
+    result = tx.run(
+        "CALL db.index.fulltext.queryNodes($index, $query, {limit: $candidates}) "
+        "YIELD node, score "
+        "WHERE $node_types IS NULL OR node.type IN $node_types "
+        "WITH node, score, toLower(coalesce(node.name, '')) AS name, toLower(node.external_id) AS id "
+        "WITH node, score, "
+        "     CASE WHEN name = $text OR id = $text THEN 0 "
+        "          WHEN name STARTS WITH $text OR id STARTS WITH $text THEN 1 "
+        "          ELSE 2 END AS tier, "
+        "     COUNT { (node)--() } AS degree "
+        "ORDER BY tier, degree DESC, score DESC "
+        "LIMIT $limit "
+        "RETURN node.external_id AS id, node.type AS type, node.name AS name, "
+        "       node.status AS status, node.environment AS environment, degree, score",
+        index=SEARCH_INDEX,
+        query=query,
+        text=text,
+        node_types=node_types or None,
+        limit=limit,
+        candidates=candidates,
+    )
+    return [record.data() for record in result]
+
+
 def get_nodes_by_types(node_types: List[str]) -> List[Dict[str, Any]]:
     if not node_types:
         return []
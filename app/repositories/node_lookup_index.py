@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.models.mapper.mapping import AutoEdgeRule
+from app.repositories.graph_version_repo import graph_version_repo
+
+log = logging.getLogger(__name__)
+
+_LookupKey = Tuple[str, str, str]
+
+
+class NodeLookupIndex:
+    """In-process ``(node_type, field, value) -> external_id`` index.
+
+    Only the ``(target_type, target_field)`` pairs referenced by edge rules
+    are indexed. Entries are written from the upsert path and from Neo4j
+    fallbacks, so repeated edge resolution becomes a dict lookup. The index
+    keeps the ``node_lookup_index_max_entries`` most recently used entries
+    and only holds string values, the ones the Neo4j lookup can match. It
+    is dropped whenever any process deletes nodes, and a type's entries are
+    dropped when another process changes a value on a node of that type
+    (see ``sync``).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._fields_by_type: Dict[str, Set[str]] = {}
+        self._entries: "OrderedDict[_LookupKey, str]" = OrderedDict()
+        self._keys_by_node: Dict[str, Set[_LookupKey]] = {}
+        self._deletions: Optional[int] = None
+        self._changes: Dict[str, int] = {}
+
+    def track_rules(self, rules: Iterable[AutoEdgeRule]) -> None:
+        with self._lock:
+            for rule in rules:
+                self._fields_by_type.setdefault(rule.target_type, set()).add(rule.target_field)
+
+    def is_tracked(self, node_type: str, field_name: str) -> bool:
+        return field_name in self._fields_by_type.get(node_type, ())
+
+    def sync(self) -> None:
+        """Drop entries that may be stale: all of them if nodes were deleted
+        since the last check, in this or any other process, and those of
+        every type whose node change counter moved (renamed targets, values
+        taken over by another node)."""
+        deletions = graph_version_repo.deletions()
+        if deletions != self._deletions:
+            self.clear()
+            self._deletions = deletions
+
+        node_types = list(self._fields_by_type)
+        for node_type, changes in zip(node_types, graph_version_repo.node_changes(node_types)):
+            if self._changes.get(node_type) != changes:
+                self._drop_type(node_type)
+                self._changes[node_type] = changes
+
+    def advance(self, changes: Dict[str, int]) -> None:
+        """Take note of this process's own counter bumps; when nobody else
+        bumped in between, the entries recorded alongside stay valid."""
+        with self._lock:
+            for node_type, count in changes.items():
+                if self._changes.get(node_type) == count - 1:
+                    self._changes[node_type] = count
+
+    def lookup(self, node_type: str, field_name: str, value: str) -> Optional[str]:
+        key = (node_type, field_name, value)
+        with self._lock:
+            external_id = self._entries.get(key)
+            if external_id is not None:
+                self._entries.move_to_end(key)
+            return external_id
+
+    def store(self, node_type: str, field_name: str, value: str, external_id: str) -> None:
+        with self._lock:
+            self._put((node_type, field_name, value), external_id)
+            self._evict()
+
+    def record_nodes(self, nodes: List[Dict[str, Any]]) -> None:
+        if not self._fields_by_type:
+            return
+
+        with self._lock:
+            for node in nodes:
+                node_type = node.get("type")
+                external_id = node.get("id")
+                fields = self._fields_by_type.get(node_type)
+                if not fields or not external_id:
+                    continue
+
+                for old_key in self._keys_by_node.pop(external_id, ()):
+                    if self._entries.get(old_key) == external_id:
+                        del self._entries[old_key]
+
+                for field_name in fields:
+                    value = _stored_value(node, field_name)
+                    if value:
+                        self._put((node_type, field_name, value), external_id)
+            self._evict()
+
+    def _put(self, key: _LookupKey, external_id: str) -> None:
+        self._entries[key] = external_id
+        self._entries.move_to_end(key)
+        self._keys_by_node.setdefault(external_id, set()).add(key)
+
+    def _evict(self) -> None:
+        while len(self._entries) > settings.node_lookup_index_max_entries:
+            key, external_id = self._entries.popitem(last=False)
+            keys = self._keys_by_node.get(external_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_node[external_id]
+
+    def _drop_type(self, node_type: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == node_type]:
+                external_id = self._entries.pop(key)
+                keys = self._keys_by_node.get(external_id)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._keys_by_node[external_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_node.clear()
+        log.debug("Node lookup index cleared")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _stored_value(node: Dict[str, Any], field_name: str) -> Optional[str]:
+    """``field_name`` as ``upsert_nodes`` stores it, if the Neo4j lookup can
+    match it: references are strings and the lookup compares typed values,
+    so numbers, booleans and collections never match there either."""
+    if field_name == "id":
+        return None  # stored as ``external_id``
+    value = node.get(field_name)
+    if value is None and field_name == "name":
+        value = node.get("id")
+    return value if isinstance(value, str) else None
+
+
+node_lookup_index = NodeLookupIndex()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List, Set, Tuple
+
+from app.config import settings
+from app.models.mapper.mapping import UnresolvedReference
+from app.repositories.graph_changes_repo import edge_key
+from app.repositories.redis_connection import redis_client
+
+log = logging.getLogger(__name__)
+
+
+class PendingEdges:
+    """Edges built from pending references, plus the hash entries behind
+    each edge so they can be removed once the edge is written."""
+
+    def __init__(self) -> None:
+        self.edges: List[Dict[str, Any]] = []
+        self.origins: Dict[str, List[Tuple[str, str]]] = {}
+
+
+class PendingEdgeRepository:
+    """Unresolved auto-edge references parked until their target arrives.
+
+    Each ``(expected_target_type, target_field, value)`` owns a hash of
+    ``source_node_id|edge_type -> reference``. ``FIELDS_PREFIX`` sets list
+    which fields have pending entries per target type, so resolving an
+    upserted batch only probes keys that can exist.
+    """
+
+    KEY_PREFIX = "pending:edge:"
+    FIELDS_PREFIX = "pending:fields:"
+
+    @property
+    def ttl(self) -> timedelta:
+        return timedelta(hours=settings.pending_edge_ttl_hours)
+
+    def _key(self, node_type: str, field_name: str, value: str) -> str:
+        return f"{self.KEY_PREFIX}{node_type}:{field_name}:{value}"
+
+    async def add(self, references: List[UnresolvedReference]) -> int:
+        if not references:
+            return 0
+
+        client = redis_client.client
+        pipe = client.pipeline(transaction=False)
+        keys: Set[str] = set()
+        fields_by_type: Dict[str, Set[str]] = {}
+
+        for ref in references:
+            key = self._key(ref.expected_target_type, ref.target_field, ref.expected_target_value)
+            pipe.hset(key, f"{ref.source_node_id}|{ref.edge_type}", ref.model_dump_json())
+            keys.add(key)
+            fields_by_type.setdefault(ref.expected_target_type, set()).add(ref.target_field)
+
+        for key in keys:
+            pipe.expire(key, self.ttl)
+        for node_type, fields in fields_by_type.items():
+            pipe.sadd(f"{self.FIELDS_PREFIX}{node_type}", *fields)
+
+        await pipe.execute()
+        return len(references)
+
+    async def resolve_for_nodes(self, nodes: List[Dict[str, Any]]) -> PendingEdges:
+        """Edges for the pending references satisfied by ``nodes``.
+
+        The references stay queued until ``acknowledge`` confirms their
+        edge was written, so a failed upsert or a missing endpoint leaves
+        them waiting for the next arrival of the target.
+        """
+        resolved = PendingEdges()
+        node_types = sorted({n["type"] for n in nodes if n.get("type") and n.get("id")})
+        if not node_types:
+            return resolved
+
+        client = redis_client.client
+        pipe = client.pipeline(transaction=False)
+        for node_type in node_types:
+            pipe.smembers(f"{self.FIELDS_PREFIX}{node_type}")
+        fields_by_type = dict(zip(node_types, await pipe.execute()))
+
+        targets: Dict[str, str] = {}
+        for node in nodes:
+            fields = fields_by_type.get(node.get("type"))
+            if not fields or not node.get("id"):
+                continue
+            for field_name in fields:
+                value = node.get(field_name)
+                if value is None and field_name == "name":
+                    value = node["id"]
+                if value is None or isinstance(value, (list, dict)):
+                    continue
+                targets[self._key(node["type"], field_name, str(value))] = node["id"]
+
+        if not targets:
+            return resolved
+
+        keys = list(targets)
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(key)
+        entries = await pipe.execute()
+
+        for key, pending in zip(keys, entries):
+            for field, raw in pending.items():
+                ref = json.loads(raw)
+                edge = {
+                    "source_id": ref["source_node_id"],
+                    "target_id": targets[key],
+                    "type": ref["edge_type"],
+                }
+                edge_id = edge_key(edge["source_id"], edge["type"], edge["target_id"])
+                origins = resolved.origins.setdefault(edge_id, [])
+                if not origins:
+                    resolved.edges.append(edge)
+                origins.append((key, field))
+
+        if resolved.edges:
+            log.debug(f"Resolved {len(resolved.edges)} pending edges")
+        return resolved
+
+    async def acknowledge(self, resolved: PendingEdges, written: Set[str]) -> None:
+        """Drop the references whose edge is in ``written`` (``edge_key`` values)."""
+        fields_by_key: Dict[str, List[str]] = {}
+        for key in written & resolved.origins.keys():
+            for pending_key, field in resolved.origins[key]:
+                fields_by_key.setdefault(pending_key, []).append(field)
+        if not fields_by_key:
+            return
+
+        pipe = redis_client.client.pipeline(transaction=False)
+        for pending_key, fields in fields_by_key.items():
+            pipe.hdel(pending_key, *fields)
+        await pipe.execute()
+
+
+pending_edge_repo = PendingEdgeRepository()
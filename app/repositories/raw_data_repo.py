@@ -1,18 +1,48 @@
 from __future__ import annotations
 
 import json
+import logging
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
 from app.config import settings
 from app.models.mapper.raw_data import RawDataChunk, RawDataSource, RawDataListResponse
 from app.repositories.redis_connection import redis_client
 
+log = logging.getLogger(__name__)
+
+TimelineCursor = Tuple[float, str]
+
+
+class TimelinePage:
+    """One page of a source timeline.
+
+    ``scanned`` counts the timeline entries the page covered; ``skipped``
+    those left out because they were already processed by the requested
+    mapping version.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: List[RawDataChunk] = []
+        self.cursor: Optional[TimelineCursor] = None
+        self.scanned = 0
+        self.skipped = 0
+
+
+def timeline_score(timestamp: datetime) -> float:
+    """Chunk timestamps are naive UTC; aware values are converted."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
 
 class RawDataRepository:
     KEY_PREFIX = "raw:chunk:"
     INDEX_KEY = "raw:index"
+    TIMELINE_PREFIX = "raw:timeline:"
+    TIMELINE_READY_KEY = "raw:timeline:ready"
+    PROCESSED_PREFIX = "raw:processed:"
 
     @property
     def ttl(self) -> timedelta:
@@ -52,8 +82,23 @@ class RawDataRepository:
         await client.sadd(self.INDEX_KEY, chunk_id)
         await client.expire(self.INDEX_KEY, self.ttl)
 
+        timeline_key = f"{self.TIMELINE_PREFIX}{source_type.value}"
+        score = timeline_score(timestamp)
+        pipe = client.pipeline(transaction=False)
+        pipe.zadd(timeline_key, {key: score})
+        pipe.zrangebyscore(timeline_key, "-inf", f"({score - self.ttl.total_seconds()}")
+        _, expired = await pipe.execute()
+        if expired:
+            await self._forget(source_type.value, expired)
+
         return chunk_id
 
+    async def _forget(self, source_type: str, keys: List[str]) -> None:
+        pipe = redis_client.client.pipeline(transaction=False)
+        pipe.zrem(f"{self.TIMELINE_PREFIX}{source_type}", *keys)
+        pipe.hdel(f"{self.PROCESSED_PREFIX}{source_type}", *keys)
+        await pipe.execute()
+
     async def get_chunk(self, chunk_id: str) -> Optional[Dict[str, Any]]:
         client = redis_client.client
         pattern = f"{self.KEY_PREFIX}*:{chunk_id}"
@@ -112,37 +157,172 @@ class RawDataRepository:
             timeline_max=timeline_max,
         )
 
-    async def mark_processed(
-        self,
-        chunk_id: str,
-        mapping_id: str,
-    ) -> bool:
-        chunk = await self.get_chunk(chunk_id)
-        if not chunk:
-            return False
-
-        chunk["is_processed"] = True
-        chunk["processed_at"] = datetime.utcnow().isoformat()
-        chunk["mapping_id"] = mapping_id
-
-        client = redis_client.client
-        pattern = f"{self.KEY_PREFIX}*:{chunk_id}"
-        async for key in client.scan_iter(match=pattern, count=1):
-            ttl = await client.ttl(key)
-            if ttl > 0:
-                await client.setex(key, timedelta(seconds=ttl), json.dumps(chunk, default=str))
-            return True
-        return False
-
     async def delete_chunk(self, chunk_id: str) -> bool:
         client = redis_client.client
         pattern = f"{self.KEY_PREFIX}*:{chunk_id}"
         async for key in client.scan_iter(match=pattern, count=1):
+            data = await client.get(key)
             await client.delete(key)
             await client.srem(self.INDEX_KEY, chunk_id)
+            if data:
+                await self._forget(json.loads(data).get("source_type"), [key])
             return True
         return False
 
+    def chunk_key(self, chunk: RawDataChunk) -> str:
+        return f"{self.KEY_PREFIX}{chunk.agent_id}:{chunk.id}"
+
+    async def mark_processed_many(
+        self,
+        source_type: str,
+        chunks: List[RawDataChunk],
+        mapping_id: str,
+        mapping_version: str,
+    ) -> None:
+        """Record that ``chunks`` were mapped by ``mapping_id`` at ``mapping_version``.
+
+        Markers live in one hash per source type next to the timeline, so
+        marking a page is a single HSET instead of rewriting every payload.
+        """
+        if not chunks:
+            return
+        marker = f"{mapping_id}|{mapping_version}|{datetime.utcnow().isoformat()}"
+        await redis_client.client.hset(
+            f"{self.PROCESSED_PREFIX}{source_type}",
+            mapping={self.chunk_key(chunk): marker for chunk in chunks},
+        )
+
+    async def clear_processed(self, source_type: str) -> None:
+        await redis_client.client.delete(f"{self.PROCESSED_PREFIX}{source_type}")
+
+    async def read_timeline_page(
+        self,
+        source_type: str,
+        after: Optional[TimelineCursor] = None,
+        agent_id: Optional[str] = None,
+        from_timestamp: Optional[datetime] = None,
+        to_timestamp: Optional[datetime] = None,
+        limit: int = 500,
+        skip_processed_by: Optional[Tuple[str, str]] = None,
+    ) -> TimelinePage:
+        """Read the next page of chunks in timestamp order.
+
+        ``after`` is the ``(score, member)`` cursor of the last chunk already
+        seen; the returned page carries the cursor to continue from, which
+        is ``None`` once the timeline is exhausted. Pages filtered down to
+        zero chunks (agent filter, expired keys, ``skip_processed_by``
+        matches) still advance the cursor. Payloads of skipped chunks are
+        never fetched.
+        """
+        client = redis_client.client
+        timeline_key = f"{self.TIMELINE_PREFIX}{source_type}"
+        max_score = timeline_score(to_timestamp) if to_timestamp else "+inf"
+        page = TimelinePage()
+
+        rank = await client.zrank(timeline_key, after[1]) if after else None
+        if rank is not None:
+            entries = await client.zrange(timeline_key, rank + 1, rank + limit, withscores=True)
+            entries = [e for e in entries if max_score == "+inf" or e[1] <= max_score]
+        else:
+            if after:
+                min_score = f"({after[0]}"
+            elif from_timestamp:
+                min_score = timeline_score(from_timestamp)
+            else:
+                min_score = "-inf"
+            entries = await client.zrangebyscore(
+                timeline_key, min_score, max_score, start=0, num=limit, withscores=True,
+            )
+
+        if not entries:
+            return page
+
+        page.cursor = (entries[-1][1], entries[-1][0])
+        page.scanned = len(entries)
+        keys = [member for member, _ in entries]
+        if agent_id:
+            keys = [k for k in keys if k.startswith(f"{self.KEY_PREFIX}{agent_id}:")]
+        if not keys:
+            return page
+
+        markers = await client.hmget(f"{self.PROCESSED_PREFIX}{source_type}", keys)
+        if skip_processed_by:
+            prefix = "|".join(skip_processed_by) + "|"
+            wanted = [
+                (key, marker) for key, marker in zip(keys, markers)
+                if not (marker and marker.startswith(prefix))
+            ]
+            page.skipped = len(keys) - len(wanted)
+            if not wanted:
+                return page
+            keys, markers = [k for k, _ in wanted], [m for _, m in wanted]
+
+        expired: List[str] = []
+        for key, marker, data in zip(keys, markers, await client.mget(keys)):
+            if data is None:
+                expired.append(key)
+                continue
+            chunk = RawDataChunk(**json.loads(data))
+            if marker:
+                chunk.mapping_id, chunk.mapping_version, processed_at = marker.split("|", 2)
+                chunk.is_processed = True
+                chunk.processed_at = datetime.fromisoformat(processed_at)
+            page.chunks.append(chunk)
+        if expired:
+            await self._forget(source_type, expired)
+
+        return page
+
+    async def count_timeline(
+        self,
+        source_type: str,
+        after: Optional[TimelineCursor] = None,
+        from_timestamp: Optional[datetime] = None,
+        to_timestamp: Optional[datetime] = None,
+    ) -> int:
+        if after:
+            min_score = f"({after[0]}"
+        elif from_timestamp:
+            min_score = timeline_score(from_timestamp)
+        else:
+            min_score = "-inf"
+        return await redis_client.client.zcount(
+            f"{self.TIMELINE_PREFIX}{source_type}",
+            min_score,
+            timeline_score(to_timestamp) if to_timestamp else "+inf",
+        )
+
+    async def ensure_timeline(self) -> int:
+        """Index chunks stored before the per-source timeline existed."""
+        client = redis_client.client
+        if await client.exists(self.TIMELINE_READY_KEY):
+            return 0
+
+        indexed = 0
+        batch: List[str] = []
+
+        async def flush() -> int:
+            pipe = client.pipeline(transaction=False)
+            for key, data in zip(batch, await client.mget(batch)):
+                if data:
+                    chunk = json.loads(data)
+                    score = timeline_score(datetime.fromisoformat(chunk["timestamp"]))
+                    pipe.zadd(f"{self.TIMELINE_PREFIX}{chunk['source_type']}", {key: score})
+            return len(await pipe.execute())
+
+        async for key in client.scan_iter(match=f"{self.KEY_PREFIX}*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                indexed += await flush()
+                batch = []
+        if batch:
+            indexed += await flush()
+
+        await client.set(self.TIMELINE_READY_KEY, datetime.utcnow().isoformat())
+        if indexed:
+            log.info(f"Indexed {indexed} raw chunks into source timelines")
+        return indexed
+
     async def get_timeline_bounds(
         self,
         agent_id: str,
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import redis as redis_sync
 import redis.asyncio as redis
 
 from app.config import settings
@@ -8,6 +9,7 @@ from app.config import settings
 class RedisConnection:
     def __init__(self) -> None:
         self._client: redis.Redis | None = None
+        self._sync_client: redis_sync.Redis | None = None
 
     @property
     def client(self) -> redis.Redis:
@@ -21,6 +23,19 @@ class RedisConnection:
             )
         return self._client
 
+    @property
+    def sync_client(self) -> redis_sync.Redis:
+        """Blocking client for the synchronous Neo4j repository code."""
+        if self._sync_client is None:
+            self._sync_client = redis_sync.Redis(
+                host=settings.redis_host,
+                port=settings.redis_port,
+                password=settings.redis_password or None,
+                db=0,
+                decode_responses=True,
+            )
+        return self._sync_client
+
     async def ping(self) -> bool:
         try:
             return await self.client.ping()
@@ -31,6 +46,9 @@ class RedisConnection:
         if self._client:
             await self._client.close()
             self._client = None
+        if self._sync_client:
+            self._sync_client.close()
+            self._sync_client = None
 
 
 redis_client = RedisConnection()
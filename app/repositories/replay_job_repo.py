@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.models.mapper.replay import ReplayJob, ReplayJobStatus
+from app.repositories.redis_connection import redis_client
+
+# Drop holders whose heartbeat is stale, then take a slot if one is free.
+# Only the job's lease owner may take or re-take its slot (resume); the
+# lease is refreshed on every attempt so a queued job keeps it while waiting.
+_ACQUIRE_SLOT = """
+local now = tonumber(ARGV[1])
+local owner = redis.call('GET', KEYS[2])
+if owner and owner ~= ARGV[5] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[5], 'EX', ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - tonumber(ARGV[2]))
+if redis.call('ZSCORE', KEYS[1], ARGV[3]) or redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[4]) then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# Take or extend a job lease unless another worker holds it.
+_CLAIM_LEASE = """
+local owner = redis.call('GET', KEYS[1])
+if owner and owner ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+"""
+
+# Refresh the lease and the slot together; fails once the lease moved on.
+_HEARTBEAT = """
+local owner = redis.call('GET', KEYS[2])
+if owner and owner ~= ARGV[3] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[4])
+redis.call('ZADD', KEYS[1], 'XX', ARGV[1], ARGV[2])
+return 1
+"""
+
+_RELEASE_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+_FINISHED = (ReplayJobStatus.COMPLETED, ReplayJobStatus.FAILED, ReplayJobStatus.CANCELLED)
+
+
+class ReplayJobRepository:
+    KEY_PREFIX = "replay:job:"
+    INDEX_KEY = "replay:jobs"
+    CANCEL_PREFIX = "replay:cancel:"
+    SLOTS_PREFIX = "replay:slots:"
+    LEASE_PREFIX = "replay:lease:"
+    WATERMARK_PREFIX = "replay:watermark:"
+
+    async def save(self, job: ReplayJob) -> None:
+        """Store the job; finished jobs expire after ``replay_job_ttl_hours``
+        and ``list_jobs`` then prunes them from the index."""
+        client = redis_client.client
+        ttl = timedelta(hours=settings.replay_job_ttl_hours) if job.status in _FINISHED else None
+        pipe = client.pipeline(transaction=False)
+        pipe.set(f"{self.KEY_PREFIX}{job.id}", job.model_dump_json(), ex=ttl)
+        pipe.sadd(self.INDEX_KEY, job.id)
+        await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[ReplayJob]:
+        data = await redis_client.client.get(f"{self.KEY_PREFIX}{job_id}")
+        if data:
+            return ReplayJob.model_validate_json(data)
+        return None
+
+    async def list_jobs(self, status: Optional[ReplayJobStatus] = None) -> List[ReplayJob]:
+        client = redis_client.client
+        job_ids = sorted(await client.smembers(self.INDEX_KEY))
+        if not job_ids:
+            return []
+
+        jobs: List[ReplayJob] = []
+        stale: List[str] = []
+        for job_id, data in zip(job_ids, await client.mget([f"{self.KEY_PREFIX}{i}" for i in job_ids])):
+            if data is None:
+                stale.append(job_id)
+                continue
+            job = ReplayJob.model_validate_json(data)
+            if status is None or job.status == status:
+                jobs.append(job)
+        if stale:
+            await client.srem(self.INDEX_KEY, *stale)
+
+        jobs.sort(key=lambda j: j.created_at, reverse=True)
+        return jobs
+
+    async def request_cancel(self, job_id: str) -> None:
+        await redis_client.client.set(f"{self.CANCEL_PREFIX}{job_id}", "1", ex=timedelta(days=1))
+
+    async def is_cancel_requested(self, job_id: str) -> bool:
+        return bool(await redis_client.client.exists(f"{self.CANCEL_PREFIX}{job_id}"))
+
+    async def claim_lease(self, job_id: str, owner: str, timeout_seconds: int) -> bool:
+        """Make ``owner`` the only worker running the job until its lease goes stale."""
+        claimed = await redis_client.client.eval(
+            _CLAIM_LEASE, 1, f"{self.LEASE_PREFIX}{job_id}", owner, timeout_seconds,
+        )
+        return bool(claimed)
+
+    async def release_lease(self, job_id: str, owner: str) -> None:
+        await redis_client.client.eval(_RELEASE_LEASE, 1, f"{self.LEASE_PREFIX}{job_id}", owner)
+
+    async def acquire_slot(
+        self,
+        source_type: str,
+        job_id: str,
+        owner: str,
+        limit: int,
+        timeout_seconds: int,
+    ) -> bool:
+        acquired = await redis_client.client.eval(
+            _ACQUIRE_SLOT, 2, f"{self.SLOTS_PREFIX}{source_type}", f"{self.LEASE_PREFIX}{job_id}",
+            time.time(), timeout_seconds, job_id, limit, owner,
+        )
+        return bool(acquired)
+
+    async def heartbeat(self, source_type: str, job_id: str, owner: str, timeout_seconds: int) -> bool:
+        """Refresh the job's slot and lease; False if another worker took the job over."""
+        alive = await redis_client.client.eval(
+            _HEARTBEAT, 2, f"{self.SLOTS_PREFIX}{source_type}", f"{self.LEASE_PREFIX}{job_id}",
+            time.time(), job_id, owner, timeout_seconds,
+        )
+        return bool(alive)
+
+    async def release_slot(self, source_type: str, job_id: str) -> None:
+        await redis_client.client.zrem(f"{self.SLOTS_PREFIX}{source_type}", job_id)
+
+    async def get_watermark(self, source_type: str) -> Optional[Dict[str, Any]]:
+        data = await redis_client.client.get(f"{self.WATERMARK_PREFIX}{source_type}")
+        return json.loads(data) if data else None
+
+    async def set_watermark(
+        self,
+        source_type: str,
+        mapping_id: str,
+        mapping_version: str,
+        score: float,
+        member: str,
+    ) -> None:
+        """Everything up to ``(score, member)`` was mapped by this mapping version."""
+        await redis_client.client.set(
+            f"{self.WATERMARK_PREFIX}{source_type}",
+            json.dumps({
+                "mapping_id": mapping_id,
+                "mapping_version": mapping_version,
+                "score": score,
+                "member": member,
+            }),
+        )
+
+    async def clear_watermark(self, source_type: str) -> None:
+        await redis_client.client.delete(f"{self.WATERMARK_PREFIX}{source_type}")
+
+
+replay_job_repo = ReplayJobRepository()
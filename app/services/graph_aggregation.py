@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import networkx as nx
+
+from app.repositories import neo4j_repo
+from app.services.graph_service import _sources_for_app, dumps_json
+
+# (member type, edge type, container type, edge points from container to member)
+FoldRule = Tuple[str, str, str, bool]
+
+_POD_IN_DEPLOYMENT: FoldRule = ("Pod", "DEPLOYEDON", "Deployment", False)
+
+FOLD_RULES: Dict[str, List[FoldRule]] = {
+    "deployment": [_POD_IN_DEPLOYMENT],
+    "service": [
+        _POD_IN_DEPLOYMENT,
+        ("Deployment", "DEPLOYEDON", "Service", True),
+    ],
+    "cluster": [
+        _POD_IN_DEPLOYMENT,
+        ("Service", "DEPLOYEDON", "Deployment", False),
+        ("Deployment", "DEPLOYEDON", "RegionCluster", False),
+    ],
+}
+GROUPINGS = (*FOLD_RULES, "environment", "type", "community")
+
+
+class _Graph:
+    """The slice of the graph aggregation needs, read in one pass."""
+
+    def __init__(self) -> None:
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.edges: List[Tuple[str, str, str, float]] = []
+
+    @classmethod
+    def read(cls, sources: Optional[List[str]]) -> "_Graph":
+        graph = cls()
+        for kind, raw in neo4j_repo.iter_graph(sources):
+            if kind == "node":
+                graph.nodes[raw["id"]] = {
+                    "type": raw.get("type", "unknown"),
+                    "name": raw.get("name", raw["id"]),
+                    "environment": raw.get("environment"),
+                    "cluster_id": raw.get("cluster_id"),
+                }
+            else:
+                weight = raw.get("weight", 1.0)
+                graph.edges.append((
+                    raw["source_id"], raw["target_id"], raw["type"].upper(),
+                    float(weight) if isinstance(weight, (int, float)) else 1.0,
+                ))
+        return graph
+
+
+def _containers(graph: _Graph, rules: List[FoldRule]) -> Dict[str, str]:
+    """``member -> container`` for one level of every fold rule."""
+    by_key = {(member, edge_type, container): reverse for member, edge_type, container, reverse in rules}
+    parent: Dict[str, str] = {}
+    for source_id, target_id, edge_type, _ in sorted(graph.edges):
+        source, target = graph.nodes.get(source_id), graph.nodes.get(target_id)
+        if source is None or target is None:
+            continue
+        if by_key.get((source["type"], edge_type, target["type"])) is False:
+            parent.setdefault(source_id, target_id)
+        elif by_key.get((target["type"], edge_type, source["type"])) is True:
+            parent.setdefault(target_id, source_id)
+    return parent
+
+
+def _fold_groups(graph: _Graph, group_by: str) -> Dict[str, str]:
+    parent = _containers(graph, FOLD_RULES[group_by])
+    groups: Dict[str, str] = {}
+    for node_id in graph.nodes:
+        root, seen = node_id, {node_id}
+        while root in parent and parent[root] not in seen:
+            root = parent[root]
+            seen.add(root)
+        if group_by == "cluster" and graph.nodes[root]["type"] != "RegionCluster":
+            # No cluster edge yet: fall back to the ``cluster_id`` property
+            cluster_id = graph.nodes[root]["cluster_id"]
+            if cluster_id is not None:
+                root = f"cluster:{cluster_id}"
+        groups[node_id] = root
+    return groups
+
+
+def _community_groups(graph: _Graph) -> Dict[str, str]:
+    undirected = nx.Graph()
+    undirected.add_nodes_from(graph.nodes)
+    for source_id, target_id, _, weight in graph.edges:
+        if source_id in graph.nodes and target_id in graph.nodes and source_id != target_id:
+            previous = undirected.get_edge_data(source_id, target_id, {}).get("weight", 0.0)
+            undirected.add_edge(source_id, target_id, weight=previous + weight)
+
+    communities = nx.community.louvain_communities(undirected, weight="weight", seed=0)
+    communities = sorted(communities, key=lambda c: (-len(c), min(c)))
+    return {
+        node_id: f"community:{index}"
+        for index, members in enumerate(communities)
+        for node_id in members
+    }
+
+
+def _assign_groups(graph: _Graph, group_by: str) -> Dict[str, str]:
+    if group_by in FOLD_RULES:
+        return _fold_groups(graph, group_by)
+    if group_by == "environment":
+        return {i: f"environment:{n['environment'] or 'unknown'}" for i, n in graph.nodes.items()}
+    if group_by == "type":
+        return {i: f"type:{n['type']}" for i, n in graph.nodes.items()}
+    if group_by == "community":
+        return _community_groups(graph) if graph.nodes else {}
+    raise ValueError(f"Unknown grouping: {group_by}")
+
+
+def _super_node(graph: _Graph, group_id: str, members: List[str]) -> Dict[str, Any]:
+    node = graph.nodes.get(group_id)
+    if node is not None:
+        node_type, name = node["type"], node["name"]
+    else:
+        node_type, name = "Group", group_id.split(":", 1)[-1]
+
+    member_types = Counter(graph.nodes[m]["type"] for m in members)
+    return {
+        "id": group_id,
+        "type": node_type,
+        "name": name,
+        "status": None,
+        "environment": node["environment"] if node else None,
+        "properties": {
+            "member_count": len(members),
+            "member_types": dict(member_types.most_common()),
+        },
+    }
+
+
+def aggregate_graph(group_by: str, app_id: Optional[str] = None) -> Dict[str, Any]:
+    """Collapse the graph into super-nodes and summed super-edges.
+
+    Containment groupings (``deployment``, ``service``, ``cluster``) fold
+    members into their container node along ``deployedon`` edges, so a
+    super-node keeps the container's id and nodes outside any container
+    stay as they are. ``environment``, ``type`` and ``community`` (Louvain)
+    replace every node with a synthetic group. Edges inside a group are
+    dropped; the rest are merged per ``(source group, target group, type)``
+    with their count and summed ``weight``.
+    """
+    sources = _sources_for_app(app_id)
+    graph = _Graph() if sources is not None and not sources else _Graph.read(sources)
+    groups = _assign_groups(graph, group_by)
+
+    members: Dict[str, List[str]] = {}
+    for node_id, group_id in groups.items():
+        members.setdefault(group_id, []).append(node_id)
+
+    super_edges: Dict[Tuple[str, str, str], List[float]] = {}
+    for source_id, target_id, edge_type, weight in graph.edges:
+        source_group, target_group = groups.get(source_id), groups.get(target_id)
+        if source_group is None or target_group is None or source_group == target_group:
+            continue
+        totals = super_edges.setdefault((source_group, target_group, edge_type), [0, 0.0])
+        totals[0] += 1
+        totals[1] += weight
+
+    nodes = [_super_node(graph, group_id, ids) for group_id, ids in members.items()]
+    nodes.sort(key=lambda n: (-n["properties"]["member_count"], n["id"]))
+    edges = [
+        {
+            "source_id": source_group,
+            "target_id": target_group,
+            "type": edge_type.lower(),
+            "status": None,
+            "properties": {"edge_count": count, "weight": round(weight, 6)},
+        }
+        for (source_group, target_group, edge_type), (count, weight) in sorted(super_edges.items())
+    ]
+    return {
+        "group_by": group_by,
+        "nodes": nodes,
+        "edges": edges,
+        "node_count": len(nodes),
+        "edge_count": len(edges),
+        "source_node_count": len(graph.nodes),
+        "source_edge_count": len(graph.edges),
+    }
+
+
+def aggregate_graph_json(group_by: str, app_id: Optional[str] = None) -> bytes:
+    return dumps_json(aggregate_graph(group_by, app_id))
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, int]
+
+
+class GraphReadCache:
+    """LRU of serialized graph read responses keyed by ``(endpoint, params, version)``.
+
+    Bodies are stored as JSON bytes and evicted by entry count and total
+    size. Entries of older graph versions are never hit again and age out.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _params_key(params: Dict[str, Any]) -> str:
+        return json.dumps(params, sort_keys=True, default=str)
+
+    def etag(self, endpoint: str, params: Dict[str, Any], version: int) -> str:
+        digest = hashlib.sha1(f"{endpoint}?{self._params_key(params)}".encode()).hexdigest()[:12]
+        return f'"{version}-{digest}"'
+
+    def get(self, endpoint: str, params: Dict[str, Any], version: int) -> Optional[bytes]:
+        key = (endpoint, self._params_key(params), version)
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, endpoint: str, params: Dict[str, Any], version: int, body: bytes) -> None:
+        if len(body) > settings.graph_cache_max_bytes:
+            return
+
+        key = (endpoint, self._params_key(params), version)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+
+            while self._entries and (
+                len(self._entries) > settings.graph_cache_max_entries
+                or self._size > settings.graph_cache_max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_compute(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        version: int,
+        compute: Callable[[], bytes],
+    ) -> bytes:
+        body = self.get(endpoint, params, version)
+        if body is None:
+            body = compute()
+            self.put(endpoint, params, version, body)
+        return body
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        log.debug("Graph read cache cleared")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+graph_cache = GraphReadCache()
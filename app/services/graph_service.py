@@ -1,51 +1,74 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import binascii
+import json
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 import networkx as nx
+from pydantic_core import to_json
 
+from app.config import settings
 from app.repositories import neo4j_repo, application_repo
+from app.repositories.graph_changes_repo import graph_changes_repo
+from app.repositories.graph_replica import graph_replica
+from app.repositories.graph_stats_repo import graph_stats_repo
+from app.repositories.graph_version_repo import graph_version_repo
 from app.models.topology import (
+    GraphChangesResponse,
     GraphEdge,
     GraphNode,
+    GraphPageResponse,
     GraphResponse,
     GraphStatsResponse,
+    NodeSearchHit,
+    NodeSearchResponse,
 )
 
 log = logging.getLogger(__name__)
 
 
-def _to_graph_node(raw: Dict[str, Any]) -> GraphNode:
-    reserved = {
-        "id", "type", "name", "status", "environment",
-        "source", "created_at", "updated_at", "last_seen_at",
+_NODE_RESERVED = frozenset({
+    "id", "type", "name", "status", "environment",
+    "source", "created_at", "updated_at", "last_seen_at",
+})
+_EDGE_RESERVED = frozenset({
+    "source_id", "target_id", "type", "status",
+    "source", "first_seen", "last_seen", "weight",
+})
+
+
+def _node_payload(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """``GraphNode``-shaped dict, without building the model."""
+    return {
+        "id": raw["id"],
+        "type": raw.get("type", "unknown"),
+        "name": raw.get("name", raw["id"]),
+        "status": raw.get("status"),
+        "environment": raw.get("environment"),
+        "properties": {k: v for k, v in raw.items() if k not in _NODE_RESERVED},
     }
-    props = {k: v for k, v in raw.items() if k not in reserved}
-    return GraphNode(
-        id=raw["id"],
-        type=raw.get("type", "unknown"),
-        name=raw.get("name", raw["id"]),
-        status=raw.get("status"),
-        environment=raw.get("environment"),
-        properties=props,
-    )
 
 
-def _to_graph_edge(raw: Dict[str, Any]) -> GraphEdge:
-    reserved = {
-        "source_id", "target_id", "type", "status",
-        "source", "first_seen", "last_seen", "weight",
+def _edge_payload(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """``GraphEdge``-shaped dict, without building the model."""
+    return {
+        "source_id": raw["source_id"],
+        "target_id": raw["target_id"],
+        "type": raw.get("type", "unknown").lower(),
+        "status": raw.get("status"),
+        "properties": {k: v for k, v in raw.items() if k not in _EDGE_RESERVED},
     }
-    props = {k: v for k, v in raw.items() if k not in reserved}
-    edge_type = raw.get("type", "unknown")
-    return GraphEdge(
-        source_id=raw["source_id"],
-        target_id=raw["target_id"],
-        type=edge_type.lower(),
-        status=raw.get("status"),
-        properties=props,
-    )
+
+
+def _to_graph_node(raw: Dict[str, Any]) -> GraphNode:
+    return GraphNode(**_node_payload(raw))
+
+
+def _to_graph_edge(raw: Dict[str, Any]) -> GraphEdge:
+    return GraphEdge(**_edge_payload(raw))
 
 
 def _build_response(raw_nodes: List[Dict], raw_edges: List[Dict]) -> GraphResponse:
@@ -59,15 +82,126 @@ def _build_response(raw_nodes: List[Dict], raw_edges: List[Dict]) -> GraphRespon
     )
 
 
-def get_full_graph(limit: int = 500, app_id: Optional[str] = None) -> GraphResponse:
+def dumps_json(obj: Any) -> bytes:
+    """Serialize plain data with pydantic-core's encoder; unknown values via ``str``."""
+    return to_json(obj, serialize_unknown=True)
+
+
+def render_graph(raw_nodes: List[Dict], raw_edges: List[Dict]) -> bytes:
+    """``GraphResponse`` JSON bytes built straight from repository rows.
+
+    Skips per-element model construction and response-model validation,
+    which dominate large graph responses.
+    """
+    return dumps_json({
+        "nodes": [_node_payload(n) for n in raw_nodes],
+        "edges": [_edge_payload(e) for e in raw_edges],
+        "node_count": len(raw_nodes),
+        "edge_count": len(raw_edges),
+    })
+
+
+def _read_full_graph(limit: int, app_id: Optional[str]) -> Tuple[List[Dict], List[Dict]]:
     if app_id:
         agent_names = application_repo.get_agent_names_for_application(app_id)
         if not agent_names:
-            return GraphResponse(nodes=[], edges=[], node_count=0, edge_count=0)
-        raw_nodes, raw_edges = neo4j_repo.get_graph_by_sources(agent_names, limit)
-    else:
-        raw_nodes, raw_edges = neo4j_repo.get_full_graph(limit)
-    return _build_response(raw_nodes, raw_edges)
+            return [], []
+        return neo4j_repo.get_graph_by_sources(agent_names, limit)
+    return neo4j_repo.get_full_graph(limit)
+
+
+def get_full_graph(limit: int = 500, app_id: Optional[str] = None) -> GraphResponse:
+    return _build_response(*_read_full_graph(limit, app_id))
+
+
+def get_full_graph_json(limit: int = 500, app_id: Optional[str] = None) -> bytes:
+    return render_graph(*_read_full_graph(limit, app_id))
+
+
+def _encode_cursor(after: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"after": after}).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> str:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded.encode()))["after"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(after, str):
+        raise ValueError("Invalid cursor")
+    return after
+
+
+def _sources_for_app(app_id: Optional[str]) -> Optional[List[str]]:
+    if not app_id:
+        return None
+    return application_repo.get_agent_names_for_application(app_id)
+
+
+def get_graph_page(
+    cursor: Optional[str] = None,
+    limit: int = 500,
+    app_id: Optional[str] = None,
+) -> GraphPageResponse:
+    """One keyset page of nodes (by ``external_id``) with their outgoing edges.
+
+    Raises ``ValueError`` for a malformed cursor.
+    """
+    after = _decode_cursor(cursor) if cursor else ""
+    sources = _sources_for_app(app_id)
+    if sources is not None and not sources:
+        return GraphPageResponse(nodes=[], edges=[], node_count=0, edge_count=0)
+
+    raw_nodes, raw_edges = neo4j_repo.get_nodes_page(after, limit, sources)
+    nodes = [_to_graph_node(n) for n in raw_nodes]
+    edges = [_to_graph_edge(e) for e in raw_edges]
+    return GraphPageResponse(
+        nodes=nodes,
+        edges=edges,
+        node_count=len(nodes),
+        edge_count=len(edges),
+        next_cursor=_encode_cursor(raw_nodes[-1]["id"]) if len(raw_nodes) == limit else None,
+    )
+
+
+def iter_graph_ndjson(app_id: Optional[str] = None) -> Iterator[bytes]:
+    """Whole graph as NDJSON lines: every node, then every edge.
+
+    Each line is ``{"kind": "node"|"edge", "data": {...}}`` with the
+    ``GraphNode``/``GraphEdge`` schema. Nothing is materialized.
+    """
+    sources = _sources_for_app(app_id)
+    if sources is not None and not sources:
+        return
+
+    for kind, raw in neo4j_repo.iter_graph(sources):
+        payload = _node_payload(raw) if kind == "node" else _edge_payload(raw)
+        yield dumps_json({"kind": kind, "data": payload}) + b"\n"
+
+
+def warm_replica() -> None:
+    """Start loading the in-process replica when it is the configured backend."""
+    if settings.graph_backend == "replica":
+        graph_replica.reload_in_background(neo4j_repo.iter_graph)
+
+
+def use_replica() -> bool:
+    """Whether traversal reads should go to the replica right now.
+
+    Falls back to Neo4j while the replica is loading or behind the current
+    graph version, and kicks off a reload when it has been dropped.
+    """
+    if settings.graph_backend != "replica":
+        return False
+    if graph_replica.is_current(graph_version_repo.current()):
+        return True
+    warm_replica()
+    return False
+
+
+def _traversal_reader():
+    return graph_replica if use_replica() else neo4j_repo
 
 
 def get_subgraph(
@@ -75,28 +209,203 @@ def get_subgraph(
     depth: int = 2,
     node_types: Optional[List[str]] = None,
     edge_types: Optional[List[str]] = None,
+    max_nodes: Optional[int] = None,
 ) -> GraphResponse:
-    raw_nodes, raw_edges = neo4j_repo.get_subgraph(
-        center_id, depth, node_types, edge_types,
+    raw_nodes, raw_edges = _traversal_reader().get_subgraph(
+        center_id, depth, node_types, edge_types, max_nodes,
     )
     return _build_response(raw_nodes, raw_edges)
 
 
+def get_subgraph_json(
+    center_id: str,
+    depth: int = 2,
+    node_types: Optional[List[str]] = None,
+    edge_types: Optional[List[str]] = None,
+    max_nodes: Optional[int] = None,
+) -> bytes:
+    return render_graph(*_traversal_reader().get_subgraph(center_id, depth, node_types, edge_types, max_nodes))
+
+
+def subgraph_node_ids(center_id: str, depth: int = 2) -> Set[str]:
+    raw_nodes, _ = _traversal_reader().get_subgraph(center_id, depth)
+    return {node["id"] for node in raw_nodes}
+
+
 def find_path(source_id: str, target_id: str, max_depth: int = 5) -> GraphResponse:
-    raw_nodes, raw_edges = neo4j_repo.find_shortest_path(source_id, target_id, max_depth)
+    raw_nodes, raw_edges = _traversal_reader().find_shortest_path(source_id, target_id, max_depth)
     return _build_response(raw_nodes, raw_edges)
 
 
-def get_impact(node_id: str, depth: int = 3, direction: str = "downstream") -> GraphResponse:
-    raw_nodes, raw_edges = neo4j_repo.get_impact(node_id, depth, direction)
+def find_path_json(source_id: str, target_id: str, max_depth: int = 5) -> bytes:
+    return render_graph(*_traversal_reader().find_shortest_path(source_id, target_id, max_depth))
+
+
+def get_impact(
+    node_id: str,
+    depth: int = 3,
+    direction: str = "downstream",
+    max_nodes: Optional[int] = None,
+) -> GraphResponse:
+    raw_nodes, raw_edges = _traversal_reader().get_impact(node_id, depth, direction, max_nodes)
     return _build_response(raw_nodes, raw_edges)
 
 
+def get_impact_json(
+    node_id: str,
+    depth: int = 3,
+    direction: str = "downstream",
+    max_nodes: Optional[int] = None,
+) -> bytes:
+    return render_graph(*_traversal_reader().get_impact(node_id, depth, direction, max_nodes))
+
+
+def search_nodes(
+    query: str,
+    node_types: Optional[List[str]] = None,
+    limit: int = 20,
+    fuzzy: bool = True,
+) -> NodeSearchResponse:
+    rows = neo4j_repo.search_nodes(
+        query, node_types, limit, fuzzy, candidates=settings.graph_search_candidates,
+    )
+    hits = [NodeSearchHit(**row) for row in rows]
+    return NodeSearchResponse(query=query, hits=hits, count=len(hits))
+
+
+def _coalesce_changes(entries: List[Tuple[int, Dict[str, Any]]]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """Fold the log into one net change per element, in first-seen order.
+
+    Deleting a node also deletes the edges touching it that appeared
+    earlier in the range, as ``DETACH DELETE`` did.
+    """
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    edges_by_node: Dict[str, List[Tuple[str, str]]] = {}
+    for _, change in entries:
+        op, data = change["op"], change.get("data")
+        key = (change["kind"], change["id"])
+        item = merged.setdefault(key, {"first": op, "op": None, "data": None, "deleted": False})
+        if op == "deleted":
+            item["deleted"] = True
+            item["data"] = data
+        elif item["op"] in (None, "deleted"):
+            item["data"] = data
+        else:
+            # Upserts merge properties, so later fields win over earlier ones
+            item["data"] = {**item["data"], **data}
+        item["op"] = op
+
+        if key[0] == "edge" and op != "deleted":
+            edges_by_node.setdefault(data["source_id"], []).append(key)
+            edges_by_node.setdefault(data["target_id"], []).append(key)
+        elif key[0] == "node" and op == "deleted":
+            for edge_key in edges_by_node.pop(key[1], ()):
+                edge = merged[edge_key]
+                edge["deleted"] = True
+                edge["op"] = "deleted"
+    return merged
+
+
+def net_changes(entries: List[Tuple[int, Dict[str, Any]]]) -> List[Tuple[str, str, str, Dict[str, Any]]]:
+    """Coalesced log entries as ``(section, kind, element_id, data)``.
+
+    ``section`` is ``deleted``, ``created`` or ``updated``. An element
+    deleted and written again in the range is both deleted and created;
+    one created and deleted in the range is dropped.
+    """
+    result: List[Tuple[str, str, str, Dict[str, Any]]] = []
+    for (kind, element_id), item in _coalesce_changes(entries).items():
+        if item["op"] == "deleted":
+            if item["first"] != "created":
+                result.append(("deleted", kind, element_id, item["data"]))
+            continue
+        if item["deleted"]:
+            result.append(("deleted", kind, element_id, item["data"]))
+        section = "created" if item["first"] == "created" or item["deleted"] else "updated"
+        result.append((section, kind, element_id, item["data"]))
+    return result
+
+
+def resync_required(since: int, entries: List[Tuple[int, Dict[str, Any]]],
+                    oldest: Optional[int], latest: int) -> bool:
+    """Whether entries after ``since`` are missing from the log or it holds a reset."""
+    trimmed = since < latest and (oldest is None or oldest > since + 1)
+    return since > latest or trimmed or any(change["op"] == "reset" for _, change in entries)
+
+
+def get_changes(since: int, limit: int = 1000) -> GraphChangesResponse:
+    """Net node and edge changes after sequence number ``since``.
+
+    Apply ``deleted`` first, then ``created``, then ``updated``. When the
+    cursor predates the retained log, is ahead of it, or the range holds a
+    reset, only ``resync_required`` and ``latest`` are returned.
+    """
+    entries, oldest, latest = graph_changes_repo.read(since, limit)
+    if resync_required(since, entries, oldest, latest):
+        return GraphChangesResponse(since=since, next_since=latest, latest=latest, resync_required=True)
+
+    response = GraphChangesResponse(
+        since=since,
+        next_since=entries[-1][0] if entries else since,
+        latest=latest,
+        has_more=len(entries) == limit and entries[-1][0] < latest,
+    )
+    for section, kind, element_id, data in net_changes(entries):
+        if section == "deleted":
+            if kind == "node":
+                response.deleted.node_ids.append(element_id)
+            else:
+                response.deleted.edges.append(_to_graph_edge(data))
+            continue
+        target = response.created if section == "created" else response.updated
+        if kind == "node":
+            target.nodes.append(_to_graph_node(data))
+        else:
+            target.edges.append(_to_graph_edge(data))
+    return response
+
+
+def reconcile_stats() -> Dict[str, Dict[str, int]]:
+    """Recount the graph and overwrite the incrementally maintained counters."""
+    counts = neo4j_repo.count_graph()
+    graph_stats_repo.replace(counts)
+    return counts
+
+
+async def reconcile_stats_periodically(interval_seconds: float) -> None:
+    while True:
+        try:
+            counts = await asyncio.to_thread(reconcile_stats)
+            log.info(f"Graph stats reconciled: {sum(counts['nodes_by_type'].values())} nodes")
+        except Exception as e:
+            log.error(f"Graph stats reconciliation failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+def _sum_by_application(by_source: Dict[str, int], agents_by_app: Dict[str, List[str]]) -> Dict[str, int]:
+    return {
+        app_id: sum(by_source.get(name, 0) for name in names)
+        for app_id, names in agents_by_app.items()
+    }
+
+
 def get_stats() -> GraphStatsResponse:
-    data = neo4j_repo.get_graph_stats()
-    if "edges_by_type" in data:
-        data["edges_by_type"] = {k.lower(): v for k, v in data["edges_by_type"].items()}
-    return GraphStatsResponse(**data)
+    """Counters from Redis, O(#types + #sources); recounted on first use."""
+    counts = graph_stats_repo.read()
+    if counts is None:
+        counts = reconcile_stats()
+
+    agents_by_app = application_repo.get_agent_names_by_application()
+    return GraphStatsResponse(
+        total_nodes=sum(counts["nodes_by_type"].values()),
+        total_edges=sum(counts["edges_by_type"].values()),
+        nodes_by_type=counts["nodes_by_type"],
+        edges_by_type={k.lower(): v for k, v in counts["edges_by_type"].items()},
+        nodes_by_source=counts["nodes_by_source"],
+        edges_by_source=counts["edges_by_source"],
+        nodes_by_application=_sum_by_application(counts["nodes_by_source"], agents_by_app),
+        edges_by_application=_sum_by_application(counts["edges_by_source"], agents_by_app),
+    )
 
 
 def _build_nx_graph(response: GraphResponse) -> nx.DiGraph:
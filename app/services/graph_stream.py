@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.repositories.graph_changes_repo import graph_changes_repo
+from app.repositories.redis_connection import redis_client
+from app.services import graph_service
+from app.services.graph_service import _edge_payload, _node_payload, dumps_json
+
+log = logging.getLogger(__name__)
+
+_KEEPALIVE = b": keepalive\n\n"
+_SECTIONS = (
+    ("created", "node", "nodes"), ("created", "edge", "edges"),
+    ("updated", "node", "nodes"), ("updated", "edge", "edges"),
+    ("deleted", "node", "node_ids"), ("deleted", "edge", "edges"),
+)
+
+RootKey = Tuple[str, int]
+# (section, kind, data, serialized payload)
+RenderedChange = Tuple[str, str, Dict[str, Any], bytes]
+
+
+def sse_event(event: str, data: bytes, event_id: Optional[int] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: ".encode() + data + b"\n\n"
+
+
+def _render(section: str, kind: str, element_id: str, data: Dict[str, Any]) -> bytes:
+    if section == "deleted" and kind == "node":
+        return dumps_json(element_id)
+    return dumps_json(_node_payload(data) if kind == "node" else _edge_payload(data))
+
+
+def _batch_body(since: int, next_since: int, changes: List[RenderedChange]) -> bytes:
+    """``/graph/changes``-shaped JSON assembled from pre-serialized elements."""
+    groups: Dict[Tuple[str, str], List[bytes]] = {(section, kind): [] for section, kind, _ in _SECTIONS}
+    for section, kind, _, fragment in changes:
+        groups[(section, kind)].append(fragment)
+
+    sections: Dict[str, List[bytes]] = {}
+    for section, kind, field in _SECTIONS:
+        fragment = b'"%s":[%s]' % (field.encode(), b",".join(groups[(section, kind)]))
+        sections.setdefault(section, []).append(fragment)
+    body = b",".join(b'"%s":{%s}' % (name.encode(), b",".join(parts)) for name, parts in sections.items())
+    return b'{"since":%d,"next_since":%d,%s}' % (since, next_since, body)
+
+
+class StreamSubscriber:
+    """One SSE connection: its filters and a bounded outbox."""
+
+    def __init__(
+        self,
+        sources: Optional[Set[str]],
+        node_types: Optional[Set[str]],
+        root: Optional[RootKey],
+    ) -> None:
+        self.sources = sources
+        self.node_types = node_types
+        self.root = root
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=settings.graph_stream_queue_size)
+
+    @property
+    def unfiltered(self) -> bool:
+        return self.sources is None and self.node_types is None and self.root is None
+
+    def accepts(self, kind: str, data: Dict[str, Any], members: Optional[Set[str]]) -> bool:
+        if self.sources is not None and data.get("source") not in self.sources:
+            return False
+        if kind == "node":
+            if self.node_types is not None and data.get("type") not in self.node_types:
+                return False
+            return members is None or data["id"] in members
+        return members is None or (data["source_id"] in members and data["target_id"] in members)
+
+    def offer(self, message: bytes) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop its backlog and tell it to reload
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(sse_event("resync", b"{}"))
+
+
+class GraphChangeBroadcaster:
+    """Tails the graph change log once and pushes batches to SSE subscribers.
+
+    A single task reads ``graph:changes`` while anyone is subscribed. After
+    the first entry of a batch it keeps collecting for
+    ``graph_stream_window_ms``, coalesces the batch and serializes each
+    element once; subscriber filters only pick pre-rendered fragments, and
+    unfiltered subscribers share one message. Subgraph-root filters cost one
+    subgraph read per distinct root and depth per batch.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: Set[StreamSubscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._members: Dict[RootKey, Set[str]] = {}
+        self.last_seq = 0
+
+    async def subscribe(
+        self,
+        app_id: Optional[str] = None,
+        node_types: Optional[List[str]] = None,
+        root_id: Optional[str] = None,
+        depth: int = 2,
+    ) -> StreamSubscriber:
+        sources = None
+        if app_id:
+            sources = set(await asyncio.to_thread(graph_service._sources_for_app, app_id) or ())
+        subscriber = StreamSubscriber(
+            sources,
+            set(node_types) if node_types else None,
+            (root_id, depth) if root_id else None,
+        )
+        self._subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self.last_seq = await asyncio.to_thread(graph_changes_repo.latest)
+            self._task = asyncio.create_task(self._run())
+        return subscriber
+
+    def unsubscribe(self, subscriber: StreamSubscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    async def events(
+        self,
+        subscriber: StreamSubscriber,
+        is_disconnected: Callable[[], Awaitable[bool]],
+    ) -> AsyncIterator[bytes]:
+        """SSE byte stream for one subscriber; unsubscribes when it ends."""
+        try:
+            yield sse_event("ready", dumps_json({"latest": self.last_seq}), self.last_seq)
+            while not await is_disconnected():
+                try:
+                    yield await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=settings.graph_stream_keepalive_seconds,
+                    )
+                except asyncio.TimeoutError:
+                    yield _KEEPALIVE
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def stop(self) -> None:
+        self._subscribers.clear()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _read(self, after: int, block_ms: Optional[int]) -> List[Tuple[int, Dict[str, Any]]]:
+        response = await redis_client.client.xread(
+            {graph_changes_repo.STREAM_KEY: f"{after}-0"},
+            count=settings.graph_stream_max_batch,
+            block=block_ms,
+        )
+        return [
+            (int(entry_id.split("-", 1)[0]), json.loads(fields["c"]))
+            for _, rows in response or ()
+            for entry_id, fields in rows
+        ]
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            try:
+                entries = await self._read(self.last_seq, 1000)
+                if not entries:
+                    continue
+                await asyncio.sleep(settings.graph_stream_window_ms / 1000)
+                while len(entries) < settings.graph_stream_max_batch:
+                    more = await self._read(entries[-1][0], None)
+                    if not more:
+                        break
+                    entries.extend(more)
+                await self._publish(entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"Graph change broadcast failed: {e}")
+                await asyncio.sleep(1)
+        self._members.clear()
+
+    async def _root_members(self) -> Dict[RootKey, Set[str]]:
+        """Subgraph node ids per subscribed root, unioned with the previous
+        batch so deletions of former members still pass."""
+        roots = {s.root for s in self._subscribers if s.root is not None}
+        members: Dict[RootKey, Set[str]] = {}
+        for root in roots:
+            current = await asyncio.to_thread(graph_service.subgraph_node_ids, *root)
+            members[root] = current | self._members.get(root, set())
+            self._members[root] = current
+        for root in set(self._members) - roots:
+            del self._members[root]
+        return members
+
+    async def _publish(self, entries: List[Tuple[int, Dict[str, Any]]]) -> None:
+        since, self.last_seq = self.last_seq, entries[-1][0]
+        oldest = entries[0][0]
+        if graph_service.resync_required(since, entries, oldest, self.last_seq):
+            message = sse_event("resync", dumps_json({"latest": self.last_seq}), self.last_seq)
+            for subscriber in list(self._subscribers):
+                subscriber.offer(message)
+            return
+
+        rendered: List[RenderedChange] = [
+            (section, kind, data, _render(section, kind, element_id, data))
+            for section, kind, element_id, data in graph_service.net_changes(entries)
+        ]
+        if not rendered:
+            return
+        members = await self._root_members()
+
+        shared: Optional[bytes] = None
+        for subscriber in list(self._subscribers):
+            if subscriber.unfiltered:
+                if shared is None:
+                    shared = sse_event("changes", _batch_body(since, self.last_seq, rendered), self.last_seq)
+                subscriber.offer(shared)
+                continue
+
+            root_members = members.get(subscriber.root) if subscriber.root else None
+            selected = [item for item in rendered if subscriber.accepts(item[1], item[2], root_members)]
+            if selected:
+                subscriber.offer(sse_event("changes", _batch_body(since, self.last_seq, selected), self.last_seq))
+
+
+graph_broadcaster = GraphChangeBroadcaster()
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
+from app.models.mapper.mapping import UnresolvedReference
 from app.models.topology import TopologyUpdate
 from app.repositories import neo4j_repo
+from app.repositories.pending_edge_repo import pending_edge_repo
 
 log = logging.getLogger(__name__)
 
@@ -25,7 +28,37 @@ class IngestResult:
         }
 
 
-def process_topology_update(update: TopologyUpdate) -> IngestResult:
+async def write_graph(
+    nodes: List[Dict[str, Any]],
+    edges: List[Dict[str, Any]],
+    source: str,
+    unresolved: Optional[List[UnresolvedReference]] = None,
+) -> Tuple[int, int]:
+    """Upsert nodes and edges on behalf of ``source``; every graph writer goes through here.
+
+    References to targets that do not exist yet are parked, then every
+    pending edge (including this batch's own) whose target just arrived is
+    added to ``edges``. A reference leaves the queue only once its edge was
+    written. The Neo4j writes run in threads to keep the event loop free.
+    Returns ``(nodes, edges)`` processed.
+    """
+    await pending_edge_repo.add(unresolved or [])
+    nodes_processed = 0
+    if nodes:
+        nodes_processed = await asyncio.to_thread(neo4j_repo.upsert_nodes, nodes, source=source)
+    pending = await pending_edge_repo.resolve_for_nodes(nodes)
+    edges = edges + pending.edges
+
+    if edges:
+        written = await asyncio.to_thread(neo4j_repo.upsert_edges_written, edges, source=source)
+        await pending_edge_repo.acknowledge(pending, written)
+    return nodes_processed, len(edges)
+
+
+async def process_topology_update(
+    update: TopologyUpdate,
+    unresolved: Optional[List[UnresolvedReference]] = None,
+) -> IngestResult:
     result = IngestResult()
 
     node_dicts = [
@@ -43,19 +76,11 @@ def process_topology_update(update: TopologyUpdate) -> IngestResult:
     )
 
     try:
-        result.nodes_processed = neo4j_repo.upsert_nodes(
-            node_dicts, source=update.source,
-        )
-    except Exception as exc:
-        log.exception("Failed to upsert nodes")
-        result.errors.append(f"node upsert failed: {exc}")
-
-    try:
-        result.edges_processed = neo4j_repo.upsert_edges(
-            edge_dicts, source=update.source,
+        result.nodes_processed, result.edges_processed = await write_graph(
+            node_dicts, edge_dicts, update.source, unresolved,
         )
     except Exception as exc:
-        log.exception("Failed to upsert edges")
-        result.errors.append(f"edge upsert failed: {exc}")
+        log.exception("Failed to write topology update")
+        result.errors.append(f"upsert failed: {exc}")
 
     return result
@@ -1,36 +1,219 @@
 from __future__ import annotations
 
+import hashlib
+import itertools
+import json
 import logging
-from typing import Any, Dict, List, Optional, Tuple
-
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
 from app.models.mapper.mapping import (
     MappingConfig,
     FieldMapping,
-    ConditionalRule,
     AutoEdgeRule,
     UnresolvedReference,
 )
 from app.models.mapper.raw_data import RawDataChunk
 from app.repositories.edge_preset_repo import edge_preset_repo
+from app.repositories.node_lookup_index import node_lookup_index
+from app.services.mapping_plan import MappingPlan, RecordScope
 from app.services.transform_service import transform_service
 
 log = logging.getLogger(__name__)
 
+ReferenceKey = Tuple[Optional[str], str, str]
+
+ChunkOutput = Tuple[str, List[Dict[str, Any]], List[Dict[str, Any]], Optional[str]]
+
+PLAN_CACHE_SIZE = 64
+
+
+class MapChunksResult:
+    def __init__(self) -> None:
+        self.nodes: List[Dict[str, Any]] = []
+        self.edges: List[Dict[str, Any]] = []
+        self.unresolved: List[UnresolvedReference] = []
+        self.chunks_processed: int = 0
+        self.errors: List[str] = []
+        self.failed_chunk_ids: List[str] = []
+
+
+class EdgeRuleSet:
+    """Preset plus mapping edge rules, indexed by source node type."""
+
+    __slots__ = ("rules", "by_source_type")
+
+    def __init__(self, rules: List[AutoEdgeRule]) -> None:
+        self.rules = rules
+        self.by_source_type: Dict[str, List[AutoEdgeRule]] = {}
+        for rule in rules:
+            self.by_source_type.setdefault(rule.source_type, []).append(rule)
+
 
 class MapperService:
+    def __init__(self) -> None:
+        self._plans: "OrderedDict[Tuple[str, str, str], MappingPlan]" = OrderedDict()
+        self._rule_sets: "OrderedDict[Tuple[Any, ...], EdgeRuleSet]" = OrderedDict()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_workers = 0
+        self._pool_lock = threading.Lock()
+
     def map_chunk(
         self,
         chunk: RawDataChunk,
         mapping: MappingConfig,
     ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[UnresolvedReference]]:
-        raw_data = chunk.data
+        plan = self.compile_mapping(mapping)
+        nodes, legacy_edges = self._map_payload(chunk.data, plan)
+        return self._link(nodes, legacy_edges, mapping)
+
+    def map_chunks(
+        self,
+        chunks: List[RawDataChunk],
+        mapping: MappingConfig,
+    ) -> MapChunksResult:
+        """Map a batch of chunks and link them with one reference lookup.
+
+        With ``settings.mapper_workers`` > 0 and enough chunks, the pure
+        mapping work is spread across a shared process pool. The mapping
+        travels with each batch and every worker keeps its compiled plans,
+        so different mappings can use the pool in turn. Outputs are merged
+        and deduplicated by id.
+        """
+        result = MapChunksResult()
         nodes: List[Dict[str, Any]] = []
-        edges: List[Dict[str, Any]] = []
-        unresolved: List[UnresolvedReference] = []
+        legacy_edges: List[Dict[str, Any]] = []
+
+        if settings.mapper_workers > 0 and len(chunks) >= settings.mapper_pool_min_chunks:
+            outputs = self._map_in_pool(chunks, mapping)
+        else:
+            plan = self.compile_mapping(mapping)
+            outputs = [_map_chunk_safely(self, plan, chunk.id, chunk.data) for chunk in chunks]
+
+        for chunk_id, chunk_nodes, chunk_edges, error in outputs:
+            if error is not None:
+                log.error(f"Error processing chunk {chunk_id}: {error}")
+                result.errors.append(f"Chunk {chunk_id[:8]}: {error}")
+                result.failed_chunk_ids.append(chunk_id)
+                continue
+            nodes.extend(chunk_nodes)
+            legacy_edges.extend(chunk_edges)
+            result.chunks_processed += 1
+
+        result.nodes, result.edges, result.unresolved = self._link(nodes, legacy_edges, mapping)
+        return result
+
+    def _map_in_pool(
+        self,
+        chunks: List[RawDataChunk],
+        mapping: MappingConfig,
+    ) -> List[ChunkOutput]:
+        batch_size = max(1, settings.mapper_pool_batch_size)
+        batches = [
+            [(chunk.id, chunk.data) for chunk in chunks[i:i + batch_size]]
+            for i in range(0, len(chunks), batch_size)
+        ]
+
+        with self._pool_lock:
+            if self._pool is None or self._pool_workers != settings.mapper_workers:
+                self.shutdown_pool()
+                self._pool = ProcessPoolExecutor(
+                    max_workers=settings.mapper_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._pool_workers = settings.mapper_workers
+            pool = self._pool
+
+        outputs: List[ChunkOutput] = []
+        try:
+            for batch_output in pool.map(_map_batch, itertools.repeat(mapping), batches):
+                outputs.extend(batch_output)
+        except BrokenProcessPool:
+            # A worker died (OOM kill, segfault): drop the pool so the next
+            # call starts a fresh one and map this batch in-process
+            log.warning("Mapper process pool broke, mapping the batch in-process")
+            with self._pool_lock:
+                if self._pool is pool:
+                    self.shutdown_pool()
+            plan = self.compile_mapping(mapping)
+            return [_map_chunk_safely(self, plan, chunk.id, chunk.data) for chunk in chunks]
+        return outputs
+
+    def shutdown_pool(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._pool_workers = 0
+
+    def _map_payload(
+        self,
+        raw_data: Dict[str, Any],
+        plan: MappingPlan,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        nodes: List[Dict[str, Any]] = []
+        legacy_edges: List[Dict[str, Any]] = []
 
-        applicable_rules = self._evaluate_conditional_rules(raw_data, mapping.conditional_rules)
+        for record in self._expand_records(raw_data, plan):
+            record_nodes, legacy_edge = self._map_record(record, plan)
+            nodes.extend(record_nodes)
+            if legacy_edge:
+                legacy_edges.append(legacy_edge)
 
-        mappings_by_type = self._group_mappings_by_type(mapping.field_mappings)
+        return nodes, legacy_edges
+
+    def _link(
+        self,
+        nodes: List[Dict[str, Any]],
+        legacy_edges: List[Dict[str, Any]],
+        mapping: MappingConfig,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[UnresolvedReference]]:
+        candidates = self._collect_edge_candidates(nodes, self._get_edge_rule_set(mapping))
+
+        references = {
+            (rule.target_type, rule.target_field, value)
+            for _, rule, value in candidates
+        }
+        for legacy_edge in legacy_edges:
+            references |= self._edge_name_references(legacy_edge)
+        resolved = self._resolve_references(references)
+
+        edges = [self._resolve_edge_names(edge, resolved) for edge in legacy_edges]
+
+        auto_edges, unresolved = self._build_auto_edges(candidates, resolved)
+        edges.extend(auto_edges)
+
+        return self._merge_nodes(nodes), self._dedupe_edges(edges), self._dedupe_unresolved(unresolved)
+
+    def compile_mapping(self, mapping: MappingConfig) -> MappingPlan:
+        key = MappingPlan.cache_key(mapping)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = MappingPlan(mapping)
+            self._plans[key] = plan
+            while len(self._plans) > PLAN_CACHE_SIZE:
+                self._plans.popitem(last=False)
+        else:
+            self._plans.move_to_end(key)
+        return plan
+
+    def _map_record(
+        self,
+        raw_data: Dict[str, Any],
+        plan: MappingPlan,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        mapping = plan.mapping
+        scope = RecordScope(raw_data)
+        nodes: List[Dict[str, Any]] = []
+
+        applicable_rules = plan.rule_dispatcher.match(raw_data)
+
+        mappings_by_type = plan.mappings_by_type
 
         if applicable_rules:
             primary_types = {rule.target_node_type for rule in applicable_rules}
@@ -38,73 +221,118 @@ class MapperService:
             for node_type in primary_types:
                 field_maps = mappings_by_type.get(node_type, [])
                 node = self._map_to_node(
-                    raw_data,
+                    scope,
                     node_type,
                     field_maps,
-                    mapping,
+                    plan,
                 )
                 if node:
                     if self._is_valid_node_for_type(node, node_type):
                         nodes.append(node)
-        elif not mapping.conditional_rules:
+        elif not plan.has_conditional_rules:
             node_types = set(mappings_by_type.keys())
             for node_type in node_types:
                 node = self._map_to_node(
-                    raw_data,
+                    scope,
                     node_type,
                     mappings_by_type.get(node_type, []),
-                    mapping,
+                    plan,
                 )
                 if node and self._is_valid_node_for_type(node, node_type):
                     nodes.append(node)
 
+        legacy_edge = None
         if mapping.edge_source_path and mapping.edge_target_path:
-            edge = self._map_to_edge(raw_data, mapping)
-            if edge:
-                edges.append(edge)
-
-        edge_rules = self._get_edge_rules(mapping)
-        auto_edges, auto_unresolved = self._auto_create_edges(nodes, edge_rules)
-        edges.extend(auto_edges)
-        unresolved.extend(auto_unresolved)
-
-        return nodes, edges, unresolved
-
-    def _get_edge_rules(self, mapping: MappingConfig) -> List[AutoEdgeRule]:
-        rules: List[AutoEdgeRule] = []
-
-        preset_id = mapping.edge_preset_id or "default"
-        preset_rules = edge_preset_repo.get_rules(preset_id)
-        rules.extend(preset_rules)
+            legacy_edge = self._map_to_edge(raw_data, mapping)
 
-        rules.extend(mapping.auto_edge_rules)
+        return nodes, legacy_edge
 
-        return rules
-
-    def _evaluate_conditional_rules(
+    def _expand_records(
         self,
         raw_data: Dict[str, Any],
-        rules: List[ConditionalRule],
-    ) -> List[ConditionalRule]:
-        matching = []
-        for rule in rules:
-            if transform_service.evaluate_condition(raw_data, rule.condition):
-                matching.append(rule)
+        plan: MappingPlan,
+    ) -> List[Dict[str, Any]]:
+        """Fan a payload out into one record per element of ``iterate_path``.
+
+        Each record is a shallow copy of the document in which every iterated
+        list is narrowed to the current element, so existing ``[0]`` paths
+        read the element while sibling keys keep the parent context. Payloads
+        without any element are mapped as a single record.
+        """
+        if not plan.iterate_segments:
+            return [raw_data]
+
+        records = self._narrow(raw_data, plan.iterate_segments)
+        return records or [raw_data]
+
+    def _narrow(
+        self,
+        data: Any,
+        segments: List[Tuple[str, bool]],
+    ) -> List[Any]:
+        if not segments:
+            return [data]
+        if not isinstance(data, dict):
+            return []
+
+        key, iterate = segments[0]
+        child = data.get(key)
+
+        if not iterate:
+            return [{**data, key: narrowed} for narrowed in self._narrow(child, segments[1:])]
+
+        if not isinstance(child, list):
+            return []
+
+        records: List[Any] = []
+        for element in child:
+            for narrowed in self._narrow(element, segments[1:]):
+                records.append({**data, key: [narrowed]})
+        return records
+
+    def _merge_nodes(self, nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        merged: Dict[str, Dict[str, Any]] = {}
+        for node in nodes:
+            existing = merged.get(node["id"])
+            if existing is None:
+                merged[node["id"]] = dict(node)
+            else:
+                existing.update(node)
+        return list(merged.values())
 
-        matching.sort(key=lambda r: r.priority, reverse=True)
-        return matching
+    def _dedupe_edges(self, edges: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        unique: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        for edge in edges:
+            unique.setdefault((edge["source_id"], edge["target_id"], edge["type"]), edge)
+        return list(unique.values())
 
-    def _group_mappings_by_type(
+    def _dedupe_unresolved(
         self,
-        mappings: List[FieldMapping],
-    ) -> Dict[str, List[FieldMapping]]:
-        grouped: Dict[str, List[FieldMapping]] = {}
-        for mapping in mappings:
-            node_type = mapping.target_node_type
-            if node_type not in grouped:
-                grouped[node_type] = []
-            grouped[node_type].append(mapping)
-        return grouped
+        unresolved: List[UnresolvedReference],
+    ) -> List[UnresolvedReference]:
+        unique: Dict[Tuple[str, str, str], UnresolvedReference] = {}
+        for ref in unresolved:
+            unique.setdefault((ref.source_node_id, ref.rule_id, ref.expected_target_value), ref)
+        return list(unique.values())
+
+    def _get_edge_rules(self, mapping: MappingConfig) -> List[AutoEdgeRule]:
+        return self._get_edge_rule_set(mapping).rules
+
+    def _get_edge_rule_set(self, mapping: MappingConfig) -> EdgeRuleSet:
+        preset_id = mapping.edge_preset_id or "default"
+        preset_rules = edge_preset_repo.get_rules(preset_id)
+        key = (*MappingPlan.cache_key(mapping), preset_id, edge_preset_repo.revision(preset_id))
+
+        rule_set = self._rule_sets.get(key)
+        if rule_set is None:
+            rule_set = EdgeRuleSet([*preset_rules, *mapping.auto_edge_rules])
+            node_lookup_index.track_rules(rule_set.rules)
+            self._rule_sets[key] = rule_set
+            while len(self._rule_sets) > PLAN_CACHE_SIZE:
+                self._rule_sets.popitem(last=False)
+        else:
+            self._rule_sets.move_to_end(key)
+        return rule_set
 
     def _is_valid_node_for_type(self, node: Dict[str, Any], node_type: str) -> bool:
         validation_rules = {
@@ -178,19 +406,19 @@ class MapperService:
 
     def _map_to_node(
         self,
-        raw_data: Dict[str, Any],
+        scope: RecordScope,
         node_type: str,
         field_mappings: List[FieldMapping],
-        mapping_config: MappingConfig,
+        plan: MappingPlan,
     ) -> Optional[Dict[str, Any]]:
         node: Dict[str, Any] = {"type": node_type}
-        context = {"source_data": raw_data, "node_type": node_type}
+        context = {"source_data": scope.data, "node_type": node_type}
 
         for field_mapping in field_mappings:
             if field_mapping.target_node_type != node_type:
                 continue
 
-            value = transform_service.extract(raw_data, field_mapping.source_path)
+            value = plan.extract(scope, field_mapping.source_path)
 
             transformed = transform_service.apply_transform(
                 value,
@@ -222,8 +450,6 @@ class MapperService:
         raw_data: Dict[str, Any],
         mapping: MappingConfig,
     ) -> Optional[Dict[str, Any]]:
-        from app.repositories.neo4j_repo import find_node_by_name
-
         if not mapping.edge_source_path or not mapping.edge_target_path:
             return None
 
@@ -235,20 +461,6 @@ class MapperService:
             log.debug("Skipping edge: missing source_id or target_id")
             return None
 
-        if not str(source_id).startswith("urn:"):
-            source_node = find_node_by_name(str(source_id))
-            if source_node:
-                source_id = source_node["id"]
-            else:
-                source_id = f"urn:resource:{source_id}"
-
-        if not str(target_id).startswith("urn:"):
-            target_node = find_node_by_name(str(target_id))
-            if target_node:
-                target_id = target_node["id"]
-            else:
-                target_id = f"urn:resource:{target_id}"
-
         edge = {
             "source_id": str(source_id),
             "target_id": str(target_id),
@@ -257,25 +469,38 @@ class MapperService:
 
         return edge
 
-    def _auto_create_edges(
+    def _edge_name_references(self, edge: Dict[str, Any]) -> Set[ReferenceKey]:
+        return {
+            (None, "name", edge[key])
+            for key in ("source_id", "target_id")
+            if not edge[key].startswith("urn:")
+        }
+
+    def _resolve_edge_names(
         self,
-        nodes: List[Dict[str, Any]],
-        rules: List[AutoEdgeRule],
-    ) -> Tuple[List[Dict[str, Any]], List[UnresolvedReference]]:
-        from app.repositories.neo4j_repo import find_node_by_field
+        edge: Dict[str, Any],
+        resolved: Dict[ReferenceKey, str],
+    ) -> Dict[str, Any]:
+        for key in ("source_id", "target_id"):
+            value = edge[key]
+            if not value.startswith("urn:"):
+                edge[key] = resolved.get((None, "name", value), f"urn:resource:{value}")
+        return edge
 
-        edges: List[Dict[str, Any]] = []
-        unresolved: List[UnresolvedReference] = []
+    def _collect_edge_candidates(
+        self,
+        nodes: List[Dict[str, Any]],
+        rule_set: EdgeRuleSet,
+    ) -> List[Tuple[Dict[str, Any], AutoEdgeRule, str]]:
+        candidates: List[Tuple[Dict[str, Any], AutoEdgeRule, str]] = []
+        by_source_type = rule_set.by_source_type
 
         for node in nodes:
-            node_type = node.get("type")
-            if not node_type:
+            rules = by_source_type.get(node.get("type"))
+            if not rules:
                 continue
 
             for rule in rules:
-                if rule.source_type != node_type:
-                    continue
-
                 source_field_value = node.get(rule.source_field)
                 if not source_field_value:
                     properties = node.get("properties", {})
@@ -290,33 +515,90 @@ class MapperService:
                 )
 
                 for value in values:
-                    if not value:
-                        continue
-
-                    target_node = find_node_by_field(
-                        rule.target_type,
-                        rule.target_field,
-                        str(value),
-                    )
-
-                    if target_node:
-                        edges.append({
-                            "source_id": node["id"],
-                            "target_id": target_node["id"],
-                            "type": rule.edge_type,
-                        })
-                    else:
-                        unresolved.append(UnresolvedReference(
-                            source_node_id=node["id"],
-                            source_node_type=node_type,
-                            source_field=rule.source_field,
-                            expected_target_type=rule.target_type,
-                            expected_target_value=str(value),
-                            rule_id=rule.id,
-                        ))
+                    if value:
+                        candidates.append((node, rule, str(value)))
+
+        return candidates
+
+    def _resolve_references(
+        self,
+        references: Set[ReferenceKey],
+    ) -> Dict[ReferenceKey, str]:
+        """Resolve ``(type, field, value)`` references to external ids.
+
+        Typed references are served from the node lookup index first (after
+        dropping it if any process deleted nodes since the last batch); the
+        misses are grouped by ``(type, field)`` and resolved with one UNWIND
+        query per group. A ``None`` type matches nodes of any type.
+        """
+        from app.repositories.neo4j_repo import find_nodes_by_field_values
+
+        resolved: Dict[ReferenceKey, str] = {}
+        misses: Dict[Tuple[Optional[str], str], List[str]] = {}
+
+        if references:
+            node_lookup_index.sync()
+        for key in references:
+            node_type, field_name, value = key
+            if node_type is not None:
+                external_id = node_lookup_index.lookup(node_type, field_name, value)
+                if external_id is not None:
+                    resolved[key] = external_id
+                    continue
+            misses.setdefault((node_type, field_name), []).append(value)
+
+        for (node_type, field_name), values in misses.items():
+            found = find_nodes_by_field_values(node_type, field_name, values)
+            for value, external_id in found.items():
+                resolved[(node_type, field_name, value)] = external_id
+                if node_type is not None:
+                    node_lookup_index.store(node_type, field_name, value, external_id)
+
+        return resolved
+
+    def _build_auto_edges(
+        self,
+        candidates: List[Tuple[Dict[str, Any], AutoEdgeRule, str]],
+        resolved: Dict[ReferenceKey, str],
+    ) -> Tuple[List[Dict[str, Any]], List[UnresolvedReference]]:
+        edges: List[Dict[str, Any]] = []
+        unresolved: List[UnresolvedReference] = []
+
+        for node, rule, value in candidates:
+            target_id = resolved.get((rule.target_type, rule.target_field, value))
+            if target_id:
+                edges.append({
+                    "source_id": node["id"],
+                    "target_id": target_id,
+                    "type": rule.edge_type,
+                })
+            else:
+                unresolved.append(UnresolvedReference(
+                    source_node_id=node["id"],
+                    source_node_type=node["type"],
+                    source_field=rule.source_field,
+                    expected_target_type=rule.target_type,
+                    expected_target_value=value,
+                    target_field=rule.target_field,
+                    edge_type=rule.edge_type,
+                    rule_id=rule.id,
+                ))
 
         return edges, unresolved
 
+    def _auto_create_edges(
+        self,
+        nodes: List[Dict[str, Any]],
+        rule_set: EdgeRuleSet,
+    ) -> Tuple[List[Dict[str, Any]], List[UnresolvedReference]]:
+        candidates = self._collect_edge_candidates(nodes, rule_set)
+        references = {
+            (rule.target_type, rule.target_field, value)
+            for _, rule, value in candidates
+        }
+        resolved = self._resolve_references(references)
+        return self._build_auto_edges(candidates, resolved)
+
     def preview(
         self,
         raw_data: Dict[str, Any],
@@ -355,8 +637,70 @@ class MapperService:
         nodes: List[Dict[str, Any]],
         mapping: MappingConfig,
     ) -> Tuple[List[Dict[str, Any]], List[UnresolvedReference]]:
-        edge_rules = self._get_edge_rules(mapping)
-        return self._auto_create_edges(nodes, edge_rules)
+        return self._auto_create_edges(nodes, self._get_edge_rule_set(mapping))
+
+    def recreate_edges_in_graph(
+        self,
+        mapping: MappingConfig,
+        node_types: Optional[List[str]] = None,
+        source: str = "edge-recreation",
+        since: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Run every edge rule as one server-side join; returns per-rule stats.
+
+        With ``since`` only pairs touching a node updated after it are
+        joined: changed sources against every target, then every source
+        against changed targets.
+        """
+        from app.repositories.neo4j_repo import recreate_edges_for_rule
+
+        stats: List[Dict[str, Any]] = []
+        for rule in self._get_edge_rules(mapping):
+            if node_types and rule.source_type not in node_types:
+                continue
+
+            started = time.perf_counter()
+            args = (
+                rule.source_type,
+                rule.source_field,
+                rule.target_type,
+                rule.target_field,
+                rule.edge_type.upper(),
+                source,
+            )
+            counts = recreate_edges_for_rule(
+                *args, batch_size=settings.edge_recreate_batch_size, sources_since=since,
+            )
+            if since:
+                reverse = recreate_edges_for_rule(
+                    *args, batch_size=settings.edge_recreate_batch_size, targets_since=since,
+                )
+                counts["matched"] += reverse["matched"]
+                counts["created"] += reverse["created"]
+                counts["resourced"] += reverse["resourced"]
+
+            stats.append({
+                "rule_id": rule.id,
+                "source_type": rule.source_type,
+                "target_type": rule.target_type,
+                "edge_type": rule.edge_type,
+                **counts,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            })
+            log.info(
+                f"Edge rule {rule.id}: {counts['created']} created, {counts['matched']} matched, "
+                f"{counts['resourced']} re-sourced, "
+                f"{counts['unresolved']} unresolved in {stats[-1]['duration_ms']} ms"
+                + (f" (since {since})" if since else "")
+            )
+
+        return stats
+
+    def edge_rules_hash(self, mapping: MappingConfig) -> str:
+        """Hash of the edge rules a mapping resolves to, for recreate watermarks."""
+        rules = [rule.model_dump(mode="json") for rule in self._get_edge_rules(mapping)]
+        content = json.dumps(rules, sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()[:16]
 
     def infer_node_type(
         self,
@@ -395,3 +739,22 @@ class MapperService:
 
 
 mapper_service = MapperService()
+
+
+def _map_chunk_safely(
+    service: MapperService,
+    plan: MappingPlan,
+    chunk_id: str,
+    data: Dict[str, Any],
+) -> ChunkOutput:
+    try:
+        nodes, legacy_edges = service._map_payload(data, plan)
+        return chunk_id, nodes, legacy_edges, None
+    except Exception as e:
+        return chunk_id, [], [], str(e)
+
+
+def _map_batch(mapping: MappingConfig, batch: List[Tuple[str, Dict[str, Any]]]) -> List[ChunkOutput]:
+    # Runs in a pool worker; its own mapper_service caches the compiled plan
+    plan = mapper_service.compile_mapping(mapping)
+    return [_map_chunk_safely(mapper_service, plan, chunk_id, data) for chunk_id, data in batch]
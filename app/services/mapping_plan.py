@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.models.mapper.mapping import ConditionalRule, FieldMapping, MappingConfig
+from app.services.transform_service import (
+    ConditionPredicate,
+    EqualsCondition,
+    transform_service,
+)
+
+
+_CHAIN_SEGMENT = re.compile(r'[A-Za-z_][A-Za-z0-9_]*|"(?:[^"\\]|\\.)*"|\[-?\d+\]')
+_FINGERPRINT_FIELDS = {
+    "version", "iterate_path", "field_mappings", "conditional_rules",
+    "edge_source_path", "edge_target_path", "edge_type_path", "edge_type_default",
+    "auto_edge_rules", "edge_preset_id",
+}
+_ATTRIBUTE_LOOKUP = re.compile(
+    r"^\[\?\s*key\s*==\s*'([^']*)'\s*\]\.value\.([A-Za-z_][A-Za-z0-9_]*)\s*\|\s*\[0\]$"
+)
+
+
+class RecordScope:
+    """Per-record memo of evaluated paths and OTLP attribute indexes."""
+
+    __slots__ = ("data", "values", "attribute_indexes")
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self.data = data
+        self.values: Dict[str, Any] = {}
+        self.attribute_indexes: Dict[str, Dict[str, List[Any]]] = {}
+
+
+class PathAccessor:
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def __call__(self, scope: RecordScope) -> Any:
+        values = scope.values
+        if self.path not in values:
+            values[self.path] = transform_service.extract(scope.data, self.path)
+        return values[self.path]
+
+
+class PrefixedAccessor:
+    def __init__(self, prefix: PathAccessor, remainder: str) -> None:
+        self.prefix = prefix
+        self.remainder = remainder
+
+    def __call__(self, scope: RecordScope) -> Any:
+        return transform_service.extract(self.prefix(scope), self.remainder)
+
+
+class AttributeAccessor:
+    """O(1) read of ``attributes[?key=='k'].value.<kind> | [0]``.
+
+    The OTLP ``key/value`` list behind ``prefix`` is indexed once per record.
+    """
+
+    def __init__(self, prefix: PathAccessor, key: str, value_kind: str) -> None:
+        self.prefix = prefix
+        self.key = key
+        self.value_kind = value_kind
+
+    def __call__(self, scope: RecordScope) -> Any:
+        index = scope.attribute_indexes.get(self.prefix.path)
+        if index is None:
+            index = _index_attributes(self.prefix(scope))
+            scope.attribute_indexes[self.prefix.path] = index
+
+        for value in index.get(self.key, ()):
+            if isinstance(value, dict):
+                found = value.get(self.value_kind)
+                if found is not None:
+                    return found
+        return None
+
+
+def _index_attributes(attributes: Any) -> Dict[str, List[Any]]:
+    index: Dict[str, List[Any]] = {}
+    if isinstance(attributes, list):
+        for attribute in attributes:
+            if isinstance(attribute, dict) and isinstance(attribute.get("key"), str):
+                index.setdefault(attribute["key"], []).append(attribute.get("value"))
+    return index
+
+
+def _split_path(path: str) -> Tuple[str, str]:
+    """Split ``path`` into a projection-free leading chain and the rest.
+
+    The chain only holds identifiers and integer indexes, so evaluating the
+    rest against the chain's result is equivalent to evaluating ``path``.
+    Paths whose rest could bind to the root (``||``, comparisons, ...) are
+    not split.
+    """
+    position = 0
+    cut = 0
+    while True:
+        match = _CHAIN_SEGMENT.match(path, position)
+        if not match:
+            break
+        position = match.end()
+        cut = position
+        if path.startswith(".", position):
+            position += 1
+        elif not path.startswith("[", position) or path.startswith("[?", position) \
+                or path.startswith("[]", position) or path.startswith("[*", position):
+            break
+
+    remainder = path[cut:]
+    if not cut or not remainder or remainder[0] not in ".[":
+        return path, ""
+    if not _binds_to_chain(remainder):
+        return path, ""
+    return path[:cut], remainder.lstrip(".")
+
+
+def _binds_to_chain(remainder: str) -> bool:
+    depth = 0
+    quote: Optional[str] = None
+    i = 0
+    while i < len(remainder):
+        char = remainder[i]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+        elif char in "[({":
+            depth += 1
+        elif char in "])}":
+            depth -= 1
+        elif depth == 0:
+            if char == "|":
+                return not remainder.startswith("||", i)
+            if char in "&=!<>":
+                return False
+        i += 1
+    return True
+
+
+def _compile_accessors(paths: List[str]) -> Dict[str, Callable[[RecordScope], Any]]:
+    splits = {path: _split_path(path) for path in set(paths)}
+
+    prefix_usage: Dict[str, int] = {}
+    for prefix, remainder in splits.values():
+        if remainder:
+            prefix_usage[prefix] = prefix_usage.get(prefix, 0) + 1
+
+    prefixes: Dict[str, PathAccessor] = {}
+    accessors: Dict[str, Callable[[RecordScope], Any]] = {}
+    for path, (prefix, remainder) in splits.items():
+        if not remainder or prefix_usage[prefix] < 2:
+            accessors[path] = PathAccessor(path)
+            continue
+
+        prefix_accessor = prefixes.setdefault(prefix, PathAccessor(prefix))
+        attribute = _ATTRIBUTE_LOOKUP.match(remainder)
+        if attribute:
+            accessors[path] = AttributeAccessor(prefix_accessor, attribute.group(1), attribute.group(2))
+        else:
+            accessors[path] = PrefixedAccessor(prefix_accessor, remainder)
+
+    return accessors
+
+
+def _fingerprint(mapping: MappingConfig) -> str:
+    """Hash of everything that affects mapping output.
+
+    Unlike ``MappingPlan.cache_key`` it ignores activation, timestamps and
+    descriptive fields, so re-activating an unchanged mapping keeps the
+    same fingerprint. Edge preset contents are not included.
+    """
+    content = mapping.model_dump_json(include=_FINGERPRINT_FIELDS)
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+class RuleDispatcher:
+    """Selects the conditional rules that apply to a record.
+
+    Rules are pre-sorted by priority. When every rule is an equality test
+    on the same field (``kind == 'Pod'``-style discriminators), matching is
+    a single extraction plus a dict lookup instead of N condition checks.
+    """
+
+    def __init__(self, rules: List[ConditionalRule]) -> None:
+        ordered = sorted(rules, key=lambda r: r.priority, reverse=True)
+        self._predicates: List[Tuple[ConditionalRule, ConditionPredicate]] = [
+            (rule, transform_service.compile_condition(rule.condition)) for rule in ordered
+        ]
+        self.discriminator: Optional[str] = None
+        self._table: Dict[str, List[ConditionalRule]] = {}
+
+        paths = {predicate.path for _, predicate in self._predicates}
+        if (
+            self._predicates
+            and len(paths) == 1
+            and all(isinstance(p, EqualsCondition) for _, p in self._predicates)
+        ):
+            self.discriminator = paths.pop()
+            for rule, predicate in self._predicates:
+                self._table.setdefault(predicate.expected, []).append(rule)
+
+    def match(self, data: Dict[str, Any]) -> List[ConditionalRule]:
+        if self.discriminator is not None:
+            actual = transform_service.extract(data, self.discriminator)
+            return self._table.get(str(actual), [])
+        return [rule for rule, predicate in self._predicates if predicate(data)]
+
+
+class MappingPlan:
+    """Per-mapping structures compiled once and reused for every chunk."""
+
+    def __init__(self, mapping: MappingConfig) -> None:
+        self.mapping = mapping
+        self.rule_dispatcher = RuleDispatcher(mapping.conditional_rules)
+        self.has_conditional_rules = bool(mapping.conditional_rules)
+
+        self.mappings_by_type: Dict[str, List[FieldMapping]] = {}
+        for field_mapping in mapping.field_mappings:
+            self.mappings_by_type.setdefault(field_mapping.target_node_type, []).append(field_mapping)
+
+        self.fingerprint = _fingerprint(mapping)
+        self.accessors = _compile_accessors([fm.source_path for fm in mapping.field_mappings])
+
+        self.iterate_segments: List[Tuple[str, bool]] = [
+            (segment[:-2], True) if segment.endswith("[]") else (segment, False)
+            for segment in (mapping.iterate_path or "").split(".")
+            if segment
+        ]
+
+    def extract(self, scope: RecordScope, path: str) -> Any:
+        accessor = self.accessors.get(path)
+        if accessor is None:
+            return transform_service.extract(scope.data, path)
+        return accessor(scope)
+
+    @staticmethod
+    def cache_key(mapping: MappingConfig) -> Tuple[str, str, str]:
+        return mapping.id, mapping.version, mapping.updated_at.isoformat()
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from app.config import settings
+from app.models.mapper.mapping import MappingConfig
+from app.models.mapper.raw_data import RawDataChunk
+from app.models.mapper.replay import ReplayJob, ReplayJobStatus, ReplayMode
+from app.repositories.mapping_repo import mapping_repo
+from app.repositories.raw_data_repo import raw_data_repo, timeline_score
+from app.repositories.replay_job_repo import replay_job_repo
+from app.services.ingest_service import write_graph
+from app.services.mapper_service import mapper_service
+
+log = logging.getLogger(__name__)
+
+MAX_JOB_ERRORS = 100
+SLOT_POLL_SECONDS = 2
+
+
+def group_chunks_by_agent(chunks: List[RawDataChunk]) -> Dict[str, List[RawDataChunk]]:
+    """Group chunks by the agent name used as the graph ``source``."""
+    groups: Dict[str, List[RawDataChunk]] = {}
+    for chunk in chunks:
+        agent_name = chunk.metadata.get("agent_name", "replay") if chunk.metadata else "replay"
+        groups.setdefault(agent_name, []).append(chunk)
+    return groups
+
+
+class ReplayService:
+    """Streams a source type's raw timeline through a mapping.
+
+    Chunks are read page by page in timestamp order and the job's cursor
+    is persisted after every page, so memory stays bounded by the page
+    size and an interrupted job resumes where it stopped. At most
+    ``replay_max_concurrent_per_source`` jobs run per source type across
+    all processes; the rest wait queued. A job runs in the one process
+    holding its lease, which the page loop keeps fresh; jobs whose lease
+    went stale are picked up by ``resume_incomplete``.
+
+    Processed chunks are marked with the mapping's content fingerprint and
+    a completed unfiltered job leaves a per-source watermark, so
+    ``UNPROCESSED`` jobs and ``SINCE`` jobs without ``from_timestamp``
+    start at the watermark and only read what is new.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Set[asyncio.Task] = set()
+        self._running: Set[str] = set()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    async def create_job(
+        self,
+        mapping: MappingConfig,
+        mode: ReplayMode = ReplayMode.FULL,
+        agent_id: Optional[str] = None,
+        from_timestamp: Optional[datetime] = None,
+        to_timestamp: Optional[datetime] = None,
+    ) -> ReplayJob:
+        job = ReplayJob(
+            id=str(uuid.uuid4()),
+            mapping_id=mapping.id,
+            mapping_version=mapper_service.compile_mapping(mapping).fingerprint,
+            mode=mode,
+            source_type=mapping.source_type,
+            agent_id=agent_id,
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+        )
+
+        if mode != ReplayMode.FULL:
+            watermark = await replay_job_repo.get_watermark(mapping.source_type)
+            if watermark and (
+                (mode == ReplayMode.SINCE and from_timestamp is None)
+                or (mode == ReplayMode.UNPROCESSED
+                    and watermark["mapping_id"] == job.mapping_id
+                    and watermark["mapping_version"] == job.mapping_version
+                    and (from_timestamp is None or watermark["score"] >= timeline_score(from_timestamp)))
+            ):
+                job.checkpoint_score = watermark["score"]
+                job.checkpoint_member = watermark["member"]
+
+        await replay_job_repo.save(job)
+        return job
+
+    async def run(self, job: ReplayJob) -> ReplayJob:
+        if job.id in self._running:
+            return job
+        self._running.add(job.id)
+        try:
+            return await self._run(job)
+        finally:
+            self._running.discard(job.id)
+
+    async def _run(self, job: ReplayJob) -> ReplayJob:
+        if not await replay_job_repo.claim_lease(job.id, self.worker_id, settings.replay_slot_timeout_seconds):
+            log.info(f"Replay job {job.id} is running in another worker")
+            return job
+        job.owner = self.worker_id
+
+        mapping = mapping_repo.get(job.mapping_id)
+        if not mapping:
+            return await self._finish(job, ReplayJobStatus.FAILED, f"Mapping {job.mapping_id} not found")
+        fingerprint = mapper_service.compile_mapping(mapping).fingerprint
+        if job.mapping_version and job.mapping_version != fingerprint:
+            return await self._finish(job, ReplayJobStatus.FAILED, "Mapping changed since the job was created")
+        job.mapping_version = fingerprint
+
+        if not await self._wait_for_slot(job):
+            return await self._finish(job, ReplayJobStatus.CANCELLED)
+
+        log.info(
+            f"Replaying mapping {job.mapping_id} (job {job.id[:8]}, source_type={job.source_type}"
+            + (f", starting after {job.checkpoint_member}" if job.checkpoint_member else "")
+            + ")"
+        )
+
+        cursor = (job.checkpoint_score, job.checkpoint_member) if job.checkpoint_member else None
+        try:
+            job.status = ReplayJobStatus.RUNNING
+            job.started_at = job.started_at or datetime.utcnow()
+            if job.total_chunks is None:
+                job.total_chunks = await raw_data_repo.count_timeline(
+                    job.source_type, cursor, job.from_timestamp, job.to_timestamp,
+                )
+            await replay_job_repo.save(job)
+
+            while True:
+                if await replay_job_repo.is_cancel_requested(job.id):
+                    log.info(f"Replay job {job.id} cancelled after {job.chunks_processed} chunks")
+                    return await self._finish(job, ReplayJobStatus.CANCELLED)
+
+                page_started = time.monotonic()
+                page = await raw_data_repo.read_timeline_page(
+                    job.source_type,
+                    after=cursor,
+                    agent_id=job.agent_id,
+                    from_timestamp=job.from_timestamp,
+                    to_timestamp=job.to_timestamp,
+                    limit=settings.replay_page_size,
+                    skip_processed_by=(
+                        (job.mapping_id, job.mapping_version)
+                        if job.mode == ReplayMode.UNPROCESSED else None
+                    ),
+                )
+                if page.cursor is None:
+                    break
+
+                if page.chunks:
+                    await self._process_page(job, page.chunks, mapping)
+
+                cursor = page.cursor
+                job.checkpoint_score, job.checkpoint_member = cursor
+                job.chunks_scanned += page.scanned
+                job.chunks_skipped += page.skipped
+                job.elapsed_seconds += time.monotonic() - page_started
+                job.updated_at = datetime.utcnow()
+                if not await replay_job_repo.heartbeat(
+                    job.source_type, job.id, self.worker_id, settings.replay_slot_timeout_seconds,
+                ):
+                    log.warning(f"Replay job {job.id} was taken over by another worker, stopping")
+                    return job
+                await replay_job_repo.save(job)
+
+        except Exception as e:
+            log.error(f"Replay job {job.id} failed: {e}")
+            return await self._finish(job, ReplayJobStatus.FAILED, str(e))
+
+        log.info(
+            f"Replay complete for {job.mapping_id}: {job.chunks_processed} chunks, "
+            f"{job.nodes_created} nodes, {job.edges_created} edges"
+        )
+        return await self._finish(job, ReplayJobStatus.COMPLETED)
+
+    async def _wait_for_slot(self, job: ReplayJob) -> bool:
+        """Block until the source type has a free replay slot; False if cancelled meanwhile."""
+        while not await replay_job_repo.acquire_slot(
+            job.source_type,
+            job.id,
+            self.worker_id,
+            settings.replay_max_concurrent_per_source,
+            settings.replay_slot_timeout_seconds,
+        ):
+            if await replay_job_repo.is_cancel_requested(job.id):
+                return False
+            await asyncio.sleep(SLOT_POLL_SECONDS)
+        return True
+
+    async def _process_page(
+        self,
+        job: ReplayJob,
+        chunks: List[RawDataChunk],
+        mapping: MappingConfig,
+    ) -> None:
+        # Mapping (and its process pool) blocks, so it runs in a thread (as
+        # do the graph writes) and live ingest on this event loop keeps flowing
+        for agent_name, agent_chunks in group_chunks_by_agent(chunks).items():
+            batch = await asyncio.to_thread(mapper_service.map_chunks, agent_chunks, mapping)
+            nodes_created, edges_created = await write_graph(
+                batch.nodes, batch.edges, agent_name, batch.unresolved,
+            )
+            job.nodes_created += nodes_created
+            job.edges_created += edges_created
+
+            job.chunks_processed += batch.chunks_processed
+            job.errors.extend(batch.errors[:MAX_JOB_ERRORS - len(job.errors)])
+
+            failed = set(batch.failed_chunk_ids)
+            job.chunks_failed += len(failed)
+            await raw_data_repo.mark_processed_many(
+                job.source_type,
+                [chunk for chunk in agent_chunks if chunk.id not in failed],
+                job.mapping_id,
+                job.mapping_version,
+            )
+
+    async def _finish(
+        self,
+        job: ReplayJob,
+        status: ReplayJobStatus,
+        error: Optional[str] = None,
+    ) -> ReplayJob:
+        job.status = status
+        if error and len(job.errors) < MAX_JOB_ERRORS:
+            job.errors.append(error)
+        job.updated_at = job.finished_at = datetime.utcnow()
+        await replay_job_repo.save(job)
+        if (
+            status == ReplayJobStatus.COMPLETED
+            and job.mode != ReplayMode.SINCE
+            and job.checkpoint_member
+            and not job.chunks_failed
+            and not (job.agent_id or job.from_timestamp or job.to_timestamp)
+        ):
+            # Failed chunks stay unmarked, so UNPROCESSED must still see them
+            await replay_job_repo.set_watermark(
+                job.source_type, job.mapping_id, job.mapping_version,
+                job.checkpoint_score, job.checkpoint_member,
+            )
+        await replay_job_repo.release_slot(job.source_type, job.id)
+        await replay_job_repo.release_lease(job.id, self.worker_id)
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[ReplayJob]:
+        """Flag a job for cancellation; whichever process runs it stops at the next page."""
+        job = await replay_job_repo.get(job_id)
+        if job and job.status in (ReplayJobStatus.QUEUED, ReplayJobStatus.RUNNING):
+            await replay_job_repo.request_cancel(job_id)
+        return job
+
+    async def resume_incomplete(self) -> int:
+        """Restart queued or running jobs whose lease went stale (their
+        worker died) from their checkpoint."""
+        resumed = 0
+        for job in await replay_job_repo.list_jobs():
+            if job.status not in (ReplayJobStatus.QUEUED, ReplayJobStatus.RUNNING):
+                continue
+            if job.id in self._running:
+                continue
+            if not await replay_job_repo.claim_lease(job.id, self.worker_id, settings.replay_slot_timeout_seconds):
+                continue
+            log.info(f"Resuming replay job {job.id} for mapping {job.mapping_id}")
+            task = asyncio.create_task(self.run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            resumed += 1
+        return resumed
+
+    async def resume_incomplete_periodically(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.resume_incomplete()
+            except Exception as e:
+                log.error(f"Resuming replay jobs failed: {e}")
+
+
+replay_service = ReplayService()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import ast
+from typing import Any, Callable, Dict, Iterable
+
+SAFE_FUNCTIONS: Dict[str, Any] = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "len": len,
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "round": round,
+}
+
+STRING_METHODS = frozenset({
+    "lower", "upper", "title", "capitalize", "strip", "lstrip", "rstrip",
+    "split", "rsplit", "replace", "startswith", "endswith", "join",
+    "removeprefix", "removesuffix", "zfill", "isdigit", "isalpha", "isalnum",
+})
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.Constant, ast.Name, ast.Load,
+    ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.Attribute, ast.Subscript, ast.Slice,
+    ast.Tuple, ast.List, ast.JoinedStr, ast.FormattedValue,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.UAdd, ast.USub, ast.Not, ast.And, ast.Or,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.In, ast.NotIn, ast.Is, ast.IsNot,
+)
+
+_GLOBALS: Dict[str, Any] = {"__builtins__": {}, **SAFE_FUNCTIONS}
+
+
+class UnsafeExpressionError(ValueError):
+    pass
+
+
+def _validate(tree: ast.AST, names: frozenset) -> None:
+    call_targets = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise UnsafeExpressionError(f"'{type(node).__name__}' is not allowed")
+
+        if isinstance(node, ast.Name) and node.id not in names and node.id not in SAFE_FUNCTIONS:
+            raise UnsafeExpressionError(f"Unknown name '{node.id}'")
+
+        if isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name):
+                if node.func.id not in SAFE_FUNCTIONS:
+                    raise UnsafeExpressionError(f"Call to '{node.func.id}' is not allowed")
+            elif not isinstance(node.func, ast.Attribute):
+                raise UnsafeExpressionError("Only helpers and string methods may be called")
+
+        if isinstance(node, ast.Attribute):
+            if id(node) not in call_targets or node.attr not in STRING_METHODS:
+                raise UnsafeExpressionError(f"Attribute '{node.attr}' is not allowed")
+
+
+def compile_expression(
+    expression: str,
+    names: Iterable[str] = ("value",),
+) -> Callable[[Dict[str, Any]], Any]:
+    """Parse ``expression`` once into a callable taking the variable mapping.
+
+    Only arithmetic, comparisons, boolean logic, indexing, calls of
+    ``SAFE_FUNCTIONS`` and whitelisted string methods are accepted.
+    """
+    tree = ast.parse(expression.strip(), mode="eval")
+    _validate(tree, frozenset(names))
+    code = compile(tree, "<expression>", "eval")
+
+    def evaluate(variables: Dict[str, Any]) -> Any:
+        return eval(code, _GLOBALS, variables)
+
+    return evaluate
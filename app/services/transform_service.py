@@ -1,19 +1,87 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, Optional
+import re
+from typing import Any, Callable, Dict, Optional
 
 import jmespath
 
 from app.models.mapper.mapping import FieldMapping
 from app.models.mapper.transform import TransformType
+from app.services.safe_expression import compile_expression
 
 log = logging.getLogger(__name__)
 
+EXPRESSION_NAMES = ("value", "source_data", "node_type")
+
+
+_EQ_CONDITION = re.compile(r"^([\w.]+)\s*==\s*['\"]?(.+?)['\"]?$")
+_NEQ_CONDITION = re.compile(r"^([\w.]+)\s*!=\s*['\"]?(.+?)['\"]?$")
+
+
+class ConditionPredicate:
+    path: Optional[str] = None
+
+    def __call__(self, data: Dict[str, Any]) -> bool:
+        return False
+
+
+class EqualsCondition(ConditionPredicate):
+    def __init__(self, path: str, expected: str) -> None:
+        self.path = path
+        self.expected = expected
+
+    def __call__(self, data: Dict[str, Any]) -> bool:
+        return str(transform_service.extract(data, self.path)) == self.expected
+
+
+class NotEqualsCondition(ConditionPredicate):
+    def __init__(self, path: str, expected: str) -> None:
+        self.path = path
+        self.expected = expected
+
+    def __call__(self, data: Dict[str, Any]) -> bool:
+        return str(transform_service.extract(data, self.path)) != self.expected
+
+
+class TruthyCondition(ConditionPredicate):
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def __call__(self, data: Dict[str, Any]) -> bool:
+        result = transform_service.extract(data, self.path)
+        if result is None:
+            return False
+        if isinstance(result, bool):
+            return result
+        if isinstance(result, (list, dict, str)):
+            return len(result) > 0
+        if isinstance(result, (int, float)):
+            return result != 0
+        return bool(result)
+
+
+def _parse_condition(condition: str) -> ConditionPredicate:
+    if not condition:
+        return ConditionPredicate()
+
+    stripped = condition.strip()
+    eq_match = _EQ_CONDITION.match(stripped)
+    if eq_match:
+        return EqualsCondition(eq_match.group(1), eq_match.group(2))
+
+    neq_match = _NEQ_CONDITION.match(stripped)
+    if neq_match:
+        return NotEqualsCondition(neq_match.group(1), neq_match.group(2))
+
+    return TruthyCondition(condition)
+
 
 class TransformService:
     def __init__(self) -> None:
         self._cache: Dict[str, jmespath.parser.ParsedResult] = {}
+        self._expression_cache: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._condition_cache: Dict[str, ConditionPredicate] = {}
 
     def compile(self, expression: str) -> jmespath.parser.ParsedResult:
         if expression not in self._cache:
@@ -24,6 +92,21 @@ class TransformService:
                 raise
         return self._cache[expression]
 
+    def compile_expression(self, expression: str) -> Callable[[Dict[str, Any]], Any]:
+        compiled = self._expression_cache.get(expression)
+        if compiled is None:
+            try:
+                compiled = compile_expression(expression, EXPRESSION_NAMES)
+            except (SyntaxError, ValueError) as e:
+                log.warning(f"Rejected expression transform '{expression}': {e}")
+                error = e
+
+                def compiled(variables: Dict[str, Any]) -> Any:
+                    raise error
+
+            self._expression_cache[expression] = compiled
+        return compiled
+
     def extract(self, data: Dict[str, Any], path: str) -> Optional[Any]:
         if not path:
             return None
@@ -97,29 +180,11 @@ class TransformService:
         context: Dict[str, Any],
     ) -> Any:
         expression = mapping.transform_config.get("expression", "value")
+        if expression == "value":
+            return value
 
         try:
-            allowed_names = {
-                "value": value,
-                "str": str,
-                "int": int,
-                "float": float,
-                "bool": bool,
-                "len": len,
-                **context,
-            }
-
-            if expression == "value":
-                return value
-            elif expression.startswith("int("):
-                return int(value)
-            elif expression.startswith("str("):
-                return str(value)
-            elif expression.startswith("float("):
-                return float(value)
-            else:
-                return eval(expression, {"__builtins__": {}}, allowed_names)
-
+            return self.compile_expression(expression)({"value": value, **context})
         except Exception as e:
             log.warning(f"Expression transform failed: {e}")
             return value
@@ -149,43 +214,19 @@ class TransformService:
 
         return default_result
 
+    def compile_condition(self, condition: str) -> ConditionPredicate:
+        predicate = self._condition_cache.get(condition)
+        if predicate is None:
+            predicate = _parse_condition(condition)
+            self._condition_cache[condition] = predicate
+        return predicate
+
     def evaluate_condition(
         self,
         data: Dict[str, Any],
         condition: str,
     ) -> bool:
-        if not condition:
-            return False
-
-        try:
-            import re
-            eq_match = re.match(r"^([\w.]+)\s*==\s*['\"]?(.+?)['\"]?$", condition.strip())
-            neq_match = re.match(r"^([\w.]+)\s*!=\s*['\"]?(.+?)['\"]?$", condition.strip())
-
-            if eq_match:
-                field_path = eq_match.group(1)
-                expected = eq_match.group(2)
-                actual = self.extract(data, field_path)
-                return str(actual) == expected
-
-            if neq_match:
-                field_path = neq_match.group(1)
-                expected = neq_match.group(2)
-                actual = self.extract(data, field_path)
-                return str(actual) != expected
-
-            result = self.extract(data, condition)
-            if result is None:
-                return False
-            if isinstance(result, bool):
-                return result
-            if isinstance(result, (list, dict, str)):
-                return len(result) > 0
-            if isinstance(result, (int, float)):
-                return result != 0
-            return bool(result)
-        except Exception:
-            return False
+        return self.compile_condition(condition)(data)
 
     def extract_multiple(
         self,
@@ -5,8 +5,9 @@ from typing import Any
 
 from app.models.topology import GraphResponse
 from app.models.traversal import TraversalRule, TraversalStep, PRESET_RULES
+from app.repositories.graph_replica import graph_replica
 from app.repositories.neo4j_connection import neo4j_driver
-from app.services.graph_service import _to_graph_node, _to_graph_edge
+from app.services.graph_service import _build_response, render_graph, use_replica
 
 log = logging.getLogger(__name__)
 
@@ -15,13 +16,23 @@ def list_presets() -> list[dict]:
     return PRESET_RULES
 
 
-def execute_traversal(rule: TraversalRule) -> GraphResponse:
+def _read_rule(rule: TraversalRule) -> tuple[list[dict], list[dict]]:
+    if use_replica():
+        return graph_replica.execute_traversal(rule)
     with neo4j_driver.session() as session:
-        result = session.execute_read(_execute_rule_tx, rule)
-    return result
+        return session.execute_read(_execute_rule_tx, rule)
+
+
+def execute_traversal(rule: TraversalRule) -> GraphResponse:
+    return _build_response(*_read_rule(rule))
 
 
-def _execute_rule_tx(tx: Any, rule: TraversalRule) -> GraphResponse:
+def execute_traversal_json(rule: TraversalRule) -> bytes:
+    """Same result as ``execute_traversal``, rendered directly to JSON bytes."""
+    return render_graph(*_read_rule(rule))
+
+
+def _execute_rule_tx(tx: Any, rule: TraversalRule) -> tuple[list[dict], list[dict]]:
     if rule.start_node_id:
         start_query = "MATCH (n:Resource {external_id: $start_id}) RETURN collect(n) AS starts"
         start_result = tx.run(start_query, start_id=rule.start_node_id)
@@ -33,10 +44,10 @@ def _execute_rule_tx(tx: Any, rule: TraversalRule) -> GraphResponse:
         record = start_result.single()
         start_nodes = record["starts"] if record else []
     else:
-        return GraphResponse(nodes=[], edges=[], node_count=0, edge_count=0)
+        return [], []
 
     if not start_nodes:
-        return GraphResponse(nodes=[], edges=[], node_count=0, edge_count=0)
+        return [], []
 
     all_node_ids: set[str] = {n["external_id"] for n in start_nodes}
     current_ids = list(all_node_ids)
@@ -49,7 +60,7 @@ def _execute_rule_tx(tx: Any, rule: TraversalRule) -> GraphResponse:
         current_ids = list(new_ids)
 
     if not all_node_ids:
-        return GraphResponse(nodes=[], edges=[], node_count=0, edge_count=0)
+        return [], []
 
     all_ids_list = list(all_node_ids)[:rule.limit]
 
@@ -77,15 +88,7 @@ def _execute_rule_tx(tx: Any, rule: TraversalRule) -> GraphResponse:
         edge.update(record["props"] or {})
         raw_edges.append(edge)
 
-    nodes = [_to_graph_node(n) for n in raw_nodes]
-    edges = [_to_graph_edge(e) for e in raw_edges]
-
-    return GraphResponse(
-        nodes=nodes,
-        edges=edges,
-        node_count=len(nodes),
-        edge_count=len(edges),
-    )
+    return raw_nodes, raw_edges
 
 
 def _execute_step(tx: Any, current_ids: list[str], step: TraversalStep) -> set[str]:
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark the in-process graph replica.
+
+Loads a synthetic graph into ``GraphReplica`` and reports load time,
+memory (traced allocations and the replica's own estimate, normalized to
+1M edges) and latency of subgraph, impact, path and traversal reads.
+Neo4j and Redis are not needed.
+
+    python -m benchmarks.graph_replica --nodes 250000 --edges 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from app.models.traversal import TraversalRule
+from app.repositories.graph_replica import GraphReplica
+
+NODE_TYPES = ["Service", "Pod", "Deployment", "Database", "Endpoint"]
+EDGE_TYPES = ["CALLS", "RUNS_ON", "DEPENDS_ON", "EXPOSES"]
+
+
+def _node_id(i: int) -> str:
+    return f"urn:resource:{NODE_TYPES[i % len(NODE_TYPES)].lower()}:node-{i}"
+
+
+def _rows(node_count: int, edge_count: int, seed: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for i in range(node_count):
+        yield "node", {
+            "id": _node_id(i),
+            "type": NODE_TYPES[i % len(NODE_TYPES)],
+            "name": f"node-{i}",
+            "status": "active",
+            "environment": "prod",
+            "source": "bench",
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "updated_at": "2024-01-01T00:00:00+00:00",
+            "namespace": f"ns-{i % 20}",
+        }
+    rng = random.Random(seed)
+    for i in range(edge_count):
+        yield "edge", {
+            "source_id": _node_id(rng.randrange(node_count)),
+            "target_id": _node_id(rng.randrange(node_count)),
+            "type": EDGE_TYPES[i % len(EDGE_TYPES)],
+            "status": "active",
+            "source": "bench",
+            "weight": 1.0,
+            "first_seen": "2024-01-01T00:00:00+00:00",
+            "last_seen": "2024-01-01T00:00:00+00:00",
+        }
+
+
+def _time(fn: Callable[[], Tuple[list, list]], repeat: int) -> Tuple[float, int, int]:
+    nodes, edges = fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        nodes, edges = fn()
+    return (time.perf_counter() - started) / repeat, len(nodes), len(edges)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the in-process graph replica")
+    parser.add_argument("--nodes", type=int, default=250_000, help="Nodes (default: 250000)")
+    parser.add_argument("--edges", type=int, default=1_000_000, help="Edges (default: 1000000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Requests per measurement (default: 20)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    replica = GraphReplica()
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    replica.load(_rows(args.nodes, args.edges, args.seed))
+    load_elapsed = time.perf_counter() - started
+    gc.collect()
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    status = replica.status()
+    per_million = 1_000_000 / max(1, status["edges"])
+    print(f"{status['nodes']} nodes, {status['edges']} edges loaded in {load_elapsed:.1f} s")
+    print(
+        f"memory  traced {traced / 2**20:8.1f} MiB ({traced * per_million / 2**20:.1f} MiB per 1M edges)   "
+        f"estimate {status['memory_bytes'] / 2**20:8.1f} MiB ({status['bytes_per_edge']} B/edge)"
+    )
+
+    center = _node_id(0)
+    far = _node_id(args.nodes // 2)
+    rule = TraversalRule(
+        name="bench",
+        start_node_id=center,
+        steps=[
+            {"edge_types": ["calls", "depends_on"], "direction": "outgoing", "max_depth": 2},
+            {"edge_types": ["runs_on"], "direction": "any"},
+        ],
+    )
+    queries = [
+        ("subgraph depth=2", lambda: replica.get_subgraph(center, 2)),
+        ("subgraph depth=3 max_nodes=2000", lambda: replica.get_subgraph(center, 3, max_nodes=2000)),
+        ("impact downstream depth=3", lambda: replica.get_impact(center, 3, "downstream")),
+        ("path max_depth=6", lambda: replica.find_shortest_path(center, far, 6)),
+        ("traversal 2 steps", lambda: replica.execute_traversal(TraversalRule.model_validate(rule))),
+    ]
+    for label, fn in queries:
+        elapsed, node_count, edge_count = _time(fn, args.repeat)
+        print(f"{label:<34} {elapsed * 1000:8.2f} ms   {node_count:6d} nodes {edge_count:7d} edges")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
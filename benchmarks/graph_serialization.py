@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Benchmark graph read responses.
+
+Serves synthetic repository rows through the real /graph/full,
+/graph/subgraph and /traversal/execute routes and through equivalent
+routes that build ``GraphNode``/``GraphEdge`` models and validate them
+with ``response_model=GraphResponse``. Neo4j is not needed.
+
+    python -m benchmarks.graph_serialization --nodes 5000 --edges 20000
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.graph import router as graph_router
+from app.api.traversal import router as traversal_router
+from app.models.topology import GraphResponse, SubgraphRequest
+from app.models.traversal import TraversalRule
+from app.services import graph_service, traversal_service
+
+NODE_TYPES = ["Service", "Pod", "Deployment", "Database", "Endpoint"]
+EDGE_TYPES = ["CALLS", "RUNS_ON", "DEPENDS_ON", "EXPOSES"]
+
+
+def _rows(node_count: int, edge_count: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    nodes = [
+        {
+            "id": f"urn:resource:{NODE_TYPES[i % len(NODE_TYPES)].lower()}:node-{i}",
+            "type": NODE_TYPES[i % len(NODE_TYPES)],
+            "name": f"node-{i}",
+            "status": "active",
+            "environment": "prod",
+            "source": "bench",
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "updated_at": "2024-01-01T00:00:00+00:00",
+            "namespace": f"ns-{i % 20}",
+            "replicas": i % 5,
+            "labels": ["app", f"tier-{i % 3}"],
+        }
+        for i in range(node_count)
+    ]
+    edges = [
+        {
+            "source_id": nodes[i % node_count]["id"],
+            "target_id": nodes[(i * 7 + 1) % node_count]["id"],
+            "type": EDGE_TYPES[i % len(EDGE_TYPES)],
+            "status": "active",
+            "source": "bench",
+            "weight": 1.0,
+            "first_seen": "2024-01-01T00:00:00+00:00",
+            "last_seen": "2024-01-01T00:00:00+00:00",
+            "latency_ms": i % 250,
+        }
+        for i in range(edge_count)
+    ]
+    return nodes, edges
+
+
+class _FakeSession:
+    def __init__(self, rows: Tuple[List[Dict], List[Dict]]) -> None:
+        self._rows = rows
+
+    def __enter__(self) -> "_FakeSession":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+    def execute_read(self, fn: Callable, *args: Any) -> Tuple[List[Dict], List[Dict]]:
+        return self._rows
+
+
+class _FakeDriver:
+    def __init__(self, rows: Tuple[List[Dict], List[Dict]]) -> None:
+        self._rows = rows
+
+    def session(self) -> _FakeSession:
+        return _FakeSession(self._rows)
+
+
+@contextmanager
+def _patched(rows: Tuple[List[Dict], List[Dict]]):
+    versions = itertools.count(1)
+    saved = (
+        graph_service.neo4j_repo.get_full_graph,
+        graph_service.neo4j_repo.get_subgraph,
+        traversal_service.neo4j_driver,
+    )
+    from app.api import graph as graph_api
+    saved_version = graph_api.graph_version_repo.current
+
+    graph_service.neo4j_repo.get_full_graph = lambda limit: rows
+    graph_service.neo4j_repo.get_subgraph = lambda *args: rows
+    traversal_service.neo4j_driver = _FakeDriver(rows)
+    # A fresh version per request so the read cache never answers
+    graph_api.graph_version_repo.current = lambda: next(versions)
+    try:
+        yield
+    finally:
+        (
+            graph_service.neo4j_repo.get_full_graph,
+            graph_service.neo4j_repo.get_subgraph,
+            traversal_service.neo4j_driver,
+        ) = saved
+        graph_api.graph_version_repo.current = saved_version
+
+
+def _model_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/graph/full", response_model=GraphResponse)
+    async def full(limit: int = 500):
+        return graph_service.get_full_graph(limit)
+
+    @app.post("/api/v1/graph/subgraph", response_model=GraphResponse)
+    async def subgraph(body: SubgraphRequest):
+        return graph_service.get_subgraph(body.center_node_id, body.depth)
+
+    @app.post("/api/v1/traversal/execute", response_model=GraphResponse)
+    async def execute(body: TraversalRule):
+        return traversal_service.execute_traversal(body)
+
+    return app
+
+
+def _fast_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(graph_router, prefix="/api/v1/graph")
+    app.include_router(traversal_router, prefix="/api/v1/traversal")
+    return app
+
+
+REQUESTS: List[Tuple[str, str, str, Dict[str, Any]]] = [
+    ("/graph/full", "GET", "/api/v1/graph/full?limit=5000", {}),
+    ("/graph/subgraph", "POST", "/api/v1/graph/subgraph", {"center_node_id": "urn:resource:service:node-0"}),
+    ("/traversal/execute", "POST", "/api/v1/traversal/execute", {
+        "name": "bench", "start_node_id": "urn:resource:service:node-0",
+        "steps": [{"edge_types": ["calls"], "direction": "outgoing"}],
+    }),
+]
+
+
+def _time(client: TestClient, method: str, url: str, body: Dict[str, Any], repeat: int) -> Tuple[float, bytes]:
+    content = b""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        response = client.request(method, url, json=body or None)
+        response.raise_for_status()
+        content = response.content
+    return (time.perf_counter() - started) / repeat, content
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark graph response serialization")
+    parser.add_argument("--nodes", type=int, default=5000, help="Nodes per response (default: 5000)")
+    parser.add_argument("--edges", type=int, default=20000, help="Edges per response (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Requests per measurement (default: 5)")
+    args = parser.parse_args()
+
+    rows = _rows(args.nodes, args.edges)
+    print(f"{args.nodes} nodes, {args.edges} edges per response")
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        graph_service._build_response(*rows).model_dump_json()
+    model_elapsed = (time.perf_counter() - started) / args.repeat
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        graph_service.render_graph(*rows)
+    fast_elapsed = (time.perf_counter() - started) / args.repeat
+    print(
+        f"{'serialization only':<22} models {model_elapsed * 1000:8.1f} ms   "
+        f"direct {fast_elapsed * 1000:8.1f} ms   speedup {model_elapsed / fast_elapsed:5.1f}x"
+    )
+
+    with _patched(rows):
+        model_client = TestClient(_model_app())
+        fast_client = TestClient(_fast_app())
+
+        for label, method, url, body in REQUESTS:
+            model_elapsed, model_body = _time(model_client, method, url, body, args.repeat)
+            fast_elapsed, fast_body = _time(fast_client, method, url, body, args.repeat)
+            same = GraphResponse.model_validate_json(model_body) == GraphResponse.model_validate_json(fast_body)
+            print(
+                f"{label:<22} models {model_elapsed * 1000:8.1f} ms   "
+                f"direct {fast_elapsed * 1000:8.1f} ms   "
+                f"speedup {model_elapsed / fast_elapsed:5.1f}x   same={same}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,7 @@ OTLP_TRACES_MAPPING = {
     "version": "1.0.0",
     "description": "Maps OTLP traces to Service/Database/Table/ExternalAPI/Library nodes",
     "edge_preset_id": "default",
+    "iterate_path": "resourceSpans[].scopeSpans[].spans[]",
     "field_mappings": [
         {
             "id": "svc-id",